@@ -1,55 +1,150 @@
 
-
 package main
 
 import (
-    "log"
-    "strings"
 	"bytes"
+	"encoding/json"
+	"log"
+	"net/http"
+	"strings"
+	"time"
 
-    "github.com/Danny-Dasilva/CycleTLS/cycletls"
-    "github.com/gin-gonic/gin"
+	"github.com/Danny-Dasilva/CycleTLS/cycletls"
+	"github.com/gin-gonic/gin"
 )
 
-func sendKickMessage(context *gin.Context) cycletls.Response {
-    client := cycletls.Init()
+const workers = 8
+
+// Headers that describe our connection to kick rather than the response,
+// so they are not copied over.
+var skippedHeaders = map[string]bool{
+	"Connection":        true,
+	"Content-Encoding":  true,
+	"Content-Length":    true,
+	"Keep-Alive":        true,
+	"Transfer-Encoding": true,
+}
+
+// Long lived CycleTLS clients, created once at startup. Each request borrows
+// one and gives it back when it is done, so up to `workers` requests run at
+// the same time without paying for a new client every time.
+var clients = make(chan cycletls.CycleTLS, workers)
+
+// A single request in a batch, and its response
+type batchRequest struct {
+	ID      int               `json:"id"`
+	Method  string            `json:"method"`
+	URL     string            `json:"url"`
+	Headers map[string]string `json:"headers"`
+	Body    string            `json:"body"`
+}
+
+type batchResponse struct {
+	ID      int               `json:"id"`
+	Status  int               `json:"status"`
+	Headers map[string]string `json:"headers"`
+	Body    string            `json:"body"`
+}
+
+func doRequest(method string, url string, headers map[string]string, body string) (cycletls.Response, error) {
+	client := <-clients
+	defer func() { clients <- client }()
+
+	return client.Do(url, cycletls.Options{
+		Body:      body,
+		Headers:   headers,
+		Ja3:       "771,4865-4867-4866-49195-49199-52393-52392-49196-49200-49162-49161-49171-49172-51-57-47-53-10,0-23-65281-10-11-35-16-5-51-43-13-45-28-21,29-23-24-25-256-257,0",
+		UserAgent: "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:87.0) Gecko/20100101 Firefox/87.0",
+		// PROXY_HERE
+	}, method)
+}
+
+func responseHeaders(response cycletls.Response) map[string]string {
+	headers := make(map[string]string)
+	for key, value := range response.Headers {
+		if !skippedHeaders[http.CanonicalHeaderKey(key)] {
+			headers[key] = value
+		}
+	}
+	return headers
+}
+
+func sendKickMessage(context *gin.Context) (cycletls.Response, error) {
 	headers := make(map[string]string)
 	for key, values := range context.Request.Header {
-	headers[key] = strings.Join(values, ",")
+		headers[key] = strings.Join(values, ",")
 	}
 
 	buf := new(bytes.Buffer)
 	buf.ReadFrom(context.Request.Body)
 	bodyStr := buf.String()
 
-
 	url := context.Query("url")
-    response, err := client.Do(url, cycletls.Options{
-        Body:      bodyStr,
-		Headers:   headers,
-        Ja3:       "771,4865-4867-4866-49195-49199-52393-52392-49196-49200-49162-49161-49171-49172-51-57-47-53-10,0-23-65281-10-11-35-16-5-51-43-13-45-28-21,29-23-24-25-256-257,0",
-        UserAgent: "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:87.0) Gecko/20100101 Firefox/87.0",
-        // PROXY_HERE
-    }, context.Request.Method)
-    if err != nil {
-        log.Print("Request Failed: " + err.Error())
-    }
-    return response
+	return doRequest(context.Request.Method, url, headers, bodyStr)
 }
 
 func queryRespone(context *gin.Context) {
-    response := sendKickMessage(context)
-    context.String(response.Status, response.Body)
+	response, err := sendKickMessage(context)
+	if err != nil {
+		log.Print("Request Failed: " + err.Error())
+		context.String(http.StatusBadGateway, err.Error())
+		return
+	}
+
+	for key, value := range responseHeaders(response) {
+		context.Header(key, value)
+	}
+	context.String(response.Status, response.Body)
 }
 
+// Runs every request in the body at the same time, and streams each
+// response back as a line of JSON as soon as it is done.
+func batchRequests(context *gin.Context) {
+	var requests []batchRequest
+	if err := context.BindJSON(&requests); err != nil {
+		return
+	}
+
+	results := make(chan batchResponse, len(requests))
+	for _, request := range requests {
+		go func(request batchRequest) {
+			response, err := doRequest(request.Method, request.URL, request.Headers, request.Body)
+			if err != nil {
+				log.Print("Request Failed: " + err.Error())
+				results <- batchResponse{ID: request.ID, Status: http.StatusBadGateway, Body: err.Error()}
+				return
+			}
+			results <- batchResponse{ID: request.ID, Status: response.Status, Headers: responseHeaders(response), Body: response.Body}
+		}(request)
+	}
+
+	context.Header("Content-Type", "application/x-ndjson")
+	context.Status(http.StatusOK)
+	encoder := json.NewEncoder(context.Writer)
+	for range requests {
+		encoder.Encode(<-results)
+		context.Writer.Flush()
+	}
+}
 
 func main() {
 	log.Print("starting")
- 	gin.SetMode(gin.ReleaseMode)
-    router := gin.Default()
+	for i := 0; i < workers; i++ {
+		clients <- cycletls.Init()
+	}
 
-    router.Any("/request", queryRespone)
+	gin.SetMode(gin.ReleaseMode)
+	router := gin.New()
+	router.Use(gin.Recovery())
 
-    router.Run("localhost:9090")
-}
+	router.Any("/request", queryRespone)
+	router.POST("/batch", batchRequests)
 
+	// Keep connections from kick.py open so they are reused between requests
+	server := &http.Server{
+		Addr:        "localhost:9090",
+		Handler:     router,
+		IdleTimeout: 120 * time.Second,
+	}
+	log.Fatal(server.ListenAndServe())
+}
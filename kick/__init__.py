@@ -10,10 +10,14 @@ from typing import Any, Literal, NamedTuple
 
 from .assets import *
 from .badges import *
+from .bypass import *
+from .caching import *
 from .categories import *
 from .chatroom import *
 from .chatter import *
 from .client import *
+from .codecs import *
+from .downloads import *
 from .emotes import *
 from .enums import *
 from .errors import *
@@ -22,6 +26,10 @@ from .livestream import *
 from .message import *
 from .object import *
 from .polls import *
+from .queues import *
+from .ratelimits import *
+from .sharding import *
+from .transports import *
 from .users import *
 from .videos import *
 
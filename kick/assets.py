@@ -1,17 +1,96 @@
 from __future__ import annotations
 
+import asyncio
 import os
-from io import BufferedIOBase
-from typing import TYPE_CHECKING, Any
+from io import BufferedIOBase, BytesIO
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Optional,
+    Union,
+)
 
 if TYPE_CHECKING:
     from typing_extensions import Self
 
+    from aiohttp import ClientResponse
+
     from .http import HTTPClient
     from .types.assets import AssetOnlySrc, AssetSrcset
 
 __all__ = ("Asset",)
 
+# Saved next to a partly downloaded file, so resuming it can check the asset didn't change
+VALIDATOR_SUFFIX = ".validator"
+
+
+def _threaded(func: Callable[[bytes], Any]) -> Callable[[bytes], Awaitable[Any]]:
+    def wrapper(data: bytes) -> Awaitable[Any]:
+        return asyncio.to_thread(func, data)
+
+    return wrapper
+
+
+def _get_validator(headers: Any) -> Optional[str]:
+    etag = headers.get("ETag")
+    # Weak ETags can't be used with If-Range
+    if etag and not etag.startswith("W/"):
+        return etag
+    return headers.get("Last-Modified")
+
+
+def _get_range_total(headers: Any) -> Optional[int]:
+    # A 416's Content-Range looks like "bytes */1234"
+    _, _, total = headers.get("Content-Range", "").rpartition("/")
+    try:
+        return int(total)
+    except ValueError:
+        return None
+
+
+def _read_text(path: str) -> Optional[str]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def _write_text(path: str, text: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def _write_chunks(
+    res: ClientResponse,
+    write: Callable[[bytes], Union[Any, Awaitable[Any]]],
+    chunk_size: int,
+    progress: Optional[Callable[[int, Optional[int]], Any]],
+    offset: int,
+) -> int:
+    total = None if res.content_length is None else res.content_length + offset
+    written = 0
+
+    async for chunk in res.content.iter_chunked(chunk_size):
+        result = write(chunk)
+        if asyncio.iscoroutine(result):
+            await result
+        written += len(chunk)
+        if progress is not None:
+            progress(offset + written, total)
+
+    return written
+
 
 class Asset:
     """
@@ -48,16 +127,49 @@ class Asset:
 
         return await self.http.get_asset(self.url)
 
+    async def stream(self, *, chunk_size: int = 65536) -> AsyncIterator[bytes]:
+        """
+        Fetches the asset from kick, yielding it in chunks as they arrive instead of holding all of it in memory.
+
+        This is an async iterator, used like `async for chunk in asset.stream(): ...`
+
+        Parameters
+        -----------
+        chunk_size: int = 65536
+            The maximum size of each chunk, in bytes
+
+        Raises
+        -----------
+        HTTPException
+            Fetching the asset failed
+        NotFound
+            Asset no longer exists
+
+        Yields
+        -----------
+        bytes
+            The next chunk of the asset
+        """
+
+        res = await self.http.request_asset(self.url)
+        async with res:
+            async for chunk in res.content.iter_chunked(chunk_size):
+                yield chunk
+
     async def save(
         self,
         fp: str | bytes | os.PathLike[Any] | BufferedIOBase,
         *,
         seek_begin: bool = True,
+        chunk_size: int = 65536,
+        progress: Optional[Callable[[int, Optional[int]], Any]] = None,
+        resume: bool = False,
     ) -> int:
         """
         |coro|
 
-        Saves the asset into a file-like object
+        Saves the asset into a file-like object.
+        The asset is written in chunks as it is downloaded, and writing to files is done in a thread.
 
         Parameters
         -----------
@@ -67,6 +179,15 @@ class Asset:
         seek_begin: bool
             Whether to seek to the beginning of the file after saving is
             successfully done.
+        chunk_size: int = 65536
+            The maximum size of each chunk, in bytes
+        progress: Optional[Callable[[int, Optional[int]], Any]]
+            Called after every chunk with the amount of bytes saved so far, and the asset's total size if it is known
+        resume: bool = False
+            If a filepath is given and the file was partly downloaded by an earlier call with `resume`, only download what is missing from it.
+            Until the download finishes, the asset's ETag or Last-Modified is kept next to the file, in a file ending with `.validator`,
+            so that the file is downloaded again instead if the asset changed. The file is also downloaded again if kick can't resume it,
+            or if it is bigger than the asset.
 
         Raises
         -----------
@@ -81,15 +202,64 @@ class Asset:
             The amount of bytes written
         """
 
-        data = await self.read()
         if isinstance(fp, BufferedIOBase):
-            written = fp.write(data)
+            res = await self.http.request_asset(self.url)
+            async with res:
+                write = fp.write if isinstance(fp, BytesIO) else _threaded(fp.write)
+                written = await _write_chunks(res, write, chunk_size, progress, 0)
             if seek_begin:
                 fp.seek(0)
             return written
-        else:
-            with open(fp, "wb") as f:
-                return f.write(data)
+
+        path = os.fsdecode(fp)
+        validator_path = path + VALIDATOR_SUFFIX
+        offset = 0
+        validator = None
+        if resume:
+            # Without a validator we can't tell whether what's on disk is still the same asset
+            validator = await asyncio.to_thread(_read_text, validator_path)
+            if validator is not None:
+                try:
+                    offset = await asyncio.to_thread(os.path.getsize, path)
+                except OSError:
+                    pass
+
+        while True:
+            headers = {"If-Range": validator} if offset and validator else None
+            res = await self.http.request_asset(
+                self.url, offset=offset, headers=headers
+            )
+            async with res:
+                if res.status == 416:
+                    if _get_range_total(res.headers) == offset:
+                        # There is nothing past what we already have.
+                        await asyncio.to_thread(_remove, validator_path)
+                        return 0
+
+                    # The file is bigger than the asset, so it isn't the asset
+                    offset = 0
+                    continue
+
+                if res.status != 206:
+                    # Either kick can't resume the asset, or it changed since
+                    offset = 0
+                    validator = _get_validator(res.headers)
+                    if resume and validator is not None:
+                        await asyncio.to_thread(_write_text, validator_path, validator)
+                    elif resume:
+                        await asyncio.to_thread(_remove, validator_path)
+
+                f = await asyncio.to_thread(open, path, "ab" if offset else "wb")
+                try:
+                    written = await _write_chunks(
+                        res, _threaded(f.write), chunk_size, progress, offset
+                    )
+                finally:
+                    await asyncio.to_thread(f.close)
+
+            if resume:
+                await asyncio.to_thread(_remove, validator_path)
+            return written
 
     def __str__(self) -> str:
         return self.url
@@ -0,0 +1,491 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import itertools
+import logging
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    Literal,
+    Optional,
+    Union,
+)
+from urllib.parse import quote
+
+from .enums import CircuitState
+from .errors import CloudflareBypassException
+from .transports import TransportResponse
+
+LOGGER = logging.getLogger(__name__)
+
+__all__ = ("CircuitBreaker", "BypassEndpoint", "BypassPool")
+
+
+class CircuitBreaker:
+    """
+    Stops requests from piling up on a bypass script that is down.
+
+    After enough consecutive connection failures the circuit opens, and
+    requests fail right away with `CloudflareBypassException` instead of
+    each waiting on a connection error. While open, the bypass script is
+    probed in the background. Once a probe succeeds, the circuit closes
+    again.
+
+    Parameters
+    -----------
+    failure_threshold: int = 5
+        The amount of consecutive failures that opens the circuit
+    recovery_timeout: float = 5.0
+        How many seconds to wait between probes while the circuit is open
+
+    Attributes
+    -----------
+    state: CircuitState
+        The circuit's current state
+    failures: int
+        The amount of consecutive failures
+    failure_threshold: int
+        The amount of consecutive failures that opens the circuit
+    recovery_timeout: float
+        How many seconds to wait between probes while the circuit is open
+    opened_at: float | None
+        When the circuit was last opened, in `time.monotonic` time
+    """
+
+    def __init__(
+        self, *, failure_threshold: int = 5, recovery_timeout: float = 5.0
+    ) -> None:
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+
+        self.failure_threshold: int = failure_threshold
+        self.recovery_timeout: float = recovery_timeout
+        self.state: CircuitState = CircuitState.closed
+        self.failures: int = 0
+        self.opened_at: Optional[float] = None
+
+        self._probe: Optional[Callable[[], Awaitable[bool]]] = None
+        self._on_state_change: Optional[
+            Callable[[CircuitState, CircuitState], Any]
+        ] = None
+        self._probe_task: Optional[asyncio.Task[None]] = None
+
+    def __repr__(self) -> str:
+        return f"<CircuitBreaker state={self.state.value!r} failures={self.failures}>"
+
+    def _bind(
+        self,
+        *,
+        probe: Callable[[], Awaitable[bool]],
+        on_state_change: Callable[[CircuitState, CircuitState], Any],
+    ) -> None:
+        self._probe = probe
+        self._on_state_change = on_state_change
+
+    def _set_state(self, state: CircuitState) -> None:
+        before = self.state
+        if before is state:
+            return
+
+        self.state = state
+        LOGGER.warning(f"Bypass circuit changed from {before.value} to {state.value}")
+        if self._on_state_change is not None:
+            self._on_state_change(before, state)
+
+    def check(self) -> None:
+        """
+        Raises `CloudflareBypassException` if requests should not be made right now.
+        """
+
+        if self.state is not CircuitState.closed:
+            raise CloudflareBypassException(
+                "Bypass script is unavailable, not attempting to connect"
+            )
+
+    def record_success(self) -> None:
+        """
+        Records that a request reached the bypass script.
+        """
+
+        self.failures = 0
+        if self.state is not CircuitState.closed:
+            self._close()
+
+    def record_failure(self) -> None:
+        """
+        Records that a request could not reach the bypass script.
+        """
+
+        self.failures += 1
+        if (
+            self.state is CircuitState.closed
+            and self.failures >= self.failure_threshold
+        ):
+            self._open()
+
+    def _open(self) -> None:
+        self.opened_at = time.monotonic()
+        self._set_state(CircuitState.open)
+
+        if self._probe is not None and (
+            self._probe_task is None or self._probe_task.done()
+        ):
+            self._probe_task = asyncio.create_task(
+                self._probe_loop(), name="bypass-circuit-probe"
+            )
+
+    def _close(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._set_state(CircuitState.closed)
+
+    async def _probe_loop(self) -> None:
+        assert self._probe is not None
+
+        # The circuit stays open while probing, so an outage is one state change
+        while self.state is not CircuitState.closed:
+            await asyncio.sleep(self.recovery_timeout)
+
+            try:
+                healthy = await self._probe()
+            except Exception:
+                healthy = False
+
+            if healthy:
+                self._close()
+
+    def close(self) -> None:
+        """
+        Stops probing in the background.
+        """
+
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            self._probe_task = None
+
+
+class BypassEndpoint:
+    """
+    A single bypass script that requests can be sent through.
+
+    Parameters
+    -----------
+    url: str
+        The bypass script's base url, for example `"http://localhost:9090"`
+    circuit_breaker: Optional[CircuitBreaker]
+        The circuit breaker that ejects the endpoint while it is down
+
+    Attributes
+    -----------
+    url: str
+        The bypass script's base url
+    circuit_breaker: CircuitBreaker
+        The circuit breaker that ejects the endpoint while it is down
+    outstanding: int
+        The amount of requests currently in flight through this endpoint
+    requests: int
+        The amount of requests that reached this endpoint
+    failures: int
+        The amount of requests that could not connect to this endpoint
+    latency: float | None
+        A moving average of this endpoint's response time, in seconds
+    """
+
+    def __init__(
+        self, url: str, *, circuit_breaker: Optional[CircuitBreaker] = None
+    ) -> None:
+        self.url: str = url.rstrip("/")
+        self.circuit_breaker: CircuitBreaker = circuit_breaker or CircuitBreaker()
+        self.outstanding: int = 0
+        self.requests: int = 0
+        self.failures: int = 0
+        self.latency: Optional[float] = None
+
+    def __repr__(self) -> str:
+        return f"<BypassEndpoint url={self.url!r} state={self.state.value!r} outstanding={self.outstanding}>"
+
+    @property
+    def state(self) -> CircuitState:
+        """The state of the endpoint's circuit breaker"""
+
+        return self.circuit_breaker.state
+
+    @property
+    def healthy(self) -> bool:
+        """Whether requests can be sent through this endpoint"""
+
+        return self.circuit_breaker.state is CircuitState.closed
+
+    def request_url(self, url: str) -> str:
+        """
+        Returns the url to request through the bypass script for the given kick url.
+        """
+
+        return f"{self.url}/request?url={quote(url)}"
+
+    def record_success(self, latency: float) -> None:
+        self.requests += 1
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += (latency - self.latency) * 0.2
+        self.circuit_breaker.record_success()
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.circuit_breaker.record_failure()
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns the endpoint's state and counters.
+        """
+
+        return {
+            "url": self.url,
+            "state": self.state.value,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+            "latency": self.latency,
+        }
+
+
+class BypassPool:
+    """
+    Spreads requests over one or more bypass scripts.
+
+    Endpoints whose circuit breaker is open are skipped until they recover.
+
+    Parameters
+    -----------
+    endpoints: Iterable[str | BypassEndpoint]
+        The bypass scripts to use
+    strategy: Literal["least_outstanding", "round_robin"] = "least_outstanding"
+        How to pick the endpoint for a request. `"least_outstanding"` picks
+        the one with the least requests in flight, preferring the faster one
+        when tied. `"round_robin"` takes turns.
+
+    Attributes
+    -----------
+    endpoints: list[BypassEndpoint]
+        The bypass scripts
+    strategy: str
+        How the endpoint for a request is picked
+    """
+
+    def __init__(
+        self,
+        endpoints: Iterable[Union[str, BypassEndpoint]],
+        *,
+        strategy: Literal["least_outstanding", "round_robin"] = "least_outstanding",
+    ) -> None:
+        if strategy not in ("least_outstanding", "round_robin"):
+            raise ValueError(f"Unknown bypass strategy: {strategy!r}")
+
+        self.endpoints: list[BypassEndpoint] = [
+            e if isinstance(e, BypassEndpoint) else BypassEndpoint(e)
+            for e in endpoints
+        ]
+        if not self.endpoints:
+            raise ValueError("At least one bypass endpoint is required")
+
+        self.strategy: str = strategy
+        self._counter = itertools.count()
+
+    def __repr__(self) -> str:
+        return f"<BypassPool endpoints={len(self.endpoints)} strategy={self.strategy!r}>"
+
+    @property
+    def stats(self) -> list[dict[str, Any]]:
+        """
+        Returns the state and counters of every endpoint.
+        """
+
+        return [endpoint.stats for endpoint in self.endpoints]
+
+    def select(self, *, exclude: Iterable[BypassEndpoint] = ()) -> BypassEndpoint:
+        """
+        Picks the endpoint for the next request.
+
+        Raises
+        -----------
+        CloudflareBypassException
+            No endpoint is available
+
+        Returns
+        -----------
+        BypassEndpoint
+            The endpoint to use
+        """
+
+        excluded = set(exclude)
+        candidates = [e for e in self.endpoints if e.healthy and e not in excluded]
+        if not candidates:
+            if excluded:
+                raise CloudflareBypassException("Could Not Connect To Bypass Script")
+            raise CloudflareBypassException(
+                "Bypass script is unavailable, not attempting to connect"
+            )
+
+        if self.strategy == "round_robin":
+            return candidates[next(self._counter) % len(candidates)]
+
+        return min(candidates, key=lambda e: (e.outstanding, e.latency or 0.0))
+
+    def close(self) -> None:
+        """
+        Stops probing the endpoints in the background.
+        """
+
+        for endpoint in self.endpoints:
+            endpoint.circuit_breaker.close()
+
+
+class RequestBatcher:
+    """
+    Groups requests made at about the same time into batches for the bypass script's `/batch` endpoint.
+
+    A batch is sent once it is full, or once `delay` seconds passed since
+    its first request, whichever comes first. The bypass script streams the
+    responses back as they finish, so a slow request doesn't hold up the
+    rest of its batch.
+    """
+
+    def __init__(
+        self,
+        send_batch: Callable[[list[dict[str, Any]]], AsyncIterator[dict[str, Any]]],
+        *,
+        max_size: int = 32,
+        delay: float = 0.005,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self.max_size: int = max_size
+        self.delay: float = delay
+        self.batches: int = 0
+        self.requests: int = 0
+
+        self._send_batch = send_batch
+        self._pending: list[tuple[dict[str, Any], asyncio.Future[TransportResponse]]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # The batches in flight, with the futures of their requests
+        self._tasks: dict[
+            asyncio.Task[None], list[asyncio.Future[TransportResponse]]
+        ] = {}
+
+    def __repr__(self) -> str:
+        return f"<RequestBatcher batches={self.batches} requests={self.requests} pending={len(self._pending)}>"
+
+    async def submit(self, request: dict[str, Any]) -> TransportResponse:
+        """
+        |coro|
+
+        Adds a request to the next batch, and waits for its response.
+        The request is a dict with a `method`, `url`, `headers` and `body`.
+        """
+
+        future: asyncio.Future[TransportResponse] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._pending.append((request, future))
+
+        if len(self._pending) >= self.max_size:
+            self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self.delay, self.flush
+            )
+
+        return await future
+
+    def flush(self) -> None:
+        """
+        Sends the pending requests right away.
+        """
+
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        task = asyncio.create_task(self._run(pending), name="bypass-batch")
+        self._tasks[task] = [future for _, future in pending]
+        task.add_done_callback(self._forget)
+
+    async def _run(
+        self, pending: list[tuple[dict[str, Any], asyncio.Future[TransportResponse]]]
+    ) -> None:
+        self.batches += 1
+        self.requests += len(pending)
+
+        futures: dict[int, asyncio.Future[TransportResponse]] = {}
+        batch: list[dict[str, Any]] = []
+        for id, (request, future) in enumerate(pending):
+            futures[id] = future
+            batch.append({"id": id, **request})
+
+        try:
+            # Closes the response as soon as we stop reading it, even on errors or cancellation
+            async with contextlib.aclosing(self._send_batch(batch)) as results:
+                async for result in results:
+                    future = futures.pop(result["id"], None)
+                    if future is not None and not future.done():
+                        future.set_result(
+                            TransportResponse(
+                                result["status"],
+                                result.get("headers") or {},
+                                (result.get("body") or "").encode("utf-8"),
+                            )
+                        )
+        except asyncio.CancelledError:
+            # Such as when the client closes, requests waiting on the batch fail instead of hanging
+            self._fail(futures.values(), "The batch was cancelled")
+            raise
+        except Exception as e:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for future in futures.values():
+            if not future.done():
+                future.set_exception(
+                    CloudflareBypassException("Bypass script did not answer the request")
+                )
+
+    def _forget(self, task: asyncio.Task[None]) -> None:
+        self._tasks.pop(task, None)
+
+    def _fail(
+        self, futures: Iterable[asyncio.Future[TransportResponse]], reason: str
+    ) -> None:
+        for future in futures:
+            if not future.done():
+                future.set_exception(CloudflareBypassException(reason))
+
+    def close(self) -> None:
+        """
+        Cancels the batches that are in flight.
+        Requests waiting on them, or on a batch that wasn't sent yet, raise `CloudflareBypassException`.
+        """
+
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        pending, self._pending = self._pending, []
+        self._fail((future for _, future in pending), "The client was closed")
+        for task, futures in self._tasks.items():
+            # A batch that hasn't started running can't fail its own futures
+            self._fail(futures, "The client was closed")
+            task.cancel()
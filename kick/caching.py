@@ -0,0 +1,434 @@
+from __future__ import annotations
+
+import asyncio
+import copy
+import logging
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Coroutine, Hashable, Mapping, Optional
+
+if TYPE_CHECKING:
+    from .http import Route
+
+LOGGER = logging.getLogger(__name__)
+
+__all__ = ("CacheEntry", "ResponseCache")
+
+
+class RequestCoalescer:
+    """
+    Makes identical requests that are in flight at the same time share one round trip.
+
+    The first caller for a key starts the request in its own task, and every
+    caller that comes in before it finishes awaits that same task instead of
+    making a request of its own. Each of the later callers gets its own copy
+    of the result, so mutating one payload doesn't leak into the others.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[Hashable, asyncio.Task[Any]] = {}
+        self.requests: int = 0
+        self.coalesced: int = 0
+
+    def __repr__(self) -> str:
+        return f"<RequestCoalescer requests={self.requests} coalesced={self.coalesced} inflight={len(self._inflight)}>"
+
+    @property
+    def inflight(self) -> int:
+        """The amount of requests currently in flight"""
+
+        return len(self._inflight)
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """
+        Returns how many requests went through the coalescer, and how many of those were saved.
+        """
+
+        return {
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+        }
+
+    def _on_done(self, key: Hashable, task: asyncio.Task[Any]) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+        # Every caller may have been cancelled while the request kept going,
+        # so make sure a failure doesn't get reported as never retrieved.
+        if not task.cancelled():
+            task.exception()
+
+    async def run(
+        self, key: Hashable, factory: Callable[[], Coroutine[Any, Any, Any]]
+    ) -> Any:
+        """
+        |coro|
+
+        Runs the coroutine returned by `factory`, unless a request with the same key is already in flight.
+        """
+
+        self.requests += 1
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            LOGGER.debug(f"Coalesced request into one already in flight: {key!r}")
+            return copy.deepcopy(await asyncio.shield(task))
+
+        task = asyncio.create_task(factory(), name=f"coalesced-request: {key!r}")
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._on_done(key, t))
+        return await asyncio.shield(task)
+
+
+class CacheEntry:
+    """
+    A response stored in a `ResponseCache`.
+
+    Attributes
+    -----------
+    key: str
+        The url the response was fetched from
+    bucket: str
+        The route's method and path template
+    parameters: dict[str, Any]
+        The parameters the route's path was formatted with
+    body: bytes
+        The raw response body
+    expires_at: float
+        When the entry stops being fresh, in `time.monotonic` time
+    etag: str | None
+        The response's `ETag` header
+    last_modified: str | None
+        The response's `Last-Modified` header
+    """
+
+    __slots__ = (
+        "key",
+        "bucket",
+        "parameters",
+        "body",
+        "expires_at",
+        "etag",
+        "last_modified",
+    )
+
+    def __init__(
+        self,
+        *,
+        key: str,
+        bucket: str,
+        parameters: dict[str, Any],
+        body: bytes,
+        expires_at: float,
+        etag: Optional[str],
+        last_modified: Optional[str],
+    ) -> None:
+        self.key = key
+        self.bucket = bucket
+        self.parameters = parameters
+        self.body = body
+        self.expires_at = expires_at
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def __repr__(self) -> str:
+        return f"<CacheEntry key={self.key!r} size={self.size} fresh={self.fresh}>"
+
+    @property
+    def size(self) -> int:
+        """The size of the body, in bytes"""
+
+        return len(self.body)
+
+    @property
+    def fresh(self) -> bool:
+        """Whether the entry can be used without asking kick"""
+
+        return time.monotonic() < self.expires_at
+
+    @property
+    def revalidatable(self) -> bool:
+        """Whether the entry can be revalidated with a conditional request once it is stale"""
+
+        return self.etag is not None or self.last_modified is not None
+
+    @property
+    def validators(self) -> dict[str, str]:
+        """The conditional request headers to revalidate the entry with"""
+
+        headers = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    An LRU cache for responses of read-only endpoints.
+
+    Only routes with a TTL are cached. Once an entry goes stale, it is revalidated
+    with `If-None-Match`/`If-Modified-Since` when kick gave us an `ETag` or `Last-Modified`
+    header, otherwise it is dropped. Successful writes automatically invalidate the
+    entries they affect.
+
+    Subclass this and override its methods to plug in a different storage.
+
+    Parameters
+    -----------
+    ttls: Optional[Mapping[str, float]]
+        TTLs in seconds, keyed by the route's method and path template, for example
+        `"GET /channels/{streamer}/chatroom/rules"`. These are merged into `ResponseCache.DEFAULT_TTLS`.
+        Set a route's TTL to `0` to stop it from being cached.
+    max_entries: int = 1024
+        The maximum amount of entries to keep
+    max_bytes: int = 16777216
+        The maximum amount of body bytes to keep
+
+    Attributes
+    -----------
+    ttls: dict[str, float]
+        TTLs in seconds, keyed by the route's method and path template
+    max_entries: int
+        The maximum amount of entries to keep
+    max_bytes: int
+        The maximum amount of body bytes to keep
+    size: int
+        The amount of body bytes currently kept
+    hits: int
+        How many requests were served from the cache
+    misses: int
+        How many requests were not in the cache
+    revalidations: int
+        How many stale entries kick told us are still valid
+    evictions: int
+        How many entries were dropped to stay under the limits
+    """
+
+    DEFAULT_TTLS: dict[str, float] = {
+        "GET /channels/{streamer}": 30,
+        "GET /channels/{streamer}/chatroom/rules": 300,
+        "GET /channels/{streamer}/chatroom/banned-words": 300,
+        "GET /emotes/{streamer}": 600,
+        "GET /channels/{streamer}/leaderboards": 60,
+        "GET /channels/{streamer}/videos": 300,
+    }
+
+    # A write route maps to the read routes it makes stale. Entries are
+    # invalidated when their parameters agree with the write's parameters.
+    INVALIDATES: dict[str, tuple[str, ...]] = {
+        "PUT /channels/{streamer}/chatroom": ("GET /channels/{streamer}",),
+        "POST /channels/{streamer}/bans": (
+            "GET /channels/{streamer}/bans",
+            "GET /channels/{streamer}/users/{chatter}",
+        ),
+        "DELETE /channels/{streamer}/bans/{chatter}": (
+            "GET /channels/{streamer}/bans",
+            "GET /channels/{streamer}/users/{chatter}",
+        ),
+        "POST /channels/{streamer}/polls": ("GET /channels/{streamer}/polls",),
+        "DELETE /channels/{streamer}/polls": ("GET /channels/{streamer}/polls",),
+        "POST /channels/{streamer}/polls/vote": ("GET /channels/{streamer}/polls",),
+        "PUT /stream/info": ("GET /channels/{streamer}",),
+    }
+
+    def __init__(
+        self,
+        *,
+        ttls: Optional[Mapping[str, float]] = None,
+        max_entries: int = 1024,
+        max_bytes: int = 16 * 1024 * 1024,
+    ) -> None:
+        self.ttls: dict[str, float] = {**self.DEFAULT_TTLS, **(ttls or {})}
+        self.max_entries: int = max_entries
+        self.max_bytes: int = max_bytes
+        self.size: int = 0
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.revalidations: int = 0
+        self.evictions: int = 0
+
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._buckets: dict[str, set[str]] = {}
+
+    def __repr__(self) -> str:
+        return f"<ResponseCache entries={len(self._entries)} size={self.size} hits={self.hits} misses={self.misses}>"
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """
+        Returns the cache's counters.
+        """
+
+        return {
+            "entries": len(self._entries),
+            "size": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "evictions": self.evictions,
+        }
+
+    def ttl_for(self, route: Route) -> float:
+        """
+        Returns how long a route's responses can be cached for. `0` means never.
+        """
+
+        return self.ttls.get(route.bucket, 0)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """
+        Returns the entry for a url, if there is one that is fresh or can be revalidated.
+        """
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.fresh:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+
+        self.misses += 1
+        if entry.revalidatable:
+            return entry
+
+        self._remove(key)
+        return None
+
+    def store(
+        self, route: Route, key: str, body: bytes, headers: Mapping[str, str]
+    ) -> None:
+        """
+        Stores a response's body, if the route can be cached.
+        """
+
+        ttl = self.ttl_for(route)
+        if ttl <= 0 or len(body) > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        entry = CacheEntry(
+            key=key,
+            bucket=route.bucket,
+            parameters=route.parameters,
+            body=body,
+            expires_at=time.monotonic() + ttl,
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+        )
+        self._entries[key] = entry
+        self._buckets.setdefault(entry.bucket, set()).add(key)
+        self.size += entry.size
+        self._evict()
+
+    def revalidate(self, key: str) -> Optional[CacheEntry]:
+        """
+        Marks an entry as fresh again after kick responded with a 304.
+        """
+
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        entry.expires_at = time.monotonic() + self.ttls.get(entry.bucket, 0)
+        self._entries.move_to_end(key)
+        self.revalidations += 1
+        return entry
+
+    def invalidate(self, key: str) -> bool:
+        """
+        Removes the entry for a url.
+
+        Returns
+        -----------
+        bool
+            Whether there was an entry to remove
+        """
+
+        if key not in self._entries:
+            return False
+        self._remove(key)
+        return True
+
+    def invalidate_bucket(self, bucket: str, **parameters: Any) -> int:
+        """
+        Removes the entries of a route, for example `"GET /channels/{streamer}"`.
+
+        If parameters are given, only the entries that were fetched with the same values are removed.
+
+        Returns
+        -----------
+        int
+            The amount of entries removed
+        """
+
+        removed = 0
+        for key in list(self._buckets.get(bucket, ())):
+            entry = self._entries[key]
+            if all(
+                entry.parameters.get(name, value) == value
+                for name, value in parameters.items()
+            ):
+                self._remove(key)
+                removed += 1
+        return removed
+
+    def invalidate_route(self, route: Route) -> int:
+        """
+        Removes the entries a write to the given route makes stale.
+
+        Returns
+        -----------
+        int
+            The amount of entries removed
+        """
+
+        removed = 0
+        for bucket in self.INVALIDATES.get(route.bucket, ()):
+            removed += self.invalidate_bucket(bucket, **route.parameters)
+        if removed:
+            LOGGER.debug(f"{route.bucket} invalidated {removed} cached responses")
+        return removed
+
+    def clear(self) -> None:
+        """
+        Removes every entry.
+        """
+
+        self._entries.clear()
+        self._buckets.clear()
+        self.size = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self.size -= entry.size
+
+        keys = self._buckets.get(entry.bucket)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._buckets[entry.bucket]
+
+    def _evict(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries or self.size > self.max_bytes
+        ):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import asyncio
+from collections import deque
 from datetime import datetime
-from typing import TYPE_CHECKING, AsyncIterator, Optional
+from typing import TYPE_CHECKING, Any, AsyncIterator, Optional
 
 from kick.http import HTTPClient
 
@@ -13,12 +15,15 @@ from .users import PartialUser
 from .utils import cached_property
 
 if TYPE_CHECKING:
+    from typing_extensions import Self
+
     from .chatter import Chatter
+    from .message import Message
     from .types.chatroom import BanEntryPayload
     from .types.user import ChatroomPayload
     from .users import User
 
-__all__ = ("Chatroom", "BanEntry", "PartialChatroom")
+__all__ = ("Chatroom", "BanEntry", "PartialChatroom", "MessageStream")
 
 
 class BanEntry(HTTPDataclass["BanEntryPayload"]):
@@ -125,6 +130,109 @@ class BanEntry(HTTPDataclass["BanEntryPayload"]):
         await self.http.unban_user(self.chatroom.streamer_name, self.user.username)
 
 
+class MessageStream:
+    """
+    An async iterator over the messages sent in a chatroom, made with `PartialChatroom.messages`.
+
+    Each stream has its own buffer. Once it is full, the oldest message is dropped
+    to make room, so a slow consumer only misses its own messages, and never holds up
+    the websocket or other streams. The stream connects to the chatroom when it's first
+    iterated over if it isn't already, and disconnects from it when closed.
+
+    It can be used as an async context manager, which closes it on exit.
+
+    Attributes
+    -----------
+    chatroom: `PartialChatroom`
+        The chatroom the messages are from
+    buffer: int
+        The most messages the stream holds before dropping the oldest one
+    dropped: int
+        How many messages were dropped because the buffer was full
+    """
+
+    def __init__(self, chatroom: PartialChatroom, *, buffer: int) -> None:
+        if buffer < 1:
+            raise ValueError("buffer must be at least 1")
+
+        self.chatroom: PartialChatroom = chatroom
+        self.buffer: int = buffer
+        self.dropped: int = 0
+
+        self._messages: deque[Message] = deque()
+        self._waiter: Optional[asyncio.Future[None]] = None
+        self._started: bool = False
+        self._closed: bool = False
+
+    def __repr__(self) -> str:
+        return f"<MessageStream chatroom={self.chatroom.id} pending={len(self._messages)} dropped={self.dropped}>"
+
+    @property
+    def pending(self) -> int:
+        """How many messages are waiting to be iterated over"""
+
+        return len(self._messages)
+
+    def _put(self, message: Message) -> None:
+        if len(self._messages) >= self.buffer:
+            self._messages.popleft()
+            self.dropped += 1
+        self._messages.append(message)
+
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def _start(self) -> None:
+        self._started = True
+        try:
+            await self.chatroom.http.client._add_stream(self)
+        except BaseException:
+            self._started = False
+            raise
+
+    def __aiter__(self) -> Self:
+        return self
+
+    async def __anext__(self) -> Message:
+        if not self._started and not self._closed:
+            await self._start()
+
+        while not self._messages:
+            if self._closed:
+                raise StopAsyncIteration
+
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+
+        return self._messages.popleft()
+
+    async def close(self) -> None:
+        """
+        |coro|
+
+        Stops the stream. Messages that are already buffered can still be iterated over.
+        """
+
+        if self._closed:
+            return
+
+        self._closed = True
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+        if self._started:
+            await self.chatroom.http.client._remove_stream(self)
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+
 class PartialChatroom:
     """
     A dataclass that represents a kick chatroom.
@@ -162,6 +270,27 @@ class PartialChatroom:
         await self.http.ws.unsubscribe_to_chatroom(self.id)
         self.http.client._chatrooms.pop(self.id)
 
+    def messages(self, *, buffer: int = 100) -> MessageStream:
+        """
+        Makes an async iterator over the messages sent in the chatroom from now on,
+        for use with `async for`.
+
+        Messages are routed to streams by chatroom, so a stream only sees its own chatroom's messages,
+        and each stream has its own buffer. This does not work with the `event_workers` option.
+
+        Parameters
+        -----------
+        buffer: int = 100
+            The most messages to hold before dropping the oldest one
+
+        Returns
+        -----------
+        `MessageStream`
+            The stream
+        """
+
+        return MessageStream(self, buffer=buffer)
+
     async def send(self, content: str, /) -> None:
         """
         |coro|
@@ -1,12 +1,18 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from logging import getLogger
-from typing import TYPE_CHECKING, Any, Callable, Coroutine, TypeVar
+from typing import TYPE_CHECKING, Any, Callable, Coroutine, Iterable, TypeVar
 
-from .chatroom import Chatroom, PartialChatroom
+from .chatroom import Chatroom, MessageStream, PartialChatroom
 from .chatter import PartialChatter
+from .downloads import AssetDownloader
+from .executors import ExecutorListener
 from .http import HTTPClient
 from .livestream import PartialLivestream
 from .message import Message
@@ -16,9 +22,15 @@ from .utils import MISSING, decorator, setup_logging
 
 if TYPE_CHECKING:
     from typing_extensions import Self
+    from .assets import Asset
     from .categories import CategorySearchResult
+    from .bypass import BypassEndpoint
+    from .downloads import DownloadManifest
+    from .enums import CircuitState
+    from .queues import EventQueue
 
 EventT = TypeVar("EventT", bound=Callable[..., Coroutine[Any, Any, None]])
+ListenerT = TypeVar("ListenerT", bound=Callable[..., Any])
 LOGGER = getLogger(__name__)
 
 __all__ = ("Credentials", "Client")
@@ -70,6 +82,38 @@ class Credentials:
         self.one_time_password: str | None = one_time_password
 
 
+class _Listener:
+    __slots__ = ("func", "inline", "original")
+
+    def __init__(
+        self,
+        func: Callable[..., Any],
+        *,
+        inline: bool = False,
+        original: Callable[..., Any] | None = None,
+    ) -> None:
+        self.func = func
+        self.inline = inline
+        # What the listener was added with, when `func` wraps it
+        self.original = original or func
+
+    @property
+    def options(self) -> dict[str, Any]:
+        if isinstance(self.func, ExecutorListener):
+            return {"executor": self.func.executor, "ordered": self.func.ordered}
+        return {"inline": self.inline} if self.inline else {}
+
+
+class _Waiter:
+    __slots__ = ("future", "check")
+
+    def __init__(
+        self, future: asyncio.Future[Any], check: Callable[..., bool] | None
+    ) -> None:
+        self.future = future
+        self.check = check
+
+
 class Client:
     """
     This repersents the Client you can use to interact with kick.
@@ -87,6 +131,83 @@ class Client:
         The port the bypass script is running on. Defaults to 9090
     bypass_host: str = "http://localhost"
         The host of the bypass script.
+    retry_policy: RetryPolicy = RetryPolicy()
+        How requests are retried when kick ratelimits us or errors internally.
+    session: aiohttp.ClientSession = None
+        A session to make requests with. It can be shared between multiple clients, and is not closed by `Client.close`.
+    connector: aiohttp.BaseConnector = None
+        A connector to create the session with. Pass the same connector to multiple clients to share one connection pool.
+        It is not closed by `Client.close`. Ignored if `session` is passed.
+    connection_limit: int = 100
+        The total amount of simultaneous connections. Ignored if `session` or `connector` is passed.
+    connection_limit_per_host: int = 0
+        The amount of simultaneous connections to the same host, 0 means no limit. Ignored if `session` or `connector` is passed.
+    keepalive_timeout: float = 60.0
+        How many seconds idle connections are kept open for reuse. Ignored if `session` or `connector` is passed.
+    dns_cache_ttl: int = 300
+        How many seconds DNS lookups are cached for. Ignored if `session` or `connector` is passed.
+    coalesce_requests: bool = False
+        If identical GET requests made at the same time should share a single request.
+        How many requests were saved can be seen in `Client.http.coalescer.stats`.
+    response_cache: ResponseCache = None
+        A cache for responses of read-only endpoints, such as users, chatroom rules, banned words and emotes.
+        Writes that go through the client invalidate the affected entries automatically.
+    bypass_circuit_breaker: CircuitBreaker = CircuitBreaker()
+        Makes requests fail fast while the bypass script is down, instead of each one waiting to fail to connect.
+        State changes are dispatched as `on_bypass_state_change`. Ignored if `bypass_endpoints` is passed.
+    bypass_endpoints: list[str | BypassEndpoint] = None
+        Multiple bypass scripts to spread requests over, for example `["http://localhost:9090", "http://localhost:9091"]`.
+        Endpoints that go down are skipped until they recover. Replaces `bypass_host` and `bypass_port`.
+    bypass_strategy: str = "least_outstanding"
+        How to pick the bypass script for a request when there are multiple. Either `"least_outstanding"` or `"round_robin"`.
+        Per endpoint stats can be seen in `Client.http.bypass.stats`.
+    batch_requests: bool = False
+        Whether requests made at about the same time should be sent to the bypass script together, in one request to its `/batch` endpoint.
+        This saves a round trip to the bypass script per request when making many requests at once.
+        Requires a bypass script created by this version of kick.py. Ignored if `whitelisted` is True.
+    batch_size: int = 32
+        The maximum amount of requests in a batch
+    batch_delay: float = 0.005
+        How many seconds to wait for more requests before sending a batch that isn't full
+    transport: Transport = AiohttpTransport()
+        What requests to kick and the bypass script are sent with, for example a `MemoryTransport` for benchmarks.
+        Retries, ratelimits, caching and errors are handled the same way for every transport. It is closed by `Client.close`.
+        Asset streaming and the websocket still use the session, and `batch_requests` is ignored when this is passed.
+    reconnect: bool = True
+        Whether to reconnect to the websocket when the connection drops. Every chatroom and user you were
+        connected to or watching is subscribed to again, and `on_disconnect` and `on_resumed` are dispatched.
+    backfill_messages: bool = True
+        Whether messages sent while reconnecting are fetched and dispatched to `on_message` after reconnecting
+    ws_url: str = None
+        The url of the pusher websocket to receive events from. Defaults to kick's.
+    shard_count: int = 1
+        How many websocket connections to spread chatroom and channel subscriptions over.
+        A chatroom's events always come from the same connection, so they stay in order.
+        If a connection closes for good, its subscriptions are moved to the others.
+    channels_per_shard: int = None
+        The most subscriptions one websocket connection can have. More connections are opened once they are all full.
+    event_workers: int = 0
+        How many processes to run `on_message` and `on_livestream_start` in, so slow handlers don't hold up the websocket.
+        This process still reads and decodes the websocket, and sends the payloads to the workers, which build the objects and run the handlers.
+        A chatroom's events always go to the same worker, and are handled one at a time, in order. Other events are still handled in this process.
+        Each worker has its own `HTTPClient`, and the client is copied into them when the websocket starts, so set handlers before that.
+        Per worker stats can be seen in `Client.http.event_workers.stats`.
+    event_worker_backlog: int = 10000
+        The most payloads that can wait for each event worker, both to be sent to it and inside it. Once a worker's backlog is full,
+        new payloads for it are dropped and counted in its `dropped` stat, instead of using more and more memory.
+    event_queue: EventQueue = None
+        Sends events through the bounded queues of an `EventQueue`, handled by a fixed amount of tasks, instead of giving each event its own task.
+        This bounds how much memory and latency a burst of events can cause. Queue depths and drops can be seen on the `EventQueue`.
+    handler_threads: int = None
+        The most threads listeners added with `executor="thread"` can use. Defaults to `concurrent.futures.ThreadPoolExecutor`'s default.
+    handler_processes: int = None
+        The most processes listeners added with `executor="process"` can use. Defaults to the amount of cores.
+    start_method: str = None
+        The multiprocessing start method used by `event_workers` and `executor="process"` listeners, such as `"fork"` or `"spawn"`. Defaults to the platform's default.
+        With a start method other than `"fork"`, the options and handlers must be picklable.
+    json_codec: str | JSONCodec = "auto"
+        The JSON codec used for requests, responses and websocket frames. Either a `JSONCodec` or one of `"json"`, `"orjson"` and `"msgspec"`.
+        `"auto"` uses orjson or msgspec when they are installed, and the standard library otherwise.
 
     Attributes
     -----------
@@ -99,12 +220,64 @@ class Client:
         self.http = HTTPClient(self)
         self._chatrooms: dict[int, Chatroom | PartialChatroom] = {}
         self._watched_users: dict[int, User] = {}
+        self._message_streams: dict[int, list[MessageStream]] = {}
+        # Connects to chatrooms made because a stream was opened on them, not by the user
+        self._stream_connects: dict[int, asyncio.Task[None]] = {}
+        # Pending `Client.wait_for` calls, by event, then by (chatroom id, author id)
+        self._waiters: dict[
+            str, dict[tuple[int | None, int | None], dict[_Waiter, None]]
+        ] = {}
+        self._waiter_listeners: dict[str, Callable[..., None]] = {}
+        self._executors: dict[str, Executor] = {}
         self.user: ClientUser | None = None
 
+        # Resolved when listeners are added, so dispatching only costs a dict lookup,
+        # and events without listeners cost nothing.
+        self._listeners: dict[str, tuple[_Listener, ...]] = {}
+        # The `on_` handler of each event, set by subclassing or with `Client.event`
+        self._handlers: dict[str, _Listener] = {}
+        self._event_queue: EventQueue | None = options.get("event_queue")
+        if self._event_queue is not None:
+            self._event_queue._bind(self)
+        for name in dir(type(self)):
+            if not name.startswith("on_"):
+                continue
+
+            # The events defined on `Client` are no-ops until they are overriden.
+            if getattr(type(self), name) is not getattr(Client, name, None):
+                self._set_handler(name, getattr(self, name))
+
         LOGGER.warning(
             "Kick's api is undocumented, possible unstable, and can change at any time without warning"
         )
 
+    def __getstate__(self) -> dict[str, Any]:
+        # Used when the client is copied into worker processes with a start method
+        # that pickles it, such as spawn. Only the options and listeners are kept.
+        handlers = set(self._handlers.values())
+        return {
+            "options": self._options,
+            # Handlers from subclasses are set again by `__init__`
+            "handlers": [
+                (listener.original, listener.options)
+                for event_name, listener in self._handlers.items()
+                if self.__dict__.get(f"on_{event_name}") is listener.original
+            ],
+            "listeners": [
+                (event_name, listener.original, listener.options)
+                for event_name, listeners in self._listeners.items()
+                for listener in listeners
+                if listener not in handlers
+            ],
+        }
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__init__(**state["options"])
+        for func, options in state["handlers"]:
+            self.event(func, **options)
+        for event_name, func, options in state["listeners"]:
+            self.add_listener(func, event_name, **options)
+
     def get_partial_chatroom(
         self, chatroom_id: int, streamer_name: str
     ) -> PartialChatroom:
@@ -300,23 +473,458 @@ class Client:
         data = await self.http.search_categories(query)
         return CategorySearchResult(data=data)
 
+    def _owns(self, id: int) -> bool:
+        # Whether this process handles a chatroom or channel, see `AutoShardedClient`
+        return True
+
+    async def _add_stream(self, stream: MessageStream) -> None:
+        chatroom = stream.chatroom
+        if not self._message_streams:
+            self.add_listener(self._route_message, "on_message", inline=True)
+        self._message_streams.setdefault(chatroom.id, []).append(stream)
+
+        # Only one stream connects, if the chatroom isn't connected already,
+        # and streams opened in the meantime wait for the same connect
+        connecting = self._stream_connects.get(chatroom.id)
+        if connecting is None:
+            if chatroom.id in self._chatrooms:
+                return
+            connecting = asyncio.create_task(
+                chatroom.connect(), name=f"stream-connect: {chatroom.id}"
+            )
+            self._stream_connects[chatroom.id] = connecting
+
+        try:
+            await asyncio.shield(connecting)
+        except BaseException:
+            if connecting.done() and (
+                connecting.cancelled() or connecting.exception() is not None
+            ):
+                # Nothing was subscribed to, so the next stream has to connect again
+                if self._stream_connects.get(chatroom.id) is connecting:
+                    del self._stream_connects[chatroom.id]
+            await self._remove_stream(stream)
+            raise
+
+    async def _remove_stream(self, stream: MessageStream) -> None:
+        chatroom_id = stream.chatroom.id
+        streams = self._message_streams.get(chatroom_id)
+        if streams is None or stream not in streams:
+            return
+
+        streams.remove(stream)
+        if streams:
+            return
+
+        del self._message_streams[chatroom_id]
+        if not self._message_streams:
+            self.remove_listener(self._route_message, "on_message")
+        # The last stream disconnects, if a stream is what connected
+        connecting = self._stream_connects.pop(chatroom_id, None)
+        if connecting is None:
+            return
+        if not connecting.done():
+            await asyncio.wait([connecting])
+        if not connecting.cancelled() and connecting.exception() is None:
+            await stream.chatroom.disconnect()
+
+    def _route_message(self, message: Message) -> None:
+        streams = self._message_streams.get(message.chatroom_id)
+        if streams is not None:
+            for stream in streams:
+                stream._put(message)
+
+    def _resolve_waiters(self, event_name: str, *args: Any) -> None:
+        buckets = self._waiters.get(event_name)
+        if not buckets:
+            return
+
+        first = args[0] if args else None
+        chatroom_id: int | None = getattr(first, "chatroom_id", None)
+        if isinstance(first, Message):
+            author_id: int | None = first._data["sender"]["id"]
+        else:
+            author_id = getattr(getattr(first, "author", None), "id", None)
+
+        keys = [(None, None)]
+        if chatroom_id is not None:
+            keys.append((chatroom_id, None))
+        if author_id is not None:
+            keys.append((None, author_id))
+            if chatroom_id is not None:
+                keys.append((chatroom_id, author_id))
+
+        result = None if not args else args[0] if len(args) == 1 else args
+        for key in keys:
+            bucket = buckets.get(key)
+            if bucket is None:
+                continue
+
+            for waiter in tuple(bucket):
+                if waiter.future.done():
+                    continue
+
+                try:
+                    if waiter.check is not None and not waiter.check(*args):
+                        continue
+                except Exception as e:
+                    waiter.future.set_exception(e)
+                else:
+                    waiter.future.set_result(result)
+
+    def _has_listener(self, event_name: str) -> bool:
+        return event_name in self._listeners
+
+    async def download_assets(
+        self,
+        assets: Iterable[Asset | str],
+        dest: str | os.PathLike[str],
+        *,
+        concurrency: int = 8,
+        revalidate: bool = True,
+    ) -> DownloadManifest:
+        """
+        |coro|
+
+        Downloads many assets at once into a content-addressed directory.
+
+        Each unique file is stored once under `dest/objects`, and `dest/index.json`
+        remembers which url points to which file. Assets that were already downloaded
+        are only fetched again if kick says they changed, and identical bytes from
+        different urls are only stored once.
+
+        Parameters
+        -----------
+        assets: Iterable[Asset | str]
+            The assets, or asset urls, to download
+        dest: str | os.PathLike[str]
+            The directory to download the assets into
+        concurrency: int = 8
+            The maximum amount of assets to download at the same time
+        revalidate: bool = True
+            Whether to ask kick if already downloaded assets changed.
+            If False, they are skipped without making a request.
+
+        Returns
+        -----------
+        DownloadManifest
+            What happened to each asset. Failed downloads are included instead of being raised.
+        """
+
+        downloader = AssetDownloader(
+            http=self.http, dest=dest, concurrency=concurrency, revalidate=revalidate
+        )
+        return await downloader.download(assets)
+
     def dispatch(self, event_name: str, *args, **kwargs) -> None:
-        event_name = f"on_{event_name}"
+        listeners = self._listeners.get(event_name)
+        if listeners is None:
+            return
+
+        queued = False
+        for listener in listeners:
+            if listener.inline:
+                try:
+                    listener.func(*args, **kwargs)
+                except Exception:
+                    LOGGER.exception(
+                        f"Ignoring exception in inline listener {listener.func.__qualname__}"
+                    )
+            elif self._event_queue is None:
+                asyncio.create_task(
+                    listener.func(*args, **kwargs),
+                    name=f"event-dispatch: on_{event_name}",
+                )
+            elif not queued:
+                # The queue runs every listener that isn't inline, so the event is only queued once
+                self._event_queue.put(event_name, args, kwargs)
+                queued = True
+
+    async def _call_listeners(
+        self, event_name: str, *args: Any, inline: bool = True, **kwargs: Any
+    ) -> None:
+        # Runs an event's listeners one after another, instead of in new tasks
+        for listener in self._listeners.get(event_name, ()):
+            try:
+                if listener.inline:
+                    if inline:
+                        listener.func(*args, **kwargs)
+                else:
+                    await listener.func(*args, **kwargs)
+            except Exception:
+                LOGGER.exception(
+                    f"Ignoring exception in listener {listener.func.__qualname__}"
+                )
+
+    def _set_handler(
+        self, name: str, func: Callable[..., Any], **options: Any
+    ) -> None:
+        event_name = name.removeprefix("on_")
+        old = self._handlers.pop(event_name, None)
+        listeners = tuple(
+            listener
+            for listener in self._listeners.get(event_name, ())
+            if listener is not old
+        )
 
-        event = getattr(self, event_name, None)
-        if event is not None:
-            asyncio.create_task(
-                event(*args, **kwargs), name=f"event-dispatch: {event_name}"
-            )
+        new = self._make_listener(func, **options) if options else _Listener(func)
+        self._handlers[event_name] = new
+        self._listeners[event_name] = (new, *listeners)
+
+    def _make_listener(
+        self,
+        func: Callable[..., Any],
+        *,
+        inline: bool = False,
+        executor: str | Executor | None = None,
+        ordered: bool = False,
+    ) -> _Listener:
+        if executor is not None:
+            if inline:
+                raise TypeError("Inline listeners can not be run in an executor")
+            wrapper = ExecutorListener(self, func, executor, ordered=ordered)
+            return _Listener(wrapper, original=func)
+
+        if inline and asyncio.iscoroutinefunction(func):
+            raise TypeError("Inline listeners can not be coroutine functions")
+        if not inline and not asyncio.iscoroutinefunction(func):
+            raise TypeError("Listeners must be coroutine functions")
+        return _Listener(func, inline=inline)
+
+    def _get_executor(self, executor: str | Executor) -> Executor:
+        if isinstance(executor, Executor):
+            return executor
+
+        pool = self._executors.get(executor)
+        if pool is None:
+            if executor == "thread":
+                pool = ThreadPoolExecutor(
+                    max_workers=self._options.get("handler_threads"),
+                    thread_name_prefix="kick-handler",
+                )
+            else:
+                pool = ProcessPoolExecutor(
+                    max_workers=self._options.get("handler_processes"),
+                    mp_context=multiprocessing.get_context(
+                        self._options.get("start_method")
+                    ),
+                )
+            self._executors[executor] = pool
+        return pool
 
     @decorator
-    def event(self, coro: EventT) -> EventT:
+    def event(
+        self,
+        coro: EventT = MISSING,
+        /,
+        *,
+        executor: str | Executor | None = None,
+        ordered: bool = False,
+    ) -> Any:
         """
         Lets you set an event outside of a subclass.
+        This replaces the event's handler, see `Client.listen` to add more than one.
+
+        It can be used as `@client.event`, or as `@client.event(executor="process")` to run a
+        regular function handler in a pool, see `Client.add_listener`.
+
+        Parameters
+        -----------
+        executor: str | concurrent.futures.Executor | None
+            Where to run the handler, see `Client.add_listener`
+        ordered: bool = False
+            Whether to run the handler's calls for a chatroom one at a time, in order, see `Client.add_listener`
+        """
+
+        def inner(func: EventT) -> EventT:
+            if executor is None and not asyncio.iscoroutinefunction(func):
+                raise TypeError("Event handlers must be coroutine functions")
+
+            setattr(self, func.__name__, func)
+            self._set_handler(func.__name__, func, executor=executor, ordered=ordered)
+            return func
+
+        if coro is MISSING:
+            return inner
+        return inner(coro)
+
+    def add_listener(
+        self,
+        func: Callable[..., Any],
+        name: str = MISSING,
+        *,
+        inline: bool = False,
+        executor: str | Executor | None = None,
+        ordered: bool = False,
+    ) -> None:
+        """
+        Adds a listener for an event. Unlike `Client.event`, an event can have any amount of listeners.
+
+        Parameters
+        -----------
+        func: Callable[..., Any]
+            The listener. A coroutine function, or a regular function if `inline` is True or `executor` is set.
+        name: str
+            The event to listen for, such as `"on_message"`. Defaults to the function's name.
+        inline: bool = False
+            Whether to call the listener right as the event is dispatched, instead of in a new task.
+            This skips the cost of a task, but the listener holds up the websocket until it returns, so it should be quick.
+        executor: str | concurrent.futures.Executor | None
+            Runs a regular function listener somewhere other than the event loop, for CPU heavy work.
+            `"thread"` uses the client's thread pool, `"process"` uses the client's process pool, and an `Executor` is used as is.
+            In a process pool, objects such as `Message` are rebuilt from their payloads without an `HTTPClient`,
+            so their data can be used, but not their methods that make requests, and the function must be importable.
+        ordered: bool = False
+            With `executor`, whether to run the listener's calls for a chatroom one at a time, in the order the events came in.
+
+        Raises
+        -----------
+        TypeError
+            The listener is a coroutine function and `inline` or `executor` is set, or the other way around
+        """
+
+        event_name = (name or func.__name__).removeprefix("on_")
+        listener = self._make_listener(
+            func, inline=inline, executor=executor, ordered=ordered
+        )
+        listeners = self._listeners.get(event_name, ())
+        self._listeners[event_name] = (*listeners, listener)
+
+    def remove_listener(self, func: Callable[..., Any], name: str = MISSING) -> None:
+        """
+        Removes a listener added with `Client.add_listener` or `Client.listen`.
+        Nothing happens if it wasn't added.
+
+        Parameters
+        -----------
+        func: Callable[..., Any]
+            The listener
+        name: str
+            The event it listens for, such as `"on_message"`. Defaults to the function's name.
+        """
+
+        event_name = (name or func.__name__).removeprefix("on_")
+        handler = self._handlers.get(event_name)
+        listeners = tuple(
+            listener
+            for listener in self._listeners.get(event_name, ())
+            if listener.original != func or listener is handler
+        )
+
+        if listeners:
+            self._listeners[event_name] = listeners
+        else:
+            self._listeners.pop(event_name, None)
+
+    @decorator
+    def listen(
+        self,
+        name: str | ListenerT = MISSING,
+        *,
+        inline: bool = False,
+        executor: str | Executor | None = None,
+        ordered: bool = False,
+    ) -> Any:
+        """
+        Adds the decorated function as a listener, see `Client.add_listener`.
+        It can be used as `@client.listen`, or with arguments such as `@client.listen("on_message")`.
+
+        Parameters
+        -----------
+        name: str
+            The event to listen for, such as `"on_message"`. Defaults to the function's name.
+        inline: bool = False
+            Whether to call the listener right as the event is dispatched, instead of in a new task.
+        executor: str | concurrent.futures.Executor | None
+            Where to run a regular function listener, such as `"thread"` or `"process"`.
+        ordered: bool = False
+            With `executor`, whether to run the listener's calls for a chatroom one at a time, in order.
+        """
+
+        if callable(name):
+            # Used as `@client.listen`, without calling it
+            self.add_listener(name)
+            return name
+        if name is not MISSING and not isinstance(name, str):
+            raise TypeError(f"name must be a str, not {type(name).__name__}")
+
+        def inner(func: ListenerT) -> ListenerT:
+            self.add_listener(
+                func, name, inline=inline, executor=executor, ordered=ordered
+            )
+            return func
+
+        return inner
+
+    async def wait_for(
+        self,
+        event: str,
+        /,
+        *,
+        chatroom_id: int | None = None,
+        author_id: int | None = None,
+        check: Callable[..., bool] | None = None,
+        timeout: float | None = None,
+    ) -> Any:
+        """
+        |coro|
+
+        Waits for an event to be dispatched.
+
+        Waiters are indexed by chatroom and author, so each event is only checked
+        against the waiters it could match, which keeps many pending waits cheap.
+        `chatroom_id` and `author_id` only match events whose first argument has them, such as `on_message`.
+        With the `event_workers` option, messages and livestream starts are still matched in this process,
+        before they are sent to a worker.
+
+        Parameters
+        -----------
+        event: str
+            The event to wait for, such as `"message"` or `"on_message"`
+        chatroom_id: int | None
+            Only match events from this chatroom
+        author_id: int | None
+            Only match events from this author
+        check: Callable[..., bool] | None
+            Called with the event's arguments, and only matches the event if it returns True.
+            If it raises, the error is raised by `Client.wait_for`.
+        timeout: float | None
+            How many seconds to wait before giving up. Waits forever if None.
+
+        Raises
+        -----------
+        asyncio.TimeoutError
+            The timeout ran out
+
+        Returns
+        -----------
+        Any
+            None if the event has no arguments, the argument if it has one, or a tuple of them
         """
 
-        setattr(self, coro.__name__, coro)
-        return coro
+        event_name = event.removeprefix("on_")
+        key = (chatroom_id, author_id)
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), check)
+
+        buckets = self._waiters.get(event_name)
+        if buckets is None:
+            buckets = self._waiters[event_name] = {}
+            listener = functools.partial(self._resolve_waiters, event_name)
+            self._waiter_listeners[event_name] = listener
+            self.add_listener(listener, event_name, inline=True)
+        buckets.setdefault(key, {})[waiter] = None
+
+        try:
+            return await asyncio.wait_for(waiter.future, timeout)
+        finally:
+            bucket = buckets[key]
+            del bucket[waiter]
+            if not bucket:
+                del buckets[key]
+            if not buckets:
+                del self._waiters[event_name]
+                listener = self._waiter_listeners.pop(event_name)
+                self.remove_listener(listener, event_name)
 
     async def login(self, credentials: Credentials) -> None:
         """
@@ -361,6 +969,11 @@ class Client:
         """
 
         await self.http.close()
+        if self._event_queue is not None:
+            self._event_queue.close()
+        for pool in self._executors.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        self._executors.clear()
 
     async def __aenter__(self) -> Self:
         return self
@@ -443,6 +1056,42 @@ class Client:
             The streamer
         """
 
+    async def on_disconnect(self) -> None:
+        """
+        |coro|
+
+        on_disconnect is an event that can be overriden with the `Client.event` decorator or with a subclass.
+        This is called when the websocket disconnects, before trying to reconnect.
+        """
+
+    async def on_resumed(self) -> None:
+        """
+        |coro|
+
+        on_resumed is an event that can be overriden with the `Client.event` decorator or with a subclass.
+        This is called after the websocket reconnected, and everything was subscribed to again.
+        Messages that were missed are dispatched to `on_message` right after.
+        """
+
+    async def on_bypass_state_change(
+        self, endpoint: BypassEndpoint, before: CircuitState, after: CircuitState
+    ) -> None:
+        """
+        |coro|
+
+        on_bypass_state_change is an event that can be overriden with the `Client.event` decorator or with a subclass.
+        This is called when the bypass script's circuit breaker changes state, for example when the script goes down.
+
+        Parameters
+        -----------
+        endpoint: `BypassEndpoint`
+            The bypass script whose state changed
+        before: `CircuitState`
+            The previous state
+        after: `CircuitState`
+            The new state
+        """
+
     def run(
         self,
         credentials: Credentials | None = None,
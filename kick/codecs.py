@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Union
+
+__all__ = (
+    "JSONCodec",
+    "StdlibJSONCodec",
+    "OrjsonCodec",
+    "MsgspecJSONCodec",
+    "get_codec",
+)
+
+
+class JSONCodec(ABC):
+    """
+    The base class for JSON codecs used to decode responses and websocket frames, and to encode request bodies.
+
+    Codecs decode straight from bytes, so responses don't have to be turned into a `str` first.
+
+    Attributes
+    -----------
+    name: str
+        The codec's name
+    decode_errors: tuple[type[Exception], ...]
+        The exceptions `JSONCodec.loads` raises on invalid JSON
+    """
+
+    name: str = "base"
+    decode_errors: tuple[type[Exception], ...] = (ValueError,)
+
+    @abstractmethod
+    def loads(self, data: Union[bytes, str], /) -> Any:
+        """
+        Decodes JSON from bytes or a str.
+        """
+
+    @abstractmethod
+    def dumps(self, obj: Any, /) -> str:
+        """
+        Encodes an object into a JSON str.
+        """
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} name={self.name!r}>"
+
+
+class StdlibJSONCodec(JSONCodec):
+    """
+    A codec that uses the standard library's `json` module.
+    """
+
+    name = "json"
+    decode_errors = (ValueError,)
+
+    def loads(self, data: Union[bytes, str], /) -> Any:
+        return json.loads(data)
+
+    def dumps(self, obj: Any, /) -> str:
+        return json.dumps(obj)
+
+
+class OrjsonCodec(JSONCodec):
+    """
+    A codec that uses `orjson`, which has to be installed.
+    """
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+
+        self._loads = orjson.loads
+        self._dumps = orjson.dumps
+        self.decode_errors = (orjson.JSONDecodeError, ValueError)
+
+    def loads(self, data: Union[bytes, str], /) -> Any:
+        return self._loads(data)
+
+    def dumps(self, obj: Any, /) -> str:
+        return self._dumps(obj).decode("utf-8")
+
+
+class MsgspecJSONCodec(JSONCodec):
+    """
+    A codec that uses `msgspec`, which has to be installed.
+    """
+
+    name = "msgspec"
+
+    def __init__(self) -> None:
+        import msgspec
+
+        self._decoder = msgspec.json.Decoder()
+        self._encoder = msgspec.json.Encoder()
+        self.decode_errors = (msgspec.DecodeError, ValueError)
+
+    def loads(self, data: Union[bytes, str], /) -> Any:
+        return self._decoder.decode(data)
+
+    def dumps(self, obj: Any, /) -> str:
+        return self._encoder.encode(obj).decode("utf-8")
+
+
+_CODECS: dict[str, type[JSONCodec]] = {
+    "json": StdlibJSONCodec,
+    "orjson": OrjsonCodec,
+    "msgspec": MsgspecJSONCodec,
+}
+
+
+def get_codec(codec: Union[str, JSONCodec] = "auto", /) -> JSONCodec:
+    """
+    Returns a JSON codec.
+
+    Parameters
+    -----------
+    codec: str | JSONCodec = "auto"
+        Either a codec instance, which is returned as is, or the name of one: `"json"`, `"orjson"` or `"msgspec"`.
+        `"auto"` picks the fastest one that is installed, falling back to the standard library.
+
+    Raises
+    -----------
+    ValueError
+        The codec is unknown
+    ImportError
+        The codec's library is not installed
+
+    Returns
+    -----------
+    JSONCodec
+        The codec
+    """
+
+    if isinstance(codec, JSONCodec):
+        return codec
+
+    if codec == "auto":
+        for name in ("orjson", "msgspec"):
+            try:
+                return _CODECS[name]()
+            except ImportError:
+                pass
+        return StdlibJSONCodec()
+
+    try:
+        cls = _CODECS[codec]
+    except KeyError:
+        raise ValueError(f"Unknown JSON codec: {codec!r}") from None
+    return cls()
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Optional
+
+from .enums import DownloadStatus
+
+if TYPE_CHECKING:
+    from .assets import Asset
+    from .http import HTTPClient
+
+LOGGER = logging.getLogger(__name__)
+
+__all__ = ("DownloadedAsset", "DownloadManifest")
+
+INDEX_FILENAME = "index.json"
+OBJECTS_DIRNAME = "objects"
+
+
+class DownloadedAsset:
+    """
+    The outcome of downloading a single asset with `Client.download_assets`.
+
+    Attributes
+    -----------
+    url: str
+        The asset's url
+    status: DownloadStatus
+        What happened to the asset
+    path: str | None
+        Where the asset's bytes are stored. None if downloading failed
+    sha256: str | None
+        The hex digest of the asset's bytes. None if downloading failed
+    size: int
+        The asset's size in bytes
+    error: Exception | None
+        The error downloading the asset ran into, if any
+    """
+
+    def __init__(
+        self,
+        *,
+        url: str,
+        status: DownloadStatus,
+        path: Optional[str] = None,
+        sha256: Optional[str] = None,
+        size: int = 0,
+        error: Optional[Exception] = None,
+    ) -> None:
+        self.url = url
+        self.status = status
+        self.path = path
+        self.sha256 = sha256
+        self.size = size
+        self.error = error
+
+    def __repr__(self) -> str:
+        return f"<DownloadedAsset url={self.url!r} status={self.status.value!r} sha256={self.sha256!r}>"
+
+
+class DownloadManifest:
+    """
+    The result of `Client.download_assets`.
+
+    Attributes
+    -----------
+    entries: dict[str, DownloadedAsset]
+        The outcome of each asset, keyed by url
+    """
+
+    def __init__(self, entries: dict[str, DownloadedAsset]) -> None:
+        self.entries = entries
+
+    def __repr__(self) -> str:
+        counts = " ".join(
+            f"{status.value}={len(self.with_status(status))}"
+            for status in DownloadStatus
+        )
+        return f"<DownloadManifest {counts}>"
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[DownloadedAsset]:
+        return iter(self.entries.values())
+
+    def __getitem__(self, url: str) -> DownloadedAsset:
+        return self.entries[url]
+
+    def with_status(self, status: DownloadStatus) -> list[DownloadedAsset]:
+        """
+        Returns the assets with the given status.
+        """
+
+        return [entry for entry in self.entries.values() if entry.status is status]
+
+    @property
+    def failed(self) -> list[DownloadedAsset]:
+        """The assets that failed to download"""
+
+        return self.with_status(DownloadStatus.failed)
+
+    def to_dict(self) -> dict[str, dict[str, Any]]:
+        """
+        Returns the manifest as a json serializable dict.
+        """
+
+        return {
+            entry.url: {
+                "status": entry.status.value,
+                "path": entry.path,
+                "sha256": entry.sha256,
+                "size": entry.size,
+                "error": None if entry.error is None else str(entry.error),
+            }
+            for entry in self.entries.values()
+        }
+
+
+class AssetDownloader:
+    """
+    Mirrors assets into a content-addressed directory.
+
+    Bytes are stored once under `objects/<sha256[:2]>/<sha256>`, and
+    `index.json` maps each url to its digest along with the validators
+    used to ask kick whether the asset changed since.
+    """
+
+    def __init__(
+        self,
+        *,
+        http: HTTPClient,
+        dest: str | os.PathLike[str],
+        concurrency: int,
+        revalidate: bool,
+        chunk_size: int = 65536,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        self.http = http
+        self.dest = os.fspath(dest)
+        self.objects = os.path.join(self.dest, OBJECTS_DIRNAME)
+        self.revalidate = revalidate
+        self.chunk_size = chunk_size
+
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._index: dict[str, dict[str, Any]] = {}
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects, digest[:2], digest)
+
+    def _load_index(self) -> dict[str, dict[str, Any]]:
+        os.makedirs(self.objects, exist_ok=True)
+        try:
+            with open(os.path.join(self.dest, INDEX_FILENAME), "rb") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            LOGGER.warning(f"Ignoring corrupt download index in {self.dest}")
+            return {}
+
+    def _save_index(self) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.dest, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self._index, f)
+        os.replace(tmp, os.path.join(self.dest, INDEX_FILENAME))
+
+    def _store(self, tmp: str, digest: str) -> bool:
+        path = self._object_path(digest)
+        if os.path.exists(path):
+            os.remove(tmp)
+            return False
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp, path)
+        return True
+
+    async def _download(self, url: str) -> DownloadedAsset:
+        known = self._index.get(url)
+        if known is not None:
+            path = self._object_path(known["sha256"])
+            if not await asyncio.to_thread(os.path.exists, path):
+                known = None
+            elif not self.revalidate:
+                return DownloadedAsset(
+                    url=url,
+                    status=DownloadStatus.unchanged,
+                    path=path,
+                    sha256=known["sha256"],
+                    size=known["size"],
+                )
+
+        headers = {}
+        if known is not None:
+            if known.get("etag"):
+                headers["If-None-Match"] = known["etag"]
+            if known.get("last_modified"):
+                headers["If-Modified-Since"] = known["last_modified"]
+
+        res = await self.http.request_asset(url, headers=headers)
+        async with res:
+            if res.status == 304 and known is not None:
+                return DownloadedAsset(
+                    url=url,
+                    status=DownloadStatus.unchanged,
+                    path=self._object_path(known["sha256"]),
+                    sha256=known["sha256"],
+                    size=known["size"],
+                )
+
+            hasher = hashlib.sha256()
+            fd, tmp = await asyncio.to_thread(
+                tempfile.mkstemp, dir=self.objects, suffix=".part"
+            )
+            f = os.fdopen(fd, "wb")
+            size = 0
+            try:
+                async for chunk in res.content.iter_chunked(self.chunk_size):
+                    hasher.update(chunk)
+                    await asyncio.to_thread(f.write, chunk)
+                    size += len(chunk)
+            except BaseException:
+                await asyncio.to_thread(f.close)
+                await asyncio.to_thread(os.remove, tmp)
+                raise
+            await asyncio.to_thread(f.close)
+
+            etag = res.headers.get("ETag")
+            last_modified = res.headers.get("Last-Modified")
+
+        digest = hasher.hexdigest()
+        stored = await asyncio.to_thread(self._store, tmp, digest)
+
+        self._index[url] = {
+            "sha256": digest,
+            "size": size,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.time(),
+        }
+
+        if known is not None and known["sha256"] == digest:
+            status = DownloadStatus.unchanged
+        elif stored:
+            status = DownloadStatus.downloaded
+        else:
+            status = DownloadStatus.deduplicated
+
+        return DownloadedAsset(
+            url=url,
+            status=status,
+            path=self._object_path(digest),
+            sha256=digest,
+            size=size,
+        )
+
+    async def _worker(self, url: str) -> DownloadedAsset:
+        async with self._semaphore:
+            try:
+                return await self._download(url)
+            except Exception as e:
+                LOGGER.warning(f"Failed to download asset {url}: {e}")
+                return DownloadedAsset(url=url, status=DownloadStatus.failed, error=e)
+
+    async def download(self, assets: Iterable[Asset | str]) -> DownloadManifest:
+        self._index = await asyncio.to_thread(self._load_index)
+
+        urls = list(dict.fromkeys(str(asset) for asset in assets))
+        results = await asyncio.gather(*(self._worker(url) for url in urls))
+
+        await asyncio.to_thread(self._save_index)
+        return DownloadManifest({entry.url: entry for entry in results})
@@ -1,6 +1,6 @@
 from enum import Enum
 
-__all__ = ("ChatroomChatMode",)
+__all__ = ("ChatroomChatMode", "DownloadStatus", "CircuitState", "OverflowPolicy")
 
 
 class ChatroomChatMode(Enum):
@@ -17,3 +17,63 @@ class ChatroomChatMode(Enum):
 
     public = "public"
     privet = "privet"
+
+
+class DownloadStatus(Enum):
+    """
+    An enum containing the possible outcomes of downloading an asset with `Client.download_assets`.
+
+    Attributes
+    -----------
+    downloaded: `DownloadStatus`
+        The asset was new or changed, and was written to disk
+    unchanged: `DownloadStatus`
+        The asset didn't change since it was last downloaded
+    deduplicated: `DownloadStatus`
+        The asset was downloaded, but identical bytes were already stored
+    failed: `DownloadStatus`
+        Downloading the asset failed
+    """
+
+    downloaded = "downloaded"
+    unchanged = "unchanged"
+    deduplicated = "deduplicated"
+    failed = "failed"
+
+
+class CircuitState(Enum):
+    """
+    An enum containing the possible states of a `CircuitBreaker`.
+
+    Attributes
+    -----------
+    closed: `CircuitState`
+        Requests go through as usual
+    open: `CircuitState`
+        Requests fail right away without being made, while the bypass script is probed
+    """
+
+    closed = "closed"
+    open = "open"
+
+
+class OverflowPolicy(Enum):
+    """
+    An enum containing what an `EventQueue` can do with new events once a queue is full.
+
+    Attributes
+    -----------
+    block: `OverflowPolicy`
+        Stop reading the websocket until there is room again
+    drop_oldest: `OverflowPolicy`
+        Drop the oldest event in the queue to make room
+    drop_newest: `OverflowPolicy`
+        Drop the new event
+    sample: `OverflowPolicy`
+        Once the queue is half full, only keep one in every few new events, dropping the oldest ones if it fills up
+    """
+
+    block = "block"
+    drop_oldest = "drop_oldest"
+    drop_newest = "drop_newest"
+    sample = "sample"
@@ -6,6 +6,7 @@ __all__ = (
     "InternalKickException",
     "LoginFailure",
     "CloudflareBypassException",
+    "RateLimited",
 )
 
 
@@ -70,6 +71,23 @@ class NotFound(HTTPException):
         super().__init__(txt, 404)
 
 
+class RateLimited(HTTPException):
+    """
+    This error is used when kick keeps returning a 429 status code after all retries were used up.
+
+    Attributes
+    -----------
+    status_code: int = 429
+        The HTTP code
+    retry_after: float | None
+        How many seconds kick asked us to wait, if it did
+    """
+
+    def __init__(self, txt: str, retry_after: float | None = None) -> None:
+        super().__init__(txt, 429)
+        self.retry_after = retry_after
+
+
 class InternalKickException(HTTPException):
     """
     This error is used when kick returns a a 500 status code, or doesn't connect.
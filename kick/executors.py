@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Hashable, Union
+
+if TYPE_CHECKING:
+    from .client import Client
+
+LOGGER = logging.getLogger(__name__)
+
+__all__ = ()
+
+ExecutorLike = Union[str, Executor]
+
+
+class _Packed:
+    # An object rebuilt from its payload in the process it is sent to
+
+    __slots__ = ("cls", "data")
+
+    def __init__(self, cls: type, data: Any) -> None:
+        self.cls = cls
+        self.data = data
+
+
+def _pack(arg: Any) -> Any:
+    data = getattr(arg, "_data", None)
+    if data is not None and hasattr(arg, "http"):
+        return _Packed(type(arg), data)
+    return arg
+
+
+def _unpack(arg: Any) -> Any:
+    if isinstance(arg, _Packed):
+        # There's no HTTPClient in the worker, so only the object's data can be used
+        return arg.cls(data=arg.data, http=None)
+    return arg
+
+
+def _run_packed(func: Callable[..., Any], args: tuple) -> None:
+    func(*(_unpack(arg) for arg in args))
+
+
+class ExecutorListener:
+    """
+    Runs a regular function listener in a thread or process pool, so it never blocks the event loop.
+
+    With a process pool, objects such as `Message` are sent as their payloads and rebuilt
+    in the worker without an `HTTPClient`, so their data can be used but their methods that
+    make requests can't. The function itself must be importable, such as one defined at the
+    top level of a module.
+
+    If `ordered` is True, calls for the same chatroom run one at a time, in the order
+    the events were dispatched. Otherwise they all run as soon as the pool can take them.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        func: Callable[..., Any],
+        executor: ExecutorLike,
+        *,
+        ordered: bool = False,
+    ) -> None:
+        if asyncio.iscoroutinefunction(func):
+            raise TypeError("Listeners run in an executor must be regular functions")
+        if isinstance(executor, str) and executor not in ("thread", "process"):
+            raise ValueError(f"Unknown executor: {executor!r}")
+
+        self.client = client
+        self.func = func
+        self.executor: ExecutorLike = executor
+        self.ordered: bool = ordered
+        self.__name__: str = func.__name__
+        self.__qualname__: str = func.__qualname__
+
+        # The last call of each chatroom, which the next one waits for
+        self._tails: dict[Hashable, asyncio.Future[None]] = {}
+
+    def __repr__(self) -> str:
+        return f"<ExecutorListener func={self.func.__qualname__} executor={self.executor!r} ordered={self.ordered}>"
+
+    async def _run(self, args: tuple) -> None:
+        executor = self.client._get_executor(self.executor)
+        loop = asyncio.get_running_loop()
+        try:
+            if isinstance(executor, ProcessPoolExecutor):
+                packed = tuple(_pack(arg) for arg in args)
+                await loop.run_in_executor(executor, _run_packed, self.func, packed)
+            else:
+                await loop.run_in_executor(executor, self.func, *args)
+        except Exception:
+            LOGGER.exception(f"Ignoring exception in listener {self.func.__qualname__}")
+
+    async def __call__(self, *args: Any) -> None:
+        if not self.ordered:
+            await self._run(args)
+            return
+
+        key = getattr(args[0], "chatroom_id", None) if args else None
+        previous = self._tails.get(key)
+        done = asyncio.get_running_loop().create_future()
+        self._tails[key] = done
+
+        try:
+            if previous is not None:
+                await asyncio.shield(previous)
+            await self._run(args)
+        finally:
+            done.set_result(None)
+            if self._tails.get(key) is done:
+                del self._tails[key]
@@ -1,14 +1,38 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import itertools
 import logging
-from typing import TYPE_CHECKING, Any, Coroutine, Optional, TypeVar, Union
-from urllib.parse import urlencode, quote
-
-from aiohttp import ClientConnectionError, ClientResponse, ClientSession
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Coroutine,
+    NoReturn,
+    Optional,
+    TypeVar,
+    Union,
+)
+from urllib.parse import urlencode
+
+from aiohttp import (
+    BaseConnector,
+    ClientConnectionError,
+    ClientConnectorError,
+    ClientResponse,
+    ClientSession,
+    TCPConnector,
+)
 
 from . import __version__
+from .bypass import (
+    BypassEndpoint,
+    BypassPool,
+    RequestBatcher,
+)
+from .caching import RequestCoalescer, ResponseCache
+from .codecs import JSONCodec, get_codec
 from .errors import (
     CloudflareBypassException,
     Forbidden,
@@ -16,9 +40,13 @@ from .errors import (
     InternalKickException,
     LoginFailure,
     NotFound,
+    RateLimited,
 )
+from .transports import AiohttpTransport, Transport, TransportResponse
+from .ratelimits import RateLimiter, RetryPolicy, parse_retry_after
 from .utils import MISSING
-from .ws import PusherWebSocket
+from .workers import EventWorkerPool
+from .ws import PusherShardPool, PusherWebSocket
 
 if TYPE_CHECKING:
     from .types.categories import CategorySearchResponse
@@ -60,21 +88,27 @@ if TYPE_CHECKING:
 
 LOGGER = logging.getLogger(__name__)
 
+# Methods that are safe to send again when it isn't known whether kick got them
+REPEATABLE_METHODS: frozenset[str] = frozenset({"GET", "HEAD", "OPTIONS"})
+
+PUSHER_URL = "wss://ws-us2.pusher.com/app/eb1d5f283081a78b932c?protocol=7&client=js&version=7.6.0&flash=false"
+
 NOTFOUND_SIGNATURE = """
 class="w-64 lg:w-[526px]"
 """.strip()
 
 
-async def json_or_text(response: ClientResponse, /) -> Union[dict[str, Any], str]:
-    text = await response.text()
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        pass
-    except KeyError:
-        pass
+async def json_or_text(
+    response: ClientResponse | TransportResponse, /, codec: JSONCodec
+) -> Union[dict[str, Any], str]:
+    return decode_body(await response.read(), codec)
+
 
-    return text
+def decode_body(body: bytes, /, codec: JSONCodec) -> Union[dict[str, Any], str]:
+    try:
+        return codec.loads(body)
+    except codec.decode_errors:
+        return body.decode("utf-8", errors="replace")
 
 
 async def error_or_text(data: Union[dict, str]) -> str:
@@ -100,37 +134,67 @@ class Route:
     BASE: str = f"{DOMAIN}/api/v2"
     SEARCH: str = "https://search.kick.com"
 
-    def __init__(self, method: str, path: str) -> None:
+    def __init__(self, method: str, path: str, **parameters: Any) -> None:
         self.path: str = path
         self.method: str = method
-        self.url = self.BASE + self.path
+        self.parameters: dict[str, Any] = parameters
+        self.url = self._format(self.BASE + self.path, parameters)
+
+    @staticmethod
+    def _format(url: str, parameters: dict[str, Any]) -> str:
+        if parameters:
+            url = url.format_map(parameters)
+        return url
+
+    @property
+    def bucket(self) -> str:
+        return f"{self.method} {self.path}"
 
     @classmethod
-    def search(cls, method: str, path: str) -> Self:
+    def search(cls, method: str, path: str, **parameters: Any) -> Self:
         self = cls.__new__(cls)
         self.path = path
         self.method = method
-        self.url = self.SEARCH + path
+        self.parameters = parameters
+        self.url = cls._format(self.SEARCH + path, parameters)
         return self
 
     @classmethod
-    def root(cls, method: str, path: str) -> Self:
+    def root(cls, method: str, path: str, **parameters: Any) -> Self:
         self = cls.__new__(cls)
         self.path = path
         self.method = method
-        self.url = self.DOMAIN + path
+        self.parameters = parameters
+        self.url = cls._format(self.DOMAIN + path, parameters)
         return self
 
 
 class HTTPClient:
     def __init__(self, client: Client):
-        self.__session: ClientSession = MISSING
-        self.ws: PusherWebSocket = MISSING
+        self.__session: ClientSession = client._options.get("session", MISSING)
+        self.__owns_session: bool = self.__session is MISSING
+        self.__connector: BaseConnector | None = client._options.get("connector")
+        self.__transport: Transport = client._options.get("transport", MISSING)
+        # A passed transport is closed with the client, while ours only wraps the session
+        self.__closes_transport: bool = self.__transport is not MISSING
+        self.ws: PusherWebSocket | PusherShardPool = MISSING
         self.client = client
 
         self.token: str = MISSING
         self.xsrf_token: str = MISSING
-        self.globally_locked: bool = False
+        self._ratelimiter: RateLimiter = RateLimiter()
+        self.retry_policy: RetryPolicy = client._options.get(
+            "retry_policy", RetryPolicy()
+        )
+        self.coalescer: RequestCoalescer | None = (
+            RequestCoalescer()
+            if client._options.get("coalesce_requests", False)
+            else None
+        )
+        self.response_cache: ResponseCache | None = client._options.get(
+            "response_cache"
+        )
+        self.codec: JSONCodec = get_codec(client._options.get("json_codec", "auto"))
         self.__regex_token_task: asyncio.Task | None = None
         self._credentials: Credentials | None = None
 
@@ -139,6 +203,70 @@ class HTTPClient:
         self.bypass_port = client._options.get("bypass_port", 9090)
         self.bypass_host = client._options.get("bypass_host", "http://localhost")
         self.whitelisted = client._options.get("whitelisted", False)
+        self.ws_url: str = client._options.get("ws_url", PUSHER_URL)
+
+        endpoints = client._options.get("bypass_endpoints")
+        if endpoints is None:
+            endpoints = [
+                BypassEndpoint(
+                    f"{self.bypass_host}:{self.bypass_port}",
+                    circuit_breaker=client._options.get("bypass_circuit_breaker"),
+                )
+            ]
+        self.bypass: BypassPool = BypassPool(
+            endpoints,
+            strategy=client._options.get("bypass_strategy", "least_outstanding"),
+        )
+        for endpoint in self.bypass.endpoints:
+            self._bind_endpoint(endpoint)
+
+        self.event_workers: EventWorkerPool | None = None
+        self.batcher: RequestBatcher | None = None
+        if (
+            client._options.get("batch_requests", False)
+            and not self.whitelisted
+            and self.__transport is MISSING
+        ):
+            self.batcher = RequestBatcher(
+                self._send_batch,
+                max_size=client._options.get("batch_size", 32),
+                delay=client._options.get("batch_delay", 0.005),
+            )
+
+    @property
+    def session(self) -> ClientSession:
+        if self.__session is MISSING:
+            self.__session = self._create_session()
+        return self.__session
+
+    @property
+    def transport(self) -> Transport:
+        if self.__transport is MISSING:
+            self.__transport = AiohttpTransport(self.session)
+        return self.__transport
+
+    def _create_session(self) -> ClientSession:
+        connector = self.__connector
+        if connector is None:
+            options = self.client._options
+
+            # Most traffic goes to the same host (the bypass script), so the
+            # defaults favour keeping plenty of warm sockets around for it.
+            connector = TCPConnector(
+                limit=options.get("connection_limit", 100),
+                limit_per_host=options.get("connection_limit_per_host", 0),
+                keepalive_timeout=options.get("keepalive_timeout", 60.0),
+                ttl_dns_cache=options.get("dns_cache_ttl", 300),
+            )
+            return ClientSession(
+                connector=connector, json_serialize=self.codec.dumps
+            )
+
+        return ClientSession(
+            connector=connector,
+            connector_owner=False,
+            json_serialize=self.codec.dumps,
+        )
 
     async def regen_token_coro(self) -> None:
         await asyncio.sleep(2419200)  # 28 days just to be safe
@@ -146,12 +274,39 @@ class HTTPClient:
             LOGGER.info("Attempting to renew token")
             await self.client.login(self._credentials)
 
+    def _bind_endpoint(self, endpoint: BypassEndpoint) -> None:
+        endpoint.circuit_breaker._bind(
+            probe=lambda: self._probe_bypass(endpoint),
+            on_state_change=lambda before, after: self.client.dispatch(
+                "bypass_state_change", endpoint, before, after
+            ),
+        )
+
+    async def _probe_bypass(self, endpoint: BypassEndpoint) -> bool:
+        try:
+            await asyncio.wait_for(
+                self.transport.request("GET", f"{endpoint.url}/", headers={}), 5
+            )
+        except (ConnectionError, asyncio.TimeoutError):
+            return False
+
+        # Any response at all means the script is up again.
+        return True
+
     async def close(self) -> None:
         LOGGER.info("Closing HTTP Client...")
-        if self.__session is not MISSING:
-            await self.__session.close()
+        # The workers are closed first, since `HTTPClient.start` returns once the websocket is
+        if self.event_workers is not None:
+            await self.event_workers.close()
         if self.ws is not MISSING:
             await self.ws.close()
+        self.bypass.close()
+        if self.batcher is not None:
+            self.batcher.close()
+        if self.__closes_transport:
+            await self.__transport.close()
+        if self.__session is not MISSING and self.__owns_session:
+            await self.__session.close()
 
     async def login(self, credentials: Credentials) -> None:
         self._credentials = credentials
@@ -210,20 +365,33 @@ class HTTPClient:
         LOGGER.debug(
             f"Starting HTTP client. Whitelisted: {self.whitelisted}, Bypass Port: {self.bypass_port}"
         )
-        if self.__session is MISSING:
-            self.__session = ClientSession()
+        options = self.client._options
+        if options.get("event_workers"):
+            self.event_workers = EventWorkerPool(
+                http=self,
+                processes=options["event_workers"],
+                backlog=options.get("event_worker_backlog", 10000),
+                start_method=options.get("start_method"),
+            )
+            self.event_workers.start()
+
+        shard_count = options.get("shard_count", 1)
+        channels_per_shard = options.get("channels_per_shard")
+        if shard_count > 1 or channels_per_shard is not None:
+            self.ws = PusherShardPool(
+                http=self,
+                shard_count=shard_count,
+                channels_per_shard=channels_per_shard,
+            )
+            await self.ws.connect()
+        else:
+            actual_ws = await self.session.ws_connect(self.ws_url)
+            self.ws = PusherWebSocket(actual_ws, http=self)
 
-        actual_ws = await self.__session.ws_connect(
-            f"wss://ws-us2.pusher.com/app/eb1d5f283081a78b932c?protocol=7&client=js&version=7.6.0&flash=false"
-        )
-        self.ws = PusherWebSocket(actual_ws, http=self)
         self.client.dispatch("ready")
         await self.ws.start()
 
     async def request(self, route: Route, **kwargs) -> Any:
-        if self.__session is MISSING:
-            self.__session = ClientSession()
-
         headers = kwargs.pop("headers", {})
         headers["User-Agent"] = self.user_agent
         headers["Accepts"] = "application/json"
@@ -231,21 +399,14 @@ class HTTPClient:
         cookies = kwargs.pop("cookies", {})
         base_url = kwargs.pop("url", route.url)
 
-        # Handle URL parameters
-        params = kwargs.get('params')
+        # Transports only get the url, so the params have to be in it
+        params = kwargs.pop("params", None)
         if params:
             encoded_params = urlencode(params, doseq=True)
             full_url = f"{base_url}?{encoded_params}"
         else:
             full_url = base_url
-
-        # Handle bypass URL construction
-        if not self.whitelisted:
-            url = f"{self.bypass_host}:{self.bypass_port}/request?url={quote(full_url)}"
-            # Remove params since they're now in URL
-            kwargs.pop('params', None)
-        else:
-            url = full_url
+        url = full_url
 
         if self.xsrf_token:
             headers["X-XSRF-TOKEN"] = self.xsrf_token
@@ -256,53 +417,238 @@ class HTTPClient:
         if "json" in kwargs:
             headers["Content-Type"] = "application/json"
 
-        res: ClientResponse | None = None
-        data: str | dict | None = None
+        cache_key: str | None = None
+        if self.response_cache is not None and route.method == "GET":
+            if self.response_cache.ttl_for(route) > 0:
+                cache_key = full_url
+                entry = self.response_cache.get(cache_key)
+                if entry is not None:
+                    if entry.fresh:
+                        return decode_body(entry.body, self.codec)
+                    headers.update(entry.validators)
+
+        if (
+            self.coalescer is not None
+            and route.method == "GET"
+            and "json" not in kwargs
+            and "data" not in kwargs
+        ):
+            key = (url, tuple(sorted(headers.items())))
+            return await self.coalescer.run(
+                key,
+                lambda: self._request(
+                    route, url, headers, cookies, kwargs, cache_key=cache_key
+                ),
+            )
 
-        for current_try in range(3):
-            while self.globally_locked is True:
-                await asyncio.sleep(2)
+        return await self._request(
+            route, url, headers, cookies, kwargs, cache_key=cache_key
+        )
 
-            LOGGER.debug(
-                f"Making request to {route.method} {url}. headers: {headers}, params: {kwargs.get('params', None)}, json: {kwargs.get('json', None)}"
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        cookies: dict[str, str],
+        kwargs: dict[str, Any],
+    ) -> TransportResponse:
+        headers, body = self._encode_body(headers, cookies, kwargs)
+
+        if self.batcher is not None:
+            return await self.batcher.submit(
+                {
+                    "method": method,
+                    "url": url,
+                    "headers": headers,
+                    "body": body.decode("utf-8") if body else "",
+                }
             )
+
+        if self.whitelisted:
+            try:
+                return await self.transport.request(
+                    method, url, headers=headers, body=body
+                )
+            except ConnectionError:
+                raise InternalKickException("Could Not Connect To Kick") from None
+
+        # Fail over to the next healthy endpoint until one of them answers
+        tried: list[BypassEndpoint] = []
+        while True:
+            endpoint = self.bypass.select(exclude=tried)
+            endpoint.outstanding += 1
+            started = time.perf_counter()
             try:
-                res = await self.__session.request(
-                    route.method,
-                    url,  # Use the already constructed URL
-                    headers=headers,
-                    cookies=cookies,
-                    **kwargs,
+                res = await self.transport.request(
+                    method, endpoint.request_url(url), headers=headers, body=body
                 )
-            except ClientConnectionError:
-                if self.whitelisted is True:
-                    raise InternalKickException("Could Not Connect To Kick") from None
-                else:
+            except ConnectionError as e:
+                endpoint.record_failure()
+                tried.append(endpoint)
+                if (
+                    isinstance(e, ConnectionResetError)
+                    and method not in REPEATABLE_METHODS
+                ):
                     raise CloudflareBypassException(
-                        "Could Not Connect To Bypass Script"
+                        f"Lost the connection to the bypass script at {endpoint.url} after sending the request"
                     ) from None
 
+                LOGGER.warning(f"Could not connect to bypass script at {endpoint.url}")
+                continue
+            finally:
+                endpoint.outstanding -= 1
+
+            endpoint.record_success(time.perf_counter() - started)
+            return res
+
+    def _encode_body(
+        self,
+        headers: dict[str, str],
+        cookies: dict[str, str],
+        kwargs: dict[str, Any],
+    ) -> tuple[dict[str, str], Optional[bytes]]:
+        headers = dict(headers)
+        if cookies:
+            headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in cookies.items())
+
+        body: Optional[bytes] = None
+        if "json" in kwargs:
+            body = self.codec.dumps(kwargs["json"]).encode("utf-8")
+        elif "data" in kwargs:
+            data = kwargs["data"]
+            if isinstance(data, dict):
+                body = urlencode(data).encode("utf-8")
+                headers["Content-Type"] = "application/x-www-form-urlencoded"
+            elif isinstance(data, bytes):
+                body = data
+            else:
+                body = str(data).encode("utf-8")
+
+        return headers, body
+
+    async def _send_batch(
+        self, batch: list[dict[str, Any]]
+    ) -> AsyncIterator[dict[str, Any]]:
+        tried: list[BypassEndpoint] = []
+        while True:
+            endpoint = self.bypass.select(exclude=tried)
+            endpoint.outstanding += len(batch)
+            started = time.perf_counter()
+            try:
+                res = await self.session.post(
+                    f"{endpoint.url}/batch",
+                    data=self.codec.dumps(batch),
+                    headers={"Content-Type": "application/json"},
+                )
+            except ClientConnectionError as e:
+                endpoint.outstanding -= len(batch)
+                endpoint.record_failure()
+                tried.append(endpoint)
+                if not isinstance(e, ClientConnectorError) and any(
+                    request["method"] not in REPEATABLE_METHODS for request in batch
+                ):
+                    raise CloudflareBypassException(
+                        f"Lost the connection to the bypass script at {endpoint.url} after sending the batch"
+                    ) from None
+
+                LOGGER.warning(f"Could not connect to bypass script at {endpoint.url}")
+                continue
+
+            endpoint.record_success(time.perf_counter() - started)
+            try:
+                async with res:
+                    if res.status != 200:
+                        raise CloudflareBypassException(
+                            f"Bypass script at {endpoint.url} can not batch requests (status {res.status}). "
+                            "Recreate it with `python -m kick bypass create`"
+                        )
+
+                    async for line in res.content:
+                        if line.strip():
+                            yield self.codec.loads(line)
+            finally:
+                endpoint.outstanding -= len(batch)
+            return
+
+    async def _request(
+        self,
+        route: Route,
+        url: str,
+        headers: dict[str, str],
+        cookies: dict[str, str],
+        kwargs: dict[str, Any],
+        *,
+        cache_key: str | None = None,
+    ) -> Any:
+        res: TransportResponse | None = None
+        data: str | dict | None = None
+        ratelimit = self._ratelimiter.get_bucket(route)
+
+        retry_after: float | None = None
+        waited: float = 0.0
+
+        for current_try in itertools.count():
+            await ratelimit.acquire()
+
+            LOGGER.debug(
+                f"Making request to {route.method} {url}. headers: {headers}, json: {kwargs.get('json', None)}"
+            )
+            res = await self._send(route.method, url, headers, cookies, kwargs)
+
             if res is not None:
                 self.xsrf_token = str(
                     getattr(res.cookies.get("XSRF-TOKEN", MISSING), "value", MISSING)
                 )
 
-                data = await json_or_text(res)
-
-                if res.status == 429:
-                    self.globally_locked = True
-                    LOGGER.warning(
-                        f"We have been ratelimited at {route.method} {route.url}. Waiting five seconds before trying again...",
-                    )
-
-                    await asyncio.sleep(5)
-                    return await self.request(route)
-                else:
-                    self.globally_locked = False
+                data = await json_or_text(res, self.codec)
+                ratelimit.update(res.status, res.headers)
 
                 if 300 > res.status >= 200:
+                    if self.response_cache is not None:
+                        if cache_key is not None:
+                            body = await res.read()
+                            self.response_cache.store(
+                                route, cache_key, body, res.headers
+                            )
+                        elif route.method != "GET":
+                            self.response_cache.invalidate_route(route)
                     return data
 
+                if res.status == 304 and cache_key is not None:
+                    assert self.response_cache is not None
+                    entry = self.response_cache.revalidate(cache_key)
+                    if entry is not None:
+                        return decode_body(entry.body, self.codec)
+
+                    # The entry was evicted while we were revalidating it.
+                    headers.pop("If-None-Match", None)
+                    headers.pop("If-Modified-Since", None)
+                    continue
+
+                retry_after = (
+                    parse_retry_after(res.headers) if res.status == 429 else None
+                )
+                delay = self.retry_policy.get_delay(
+                    res.status,
+                    attempt=current_try,
+                    waited=waited,
+                    retry_after=retry_after,
+                )
+                if delay is not None:
+                    if res.status == 429:
+                        LOGGER.warning(
+                            f"We have been ratelimited at {route.method} {route.url}. Retrying in {delay:.2f} seconds",
+                        )
+                    else:
+                        LOGGER.warning(
+                            f"API returned a {res.status} status code at {route.method} {route.url}. Retrying in {delay:.2f} seconds",
+                        )
+
+                    waited += delay
+                    await asyncio.sleep(delay)
+                    continue
+
                 match res.status:
                     case 400:
                         error = await error_or_text(data)
@@ -312,28 +658,15 @@ class HTTPClient:
                     case 404:
                         error = await error_or_nothing(data)
                         raise NotFound(error or "Not Found")
-                    case 500:
-                        time = 2 * current_try
-
-                        LOGGER.warning(
-                            f"API returned a 500 status code at {route.method} {route.url}. Retrying in {time} seconds",
-                        )
-                        await asyncio.sleep(time)
-                        continue
-                    case 502:
+                    case 429:
+                        error = await error_or_text(data)
+                        raise RateLimited(error, retry_after)
+                    case 500 | 502:
                         txt = await error_or_text(data)
                         raise InternalKickException(txt)
                     case other:
                         raise RuntimeError(f"Unknown status reached: {other}")
 
-        if res is not None and data is not None:
-            txt = await error_or_text(data)
-
-            if res.status >= 500:
-                raise InternalKickException(txt)
-
-            raise HTTPException(txt, res.status)
-
         raise RuntimeError("Unreachable situation occured in http handling")
 
     def send_message(
@@ -351,57 +684,89 @@ class HTTPClient:
     def delete_message(self, chatroom: int, message_id: str) -> Response[Any]:
         # Kick keeps 500ing on this, so not sure what to expect from it
         return self.request(
-            Route("DELETE", f"/chatrooms/{chatroom}/messages/{message_id}")
+            Route(
+                "DELETE",
+                "/chatrooms/{chatroom}/messages/{message_id}",
+                chatroom=chatroom,
+                message_id=message_id,
+            )
         )
 
     def get_user(self, streamer: str) -> Response[UserPayload]:
-        return self.request(Route(method="GET", path=f"/channels/{streamer}"))
+        return self.request(
+            Route(method="GET", path="/channels/{streamer}", streamer=streamer)
+        )
 
     def get_chatter(self, streamer: str, chatter: str) -> Response[ChatterPayload]:
         return self.request(
             Route(
                 method="GET",
-                path=f"/channels/{streamer}/users/{chatter}",
+                path="/channels/{streamer}/users/{chatter}",
+                streamer=streamer,
+                chatter=chatter,
             )
         )
 
     def get_messages(self, chatroom: int) -> Response[FetchMessagesPayload]:
-        return self.request(Route("GET", f"/channels/{chatroom}/messages"))
+        return self.request(
+            Route("GET", "/channels/{chatroom}/messages", chatroom=chatroom)
+        )
 
     def get_chatroom_rules(self, streamer: str) -> Response[ChatroomRulesPayload]:
-        return self.request(Route("GET", f"/channels/{streamer}/chatroom/rules"))
+        return self.request(
+            Route("GET", "/channels/{streamer}/chatroom/rules", streamer=streamer)
+        )
 
     def get_streamer_videos(self, streamer: str) -> Response[GetVideosPayload]:
-        return self.request(Route("GET", f"/channels/{streamer}/videos"))
+        return self.request(
+            Route("GET", "/channels/{streamer}/videos", streamer=streamer)
+        )
 
     def get_emotes(self, streamer: str) -> Response[EmotesPayload]:
-        return self.request(Route.root("GET", f"/emotes/{streamer}"))
+        return self.request(Route.root("GET", "/emotes/{streamer}", streamer=streamer))
 
     def get_channels_banned_words(
         self, streamer: str
     ) -> Response[ChatroomBannedWordsPayload]:
-        return self.request(Route("GET", f"/channels/{streamer}/chatroom/banned-words"))
+        return self.request(
+            Route(
+                "GET", "/channels/{streamer}/chatroom/banned-words", streamer=streamer
+            )
+        )
 
     def get_channel_gift_leaderboard(
         self, streamer: str
     ) -> Response[LeaderboardPayload]:
-        return self.request(Route.root("GET", f"/channels/{streamer}/leaderboards"))
+        return self.request(
+            Route.root(
+                "GET", "/channels/{streamer}/leaderboards", streamer=streamer
+            )
+        )
 
     def get_channel_bans(self, streamer: str) -> Response[GetBannedUsersPayload]:
         """
         Requires Mod
         """
 
-        return self.request(Route("GET", f"/channels/{streamer}/bans"))
+        return self.request(
+            Route("GET", "/channels/{streamer}/bans", streamer=streamer)
+        )
 
     def unban_user(self, streamer: str, chatter: str) -> Response[UnbanChatterPayload]:
-        return self.request(Route("DELETE", f"/channels/{streamer}/bans/{chatter}"))
+        return self.request(
+            Route(
+                "DELETE",
+                "/channels/{streamer}/bans/{chatter}",
+                streamer=streamer,
+                chatter=chatter,
+            )
+        )
 
     def timeout_chatter(
         self, streamer: str, chatter: str, reason: str, duration: int
     ) -> Response[BanChatterPayload]:
         return self.request(
-            Route("POST", f"/channels/{streamer}/bans"),
+            Route("POST", "/channels/{streamer}/bans", streamer=streamer),
             json={
                 "banned_username": chatter,
                 "permanent": False,
@@ -414,7 +779,7 @@ class HTTPClient:
         self, streamer: str, chatter: str, reason: str
     ) -> Response[BanChatterPayload]:
         return self.request(
-            Route("POST", f"/channels/{streamer}/bans"),
+            Route("POST", "/channels/{streamer}/bans", streamer=streamer),
             json={
                 "banned_username": chatter,
                 "permanent": True,
@@ -435,7 +800,7 @@ class HTTPClient:
         """
 
         return self.request(
-            Route("POST", f"/channels/{streamer}/polls"),
+            Route("POST", "/channels/{streamer}/polls", streamer=streamer),
             json={
                 "duration": duration,
                 "options": options,
@@ -445,17 +810,19 @@ class HTTPClient:
         )
 
     def delete_poll(self, streamer: str) -> Response[DeletePollPayload]:
-        return self.request(Route("DELETE", f"/channels/{streamer}/polls"))
+        return self.request(
+            Route("DELETE", "/channels/{streamer}/polls", streamer=streamer)
+        )
 
     def vote_for_poll(self, streamer: str, option: int) -> Response[CreatePollPayload]:
         return self.request(
-            Route("POST", f"/channels/{streamer}/polls/vote"),
+            Route("POST", "/channels/{streamer}/polls/vote", streamer=streamer),
             json={"id": option},
         )
 
     def get_poll(self, streamer: str) -> Response[CreatePollPayload]:
         return self.request(
-            Route("GET", f"/channels/{streamer}/polls"),
+            Route("GET", "/channels/{streamer}/polls", streamer=streamer),
         )
 
     def edit_chatroom(
@@ -491,7 +858,7 @@ class HTTPClient:
             raise ValueError("No valid parameters provided for chatroom editing.")
 
         return self.request(
-            Route("PUT", f"/channels/{streamer}/chatroom"),
+            Route("PUT", "/channels/{streamer}/chatroom", streamer=streamer),
             json=payload,
         )
 
@@ -503,7 +870,7 @@ class HTTPClient:
         original_sender: ReplyOriginalSender,
     ) -> Response[MessagePayload]:
         return self.request(
-            Route("POST", f"/messages/send/{chatroom}"),
+            Route("POST", "/messages/send/{chatroom}", chatroom=chatroom),
             json={
                 "content": content,
                 "metadata": {
@@ -547,19 +914,48 @@ class HTTPClient:
         })
 
     async def get_asset(self, url: str) -> bytes:
-        if self.__session is MISSING:
-            self.__session = ClientSession()
+        res = await self.transport.request("GET", url, headers={})
+        if res.status != 200:
+            await self._raise_for_asset(res)
+        return res.body
+
+    async def request_asset(
+        self, url: str, *, offset: int = 0, headers: Optional[dict[str, str]] = None
+    ) -> ClientResponse:
+        """
+        Starts fetching an asset, without reading the body.
+
+        This doesn't go through the transport, since the body is streamed.
+
+        If an offset is given, only the bytes from there on are asked for.
+        The response is either a 206 if the range was honoured, a 200 if it
+        wasn't, or a 416 if there is nothing past the offset. If conditional
+        headers are given, the response can also be a 304.
+        """
+
+        headers = dict(headers or {})
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+
+        res = await self.session.request("GET", url, headers=headers)
+        if (
+            res.status in (200, 206)
+            or (res.status == 416 and offset)
+            or (res.status == 304 and headers)
+        ):
+            return res
+
+        async with res:
+            await self._raise_for_asset(res)
 
-        res = await self.__session.request("GET", url)
+    async def _raise_for_asset(self, res: ClientResponse | TransportResponse) -> NoReturn:
         match res.status:
-            case 200:
-                return await res.read()
             case 403:
                 raise Forbidden()
             case 404:
                 raise NotFound("Asset Not Found")
             case 500:
-                data = await json_or_text(res)
+                data = await json_or_text(res, self.codec)
                 error = await error_or_text(data)
                 raise InternalKickException(error)
             case other:
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import TYPE_CHECKING, Hashable, Literal
+
+from .enums import OverflowPolicy
+
+if TYPE_CHECKING:
+    from .client import Client
+
+__all__ = ("EventQueue",)
+
+
+class EventQueue:
+    """
+    Sends dispatched events through bounded queues, which a fixed amount of worker tasks handle.
+
+    Without one, every event gets its own task, so a burst of events, such as a raid
+    or an emote spam wave, can pile up tens of thousands of tasks. With one, events
+    wait in queues of at most `maxsize` events, and `overflow` decides what happens to
+    events that don't fit. Inline listeners are still called right away.
+
+    Pass it to `Client` with the `event_queue` option. An `EventQueue` can only be used by one client.
+
+    Parameters
+    -----------
+    maxsize: int = 1000
+        The most events one queue can hold
+    workers: int = 16
+        How many tasks handle events. This is the most listeners that can run at the same time.
+    overflow: `OverflowPolicy` | str = "block"
+        What to do with new events once their queue is full
+    partition: Literal["event", "chatroom"] = "event"
+        How events are split into queues. `"event"` gives each event its own queue.
+        `"chatroom"` gives each chatroom its own queue for events that have one, such as messages,
+        so a busy chatroom can't crowd out the others, and handles each chatroom's events one at a time, in order.
+    sample_every: int = 10
+        With `OverflowPolicy.sample`, one in every this many events is kept once a queue is half full
+
+    Attributes
+    -----------
+    maxsize: int
+        The most events one queue can hold
+    workers: int
+        How many tasks handle events
+    overflow: `OverflowPolicy`
+        What to do with new events once their queue is full
+    partition: Literal["event", "chatroom"]
+        How events are split into queues
+    sample_every: int
+        With `OverflowPolicy.sample`, one in every this many events is kept once a queue is half full
+    processed: int
+        How many events were handled
+    dropped: int
+        How many events were dropped because their queue was full
+    """
+
+    def __init__(
+        self,
+        *,
+        maxsize: int = 1000,
+        workers: int = 16,
+        overflow: OverflowPolicy | str = "block",
+        partition: Literal["event", "chatroom"] = "event",
+        sample_every: int = 10,
+    ) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if partition not in ("event", "chatroom"):
+            raise ValueError(f"Unknown partition: {partition!r}")
+        if sample_every < 1:
+            raise ValueError("sample_every must be at least 1")
+
+        self.maxsize: int = maxsize
+        self.workers: int = workers
+        self.overflow: OverflowPolicy = OverflowPolicy(overflow)
+        self.partition: Literal["event", "chatroom"] = partition
+        self.sample_every: int = sample_every
+        self.processed: int = 0
+        self.dropped: int = 0
+
+        self.client: Client = None  # type: ignore
+        self._queues: dict[Hashable, deque[tuple[str, tuple, dict]]] = {}
+        # Queues with events that a worker can take, in the order they should be taken
+        self._ready: deque[Hashable] = deque()
+        # Queues being handled, when events of a queue are handled in order
+        self._busy: set[Hashable] = set()
+        self._full: set[Hashable] = set()
+        self._depth: int = 0
+        self._sampled: int = 0
+        self._tasks: list[asyncio.Task] = []
+        self._has_work: asyncio.Event = asyncio.Event()
+        self._has_space: asyncio.Event = asyncio.Event()
+        self._has_space.set()
+
+    def __repr__(self) -> str:
+        return f"<EventQueue depth={self._depth} processed={self.processed} dropped={self.dropped} overflow={self.overflow.value!r}>"
+
+    @property
+    def depth(self) -> int:
+        """How many events are waiting to be handled"""
+
+        return self._depth
+
+    @property
+    def queue_depths(self) -> dict[Hashable, int]:
+        """How many events are waiting in each queue, by event name or chatroom id"""
+
+        return {key: len(queue) for key, queue in self._queues.items() if queue}
+
+    def _bind(self, client: Client) -> None:
+        if self.client is not None and self.client is not client:
+            raise RuntimeError("This EventQueue is already used by another client")
+        self.client = client
+
+    def _key(self, event_name: str, args: tuple) -> Hashable:
+        if self.partition == "chatroom" and args:
+            chatroom_id = getattr(args[0], "chatroom_id", None)
+            if chatroom_id is not None:
+                return chatroom_id
+        return event_name
+
+    def put(self, event_name: str, args: tuple, kwargs: dict) -> bool:
+        """
+        Queues an event, unless the overflow policy drops it.
+        This never blocks, see `EventQueue.wait_for_space`.
+
+        Returns
+        -----------
+        bool
+            Whether the event was queued
+        """
+
+        if not self._tasks:
+            self._start()
+
+        key = self._key(event_name, args)
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = deque()
+
+        if (
+            self.overflow is OverflowPolicy.sample
+            and len(queue) * 2 >= self.maxsize
+        ):
+            self._sampled += 1
+            if self._sampled % self.sample_every:
+                self.dropped += 1
+                return False
+
+        if len(queue) >= self.maxsize:
+            if self.overflow is OverflowPolicy.drop_newest:
+                self.dropped += 1
+                return False
+            if self.overflow is not OverflowPolicy.block:
+                queue.popleft()
+                self._depth -= 1
+                self.dropped += 1
+
+        was_empty = not queue
+        queue.append((event_name, args, kwargs))
+        self._depth += 1
+
+        if len(queue) >= self.maxsize:
+            self._full.add(key)
+            self._has_space.clear()
+        if was_empty and key not in self._busy:
+            self._ready.append(key)
+            self._has_work.set()
+        return True
+
+    async def wait_for_space(self) -> None:
+        """
+        |coro|
+
+        With `OverflowPolicy.block`, waits until no queue is full.
+        The websocket waits on this before reading each event, so a full queue holds up reading instead of growing.
+        """
+
+        if self.overflow is OverflowPolicy.block:
+            await self._has_space.wait()
+
+    def _start(self) -> None:
+        self._tasks = [
+            asyncio.create_task(self._work(), name=f"event-queue-worker-{index}")
+            for index in range(self.workers)
+        ]
+
+    async def _work(self) -> None:
+        ordered = self.partition == "chatroom"
+        while True:
+            while not self._ready:
+                self._has_work.clear()
+                await self._has_work.wait()
+
+            key = self._ready.popleft()
+            queue = self._queues[key]
+            event_name, args, kwargs = queue.popleft()
+            self._depth -= 1
+
+            if key in self._full and len(queue) < self.maxsize:
+                self._full.discard(key)
+                if not self._full:
+                    self._has_space.set()
+
+            if ordered and isinstance(key, int):
+                self._busy.add(key)
+            elif queue:
+                # The other workers can take the queue's next event right away
+                self._ready.append(key)
+            else:
+                del self._queues[key]
+
+            try:
+                await self.client._call_listeners(
+                    event_name, *args, inline=False, **kwargs
+                )
+            finally:
+                self.processed += 1
+                if key in self._busy:
+                    self._busy.discard(key)
+                    if queue:
+                        self._ready.append(key)
+                        self._has_work.set()
+                    else:
+                        del self._queues[key]
+
+    def close(self) -> None:
+        """
+        Stops handling events. Events that are still queued are dropped.
+        """
+
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        self._queues.clear()
+        self._ready.clear()
+        self._busy.clear()
+        self._full.clear()
+        self._depth = 0
+        self._has_space.set()
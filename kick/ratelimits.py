@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Iterable, Mapping, Optional
+
+if TYPE_CHECKING:
+    from .http import Route
+
+LOGGER = logging.getLogger(__name__)
+
+__all__ = ("RetryPolicy",)
+
+DEFAULT_RETRY_AFTER: float = 5.0
+# How far back requests are remembered to learn a limit kick doesn't send headers for
+MAX_LEARNING_WINDOW: float = 300.0
+
+
+def _parse_int(value: Optional[str]) -> Optional[int]:
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """
+    Returns how many seconds the headers ask us to wait, if they say anything.
+
+    `Retry-After` can either be a delay in seconds or an http date, and
+    `X-RateLimit-Reset` is a unix timestamp.
+    """
+
+    retry_after = headers.get("Retry-After")
+    if retry_after is not None:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            try:
+                when = parsedate_to_datetime(retry_after)
+            except (TypeError, ValueError):
+                pass
+            else:
+                return max(when.timestamp() - time.time(), 0.0)
+
+    reset = headers.get("X-RateLimit-Reset")
+    if reset is not None:
+        try:
+            return max(float(reset) - time.time(), 0.0)
+        except ValueError:
+            pass
+
+    return None
+
+
+class RateLimit:
+    """
+    A single rate limit bucket.
+
+    Requests acquire a slot before being sent, and the response is fed back
+    with `RateLimit.update`. When the bucket is exhausted, requests are parked
+    on futures and woken up in FIFO order once the bucket resets.
+    """
+
+    def __init__(self, key: str) -> None:
+        self.key: str = key
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at: float = 0.0
+        self.window: Optional[float] = None
+
+        # When requests were let through while the limit is unknown
+        self._admitted: deque[float] = deque()
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+    def __repr__(self) -> str:
+        return f"<RateLimit key={self.key!r} limit={self.limit} remaining={self.remaining} waiting={len(self._waiters)}>"
+
+    @property
+    def waiting(self) -> int:
+        """The amount of requests currently parked on this bucket"""
+
+        return len(self._waiters)
+
+    @property
+    def retry_after(self) -> float:
+        """How many seconds until this bucket resets"""
+
+        return max(self.reset_at - time.monotonic(), 0.0)
+
+    def _reset_window(self, now: float) -> None:
+        self.remaining = self.limit
+        self._admitted.clear()
+        if self.limit is not None and self.window:
+            self.reset_at = now + self.window
+        else:
+            self.reset_at = 0.0
+
+    def _try_take(self) -> bool:
+        now = time.monotonic()
+        if self.reset_at and now >= self.reset_at:
+            self._reset_window(now)
+
+        if self.remaining is None or not self.reset_at:
+            # Without a known reset time there is nothing to wait for,
+            # so let the request through and learn from the response.
+            if self.limit is None:
+                self._admit(now)
+            return True
+
+        if self.remaining > 0:
+            self.remaining -= 1
+            return True
+
+        return False
+
+    def _admit(self, now: float) -> None:
+        self._admitted.append(now)
+        while self._admitted and now - self._admitted[0] > MAX_LEARNING_WINDOW:
+            self._admitted.popleft()
+
+    def _learn_limit(self, now: float, window: float) -> Optional[int]:
+        # The requests let through in the window the 429 covers, including the one that got it
+        admitted = sum(1 for at in self._admitted if now - at <= window)
+        self._admitted.clear()
+        if not admitted:
+            return None
+        return max(admitted - 1, 1)
+
+    def _release(self) -> None:
+        while self._waiters:
+            future = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                continue
+            if not self._try_take():
+                break
+            self._waiters.popleft()
+            future.set_result(None)
+
+        self._schedule_wakeup()
+
+    def _on_wakeup(self) -> None:
+        self._wakeup = None
+        self._release()
+
+    def _schedule_wakeup(self) -> None:
+        if not self._waiters or self._wakeup is not None:
+            return
+
+        loop = asyncio.get_running_loop()
+        self._wakeup = loop.call_later(self.retry_after, self._on_wakeup)
+
+    async def acquire(self) -> None:
+        """
+        |coro|
+
+        Waits until a request can be made in this bucket.
+        """
+
+        if not self._waiters and self._try_take():
+            return
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self._schedule_wakeup()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # We were handed a slot but will never use it, give it back.
+                if self.remaining is not None:
+                    self.remaining += 1
+                self._release()
+            raise
+
+    def update(self, status: int, headers: Mapping[str, str]) -> None:
+        """
+        Updates the bucket from a response's status and headers.
+        """
+
+        now = time.monotonic()
+
+        limit = _parse_int(headers.get("X-RateLimit-Limit"))
+        remaining = _parse_int(headers.get("X-RateLimit-Remaining"))
+        if limit is not None:
+            self.limit = limit
+        if remaining is not None:
+            self.remaining = remaining
+
+        if status == 429:
+            retry_after = parse_retry_after(headers)
+            if retry_after and self.limit is None:
+                # Kick didn't tell us the limit, so assume what got through in
+                # the window it asks us to wait out is what the bucket allows.
+                # Without a window to count in, nothing is inferred.
+                self.limit = self._learn_limit(now, retry_after)
+            if retry_after is None:
+                retry_after = DEFAULT_RETRY_AFTER
+
+            if not self.window or retry_after > self.window:
+                self.window = retry_after
+
+            self.remaining = 0
+            self.reset_at = now + retry_after
+        elif (
+            self.remaining is not None
+            and self.remaining <= 0
+            and not self.reset_at
+            and self.window
+        ):
+            self.reset_at = now + self.window
+
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        self._release()
+
+
+class RateLimiter:
+    """
+    Holds one `RateLimit` bucket per route, keyed by the route's method and path template.
+    """
+
+    def __init__(self) -> None:
+        self._buckets: dict[str, RateLimit] = {}
+
+    def get_bucket(self, route: Route) -> RateLimit:
+        key = route.bucket
+        try:
+            return self._buckets[key]
+        except KeyError:
+            bucket = self._buckets[key] = RateLimit(key)
+            return bucket
+
+    @property
+    def buckets(self) -> list[RateLimit]:
+        return list(self._buckets.values())
+
+
+class RetryPolicy:
+    """
+    Controls how requests are retried when kick ratelimits us or errors internally.
+
+    Retries replay the exact same request, and wait using exponential backoff
+    with full jitter. When kick sends a `Retry-After` header, the wait is never
+    shorter than what it asks for.
+
+    Parameters
+    -----------
+    max_retries: int = 5
+        The maximum amount of times a single request is retried
+    base_delay: float = 0.5
+        The delay, in seconds, that the backoff starts from
+    max_delay: float = 30.0
+        The maximum delay, in seconds, of a single backoff
+    max_total_delay: float = 60.0
+        The maximum amount of seconds a single request can spend waiting on retries.
+        Once a retry would go over this, the error is raised instead.
+    statuses: Iterable[int] = (429, 500)
+        The status codes that should be retried
+
+    Attributes
+    -----------
+    max_retries: int
+        The maximum amount of times a single request is retried
+    base_delay: float
+        The delay, in seconds, that the backoff starts from
+    max_delay: float
+        The maximum delay, in seconds, of a single backoff
+    max_total_delay: float
+        The maximum amount of seconds a single request can spend waiting on retries
+    statuses: frozenset[int]
+        The status codes that should be retried
+    """
+
+    def __init__(
+        self,
+        *,
+        max_retries: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        max_total_delay: float = 60.0,
+        statuses: Iterable[int] = (429, 500),
+    ) -> None:
+        if max_retries < 0:
+            raise ValueError("max_retries can not be negative")
+        if base_delay < 0 or max_delay < 0 or max_total_delay < 0:
+            raise ValueError("Delays can not be negative")
+
+        self.max_retries: int = max_retries
+        self.base_delay: float = base_delay
+        self.max_delay: float = max_delay
+        self.max_total_delay: float = max_total_delay
+        self.statuses: frozenset[int] = frozenset(statuses)
+
+    def __repr__(self) -> str:
+        return f"<RetryPolicy max_retries={self.max_retries} base_delay={self.base_delay} max_total_delay={self.max_total_delay}>"
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Returns a full jitter backoff for the given attempt.
+
+        Parameters
+        -----------
+        attempt: int
+            How many retries have already been made
+
+        Returns
+        -----------
+        float
+            The amount of seconds to wait
+        """
+
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    def get_delay(
+        self,
+        status: int,
+        *,
+        attempt: int,
+        waited: float,
+        retry_after: Optional[float] = None,
+    ) -> Optional[float]:
+        """
+        Returns how long to wait before retrying, or `None` if the request should not be retried.
+
+        Parameters
+        -----------
+        status: int
+            The status code of the failed response
+        attempt: int
+            How many retries have already been made
+        waited: float
+            How many seconds have already been spent waiting on retries
+        retry_after: Optional[float]
+            How many seconds kick asked us to wait, if it did
+
+        Returns
+        -----------
+        Optional[float]
+            The amount of seconds to wait, or `None`
+        """
+
+        if status not in self.statuses or attempt >= self.max_retries:
+            return None
+
+        delay = self.backoff(attempt)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+
+        if waited + delay > self.max_total_delay:
+            return None
+        return delay
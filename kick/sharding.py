@@ -0,0 +1,479 @@
+from __future__ import annotations
+
+import asyncio
+import atexit
+import bisect
+import hashlib
+import logging
+import multiprocessing
+import os
+import time
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Iterable, Optional
+
+from .client import Client
+from .ratelimits import RetryPolicy
+
+if TYPE_CHECKING:
+    from multiprocessing.connection import Connection
+    from multiprocessing.process import BaseProcess
+
+    from .client import Credentials
+
+LOGGER = logging.getLogger(__name__)
+
+__all__ = ("HashRing", "AutoShardedClient")
+
+# How often the parent checks on its workers, and workers check for messages from it
+SUPERVISE_INTERVAL: float = 0.1
+# How long workers get to close before they are terminated
+SHUTDOWN_TIMEOUT: float = 10.0
+
+RESTART_BACKOFF = RetryPolicy(base_delay=1.0, max_delay=60.0)
+
+
+def _hash(data: str) -> int:
+    digest = hashlib.blake2b(data.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+class HashRing:
+    """
+    A consistent hash ring, used to decide which shard owns a chatroom.
+
+    When a node is added or removed, only the keys it owns move, so the other
+    nodes keep their chatrooms.
+
+    Parameters
+    -----------
+    nodes: Iterable[int]
+        The nodes to start with
+    replicas: int = 64
+        How many points each node gets on the ring. More points spread keys more evenly.
+    """
+
+    def __init__(self, nodes: Iterable[int] = (), *, replicas: int = 64) -> None:
+        self.replicas: int = replicas
+        self._nodes: set[int] = set()
+        self._points: list[int] = []
+        self._owners: list[int] = []
+
+        for node in nodes:
+            self.add(node)
+
+    def __repr__(self) -> str:
+        return f"<HashRing nodes={sorted(self._nodes)}>"
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __contains__(self, node: object) -> bool:
+        return node in self._nodes
+
+    @property
+    def nodes(self) -> frozenset[int]:
+        """The nodes on the ring"""
+
+        return frozenset(self._nodes)
+
+    def add(self, node: int) -> None:
+        """
+        Adds a node to the ring.
+
+        Parameters
+        -----------
+        node: int
+            The node
+        """
+
+        if node in self._nodes:
+            return
+
+        self._nodes.add(node)
+        for replica in range(self.replicas):
+            point = _hash(f"{node}:{replica}")
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, node)
+
+    def remove(self, node: int) -> None:
+        """
+        Removes a node from the ring.
+
+        Parameters
+        -----------
+        node: int
+            The node
+        """
+
+        if node not in self._nodes:
+            return
+
+        self._nodes.discard(node)
+        kept = [
+            (point, owner)
+            for point, owner in zip(self._points, self._owners)
+            if owner != node
+        ]
+        self._points = [point for point, _ in kept]
+        self._owners = [owner for _, owner in kept]
+
+    def get(self, key: int) -> int:
+        """
+        Gets the node that owns a key.
+
+        Parameters
+        -----------
+        key: int
+            The key, such as a chatroom id
+
+        Raises
+        -----------
+        LookupError
+            The ring has no nodes
+
+        Returns
+        -----------
+        int
+            The node
+        """
+
+        if not self._points:
+            raise LookupError("The hash ring has no nodes")
+
+        index = bisect.bisect(self._points, _hash(str(key)))
+        return self._owners[index % len(self._owners)]
+
+
+class _Worker:
+    def __init__(
+        self, shard_id: int, process: BaseProcess, conn: Connection
+    ) -> None:
+        self.shard_id = shard_id
+        self.process = process
+        self.conn = conn
+        self.restarts: int = 0
+        self.restart_at: Optional[float] = None
+        self.alive_at: datetime = datetime.now(timezone.utc)
+
+
+class AutoShardedClient(Client):
+    """
+    A client that handles its chatrooms across multiple processes.
+
+    Every worker process runs its own copy of the client, with its own `HTTPClient`
+    and websocket, so event handlers can use every core. Each chatroom, and each
+    watched user, belongs to one worker, picked with a `HashRing` over the chatroom
+    or channel id. Everything else is the same as `Client`: every worker runs
+    `Client.on_ready`, and connecting to a chatroom another worker owns does nothing.
+
+    The process that calls `AutoShardedClient.start` only supervises the workers. If one crashes,
+    its chatrooms are moved to the others, and backfilled, until it is restarted. They are moved back
+    once the restarted worker's `Client.on_ready` returns, so their events can be dispatched twice until then.
+    A worker that calls `Client.close` isn't restarted, and `AutoShardedClient.start` returns once every worker has closed.
+
+    The client is copied into the workers, so handlers must be set before starting it.
+    With a start method other than `"fork"`, the options and handlers must be picklable.
+
+    Parameters
+    -----------
+    processes: int = None
+        How many worker processes to run. Defaults to the amount of cores.
+    start_method: str = None
+        The multiprocessing start method to use, such as `"fork"` or `"spawn"`. Defaults to the platform's default.
+    **options: Any
+        The same options as `Client`
+
+    Attributes
+    -----------
+    process_count: int
+        How many worker processes are run
+    shard_id: int | None
+        The worker this is, or `None` in the supervising process
+    """
+
+    def __init__(
+        self,
+        *,
+        processes: Optional[int] = None,
+        start_method: Optional[str] = None,
+        **options: Any,
+    ) -> None:
+        super().__init__(**options)
+        self.process_count: int = processes or os.cpu_count() or 1
+        if self.process_count < 1:
+            raise ValueError("processes must be at least 1")
+
+        self.shard_id: Optional[int] = None
+        self._start_method: Optional[str] = start_method
+        self._ring: HashRing = HashRing(range(self.process_count))
+        self._conn: Optional[Connection] = None
+        self._workers: dict[int, _Worker] = {}
+        self._closing: bool = False
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = super().__getstate__()
+        state["options"] = {
+            **state["options"],
+            "processes": self.process_count,
+            "start_method": self._start_method,
+        }
+        return state
+
+    def _owns(self, id: int) -> bool:
+        return self.shard_id is None or self._ring.get(id) == self.shard_id
+
+    def dispatch(self, event_name: str, *args, **kwargs) -> None:
+        if event_name == "ready" and self._conn is not None:
+            # The supervisor moves chatrooms to a worker once its `on_ready` listeners are done
+            asyncio.create_task(self._ready(), name="event-dispatch: on_ready")
+            return
+
+        super().dispatch(event_name, *args, **kwargs)
+
+    async def _ready(self) -> None:
+        try:
+            await self._call_listeners("ready")
+        finally:
+            if self._conn is not None:
+                self._conn.send(("ready",))
+
+    async def start(self, credentials: Credentials | None = None) -> None:
+        """
+        |coro|
+
+        Starts the worker processes, and supervises them until they have all closed.
+        Each worker authenticates itself if credentials are provided.
+
+        Parameters
+        -----------
+        credentials: Optional[Credentials]
+            The credentials to authenticate yourself with, if any
+        """
+
+        if self.shard_id is not None:
+            await super().start(credentials)
+            return
+
+        context = multiprocessing.get_context(self._start_method)
+        members = set(range(self.process_count))
+        atexit.register(self._terminate_workers)
+        for shard_id in range(self.process_count):
+            self._spawn(context, shard_id, members, credentials)
+
+        try:
+            await self._supervise(context, members, credentials)
+        finally:
+            await self._stop_workers()
+            atexit.unregister(self._terminate_workers)
+
+    def _spawn(
+        self,
+        context: Any,
+        shard_id: int,
+        members: set[int],
+        credentials: Credentials | None,
+    ) -> None:
+        conn, child_conn = context.Pipe()
+        process = context.Process(
+            target=_run_worker,
+            args=(
+                self,
+                shard_id,
+                sorted(members | {shard_id}),
+                child_conn,
+                credentials,
+            ),
+            name=f"kick-shard-{shard_id}",
+            # Not daemonic, so shards can start event workers of their own.
+            # `_terminate_workers` stops them if we exit without closing.
+        )
+        process.start()
+        child_conn.close()
+
+        worker = self._workers.get(shard_id)
+        if worker is None:
+            self._workers[shard_id] = _Worker(shard_id, process, conn)
+        else:
+            worker.process = process
+            worker.conn = conn
+            worker.restart_at = None
+            worker.alive_at = datetime.now(timezone.utc)
+
+        LOGGER.debug(f"Started shard {shard_id} (pid {process.pid})")
+
+    def _broadcast(self, members: set[int], since: Optional[datetime] = None) -> None:
+        message = ("members", sorted(members), since and since.isoformat())
+        for worker in self._workers.values():
+            if worker.restart_at is None and worker.process.is_alive():
+                try:
+                    worker.conn.send(message)
+                except (BrokenPipeError, OSError):
+                    pass
+
+    async def _supervise(
+        self, context: Any, members: set[int], credentials: Credentials | None
+    ) -> None:
+        while not self._closing and self._workers:
+            await asyncio.sleep(SUPERVISE_INTERVAL)
+
+            for worker in list(self._workers.values()):
+                if worker.restart_at is not None:
+                    if time.monotonic() >= worker.restart_at:
+                        self._spawn(context, worker.shard_id, members, credentials)
+                    continue
+
+                while worker.process.is_alive() and worker.conn.poll():
+                    try:
+                        message = worker.conn.recv()
+                    except (EOFError, OSError):
+                        break
+
+                    if message[0] == "ready":
+                        worker.restarts = 0
+                        if worker.shard_id not in members:
+                            LOGGER.info(f"Shard {worker.shard_id} is back, moving its chatrooms back to it")
+                            members.add(worker.shard_id)
+                            self._broadcast(members)
+
+                if worker.process.is_alive():
+                    worker.alive_at = datetime.now(timezone.utc)
+                    continue
+
+                exitcode = worker.process.exitcode
+                worker.conn.close()
+                members.discard(worker.shard_id)
+
+                if exitcode == 0 or self._closing:
+                    LOGGER.info(f"Shard {worker.shard_id} closed")
+                    del self._workers[worker.shard_id]
+                    if members:
+                        self._broadcast(members)
+                    continue
+
+                delay = RESTART_BACKOFF.backoff(worker.restarts)
+                worker.restarts += 1
+                worker.restart_at = time.monotonic() + delay
+                LOGGER.warning(
+                    f"Shard {worker.shard_id} exited with code {exitcode}, restarting it in {delay:.2f} seconds"
+                )
+
+                if members:
+                    self._broadcast(members, worker.alive_at)
+
+    async def _stop_workers(self) -> None:
+        for worker in self._workers.values():
+            if worker.process.is_alive():
+                try:
+                    worker.conn.send(("close",))
+                except (BrokenPipeError, OSError):
+                    pass
+
+        deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+        for worker in self._workers.values():
+            while worker.process.is_alive() and time.monotonic() < deadline:
+                await asyncio.sleep(SUPERVISE_INTERVAL)
+            if worker.process.is_alive():
+                LOGGER.warning(f"Shard {worker.shard_id} did not close in time, terminating it")
+                worker.process.terminate()
+            worker.process.join()
+
+        self._workers.clear()
+
+    def _terminate_workers(self) -> None:
+        # Runs at exit before multiprocessing joins its children, which would
+        # otherwise wait forever on shards that were never told to close
+        for worker in self._workers.values():
+            if worker.process.is_alive():
+                LOGGER.warning(f"Terminating shard {worker.shard_id}, the client was not closed")
+                worker.process.terminate()
+                worker.process.join(SHUTDOWN_TIMEOUT)
+
+    async def _listen(self) -> None:
+        assert self._conn is not None
+        while True:
+            if not self._conn.poll():
+                await asyncio.sleep(SUPERVISE_INTERVAL)
+                continue
+
+            try:
+                message = self._conn.recv()
+            except (EOFError, OSError):
+                # The supervisor is gone
+                await self.close()
+                return
+
+            match message:
+                case ("members", members, since):
+                    await self._rebalance(
+                        members, since and datetime.fromisoformat(since)
+                    )
+                case ("close",):
+                    await self.close()
+                    return
+
+    async def _rebalance(
+        self, members: list[int], since: Optional[datetime]
+    ) -> None:
+        ws = self.http.ws
+        owned = {id for id in self._chatrooms if self._owns(id)}
+        watched = {id for id in self._watched_users if self._owns(id)}
+
+        self._ring = HashRing(members)
+        gained: list[int] = []
+        for id in self._chatrooms:
+            if id in owned and not self._owns(id):
+                await ws.unsubscribe_to_chatroom(id)
+            elif id not in owned and self._owns(id):
+                await ws.subscribe_to_chatroom(id)
+                gained.append(id)
+
+        for id in self._watched_users:
+            if id in watched and not self._owns(id):
+                await ws.unwatch_channel(id)
+            elif id not in watched and self._owns(id):
+                await ws.watch_channel(id)
+
+        LOGGER.debug(f"Shard {self.shard_id} now handles {len(gained)} more chatrooms")
+        if (
+            gained
+            and since is not None
+            and self._options.get("backfill_messages", True)
+            and self._has_listener("message")
+        ):
+            ws._start_backfill(since, gained)
+
+    async def close(self) -> None:
+        """
+        |coro|
+
+        In a worker, closes its HTTPClient. In the supervising process, closes every worker.
+        """
+
+        if self.shard_id is None:
+            self._closing = True
+        await super().close()
+
+
+def _run_worker(
+    client: AutoShardedClient,
+    shard_id: int,
+    members: list[int],
+    conn: Connection,
+    credentials: Credentials | None,
+) -> None:
+    client.shard_id = shard_id
+    client._ring = HashRing(members)
+    client._conn = conn
+    client._workers = {}
+
+    async def runner() -> None:
+        listener = asyncio.create_task(
+            client._listen(), name=f"shard-{shard_id}-listener"
+        )
+        try:
+            await client.start(credentials)
+        finally:
+            listener.cancel()
+
+    asyncio.run(runner())
@@ -0,0 +1,7 @@
+"""
+Tools for running kick.py offline, for tests and benchmarks.
+"""
+
+from .bypass import *
+from .fixtures import *
+from .server import *
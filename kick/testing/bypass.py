@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import random
+from typing import TYPE_CHECKING, Any, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from aiohttp import ClientConnectionError, ClientSession, web
+
+from ..utils import MISSING
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+LOGGER = logging.getLogger(__name__)
+
+__all__ = ("LocalBypass",)
+
+# Headers that describe a single connection, so they are never forwarded
+HOP_BY_HOP_HEADERS = frozenset(
+    {
+        "connection",
+        "content-encoding",
+        "content-length",
+        "host",
+        "keep-alive",
+        "transfer-encoding",
+    }
+)
+
+
+def _forwardable(headers: Any) -> dict[str, str]:
+    return {k: v for k, v in headers.items() if k.lower() not in HOP_BY_HOP_HEADERS}
+
+
+class LocalBypass:
+    """
+    A pure python stand-in for the bypass script, for tests and benchmarks.
+
+    It speaks the same protocol as the script made by `python -m kick bypass create`,
+    including the `/batch` endpoint, but doesn't need go or network access.
+    Requests are forwarded to `target` instead of kick, and latency, errors and
+    ratelimits can be injected to see how a bot behaves under them.
+
+    Parameters
+    -----------
+    host: str = "localhost"
+        The host to listen on
+    port: int = 9090
+        The port to listen on. 0 picks a free port.
+    target: Optional[str]
+        The origin to forward requests to instead of the one in their url, for example
+        a `MockKickServer`'s url. If not given, requests go to the url as is.
+    latency: float = 0.0
+        How many seconds to wait before forwarding each request
+    jitter: float = 0.0
+        A random amount of seconds, up to this, added to the latency of each request
+    error_rate: float = 0.0
+        The chance, between 0 and 1, that a request fails with a 502 like the bypass script does when it can't reach kick
+    ratelimit_rate: float = 0.0
+        The chance, between 0 and 1, that a request is answered with a 429
+    retry_after: float = 1.0
+        The `Retry-After` sent with injected 429s
+    seed: Optional[int]
+        Seeds the randomness of the injected failures, to make runs reproducible
+
+    Attributes
+    -----------
+    requests: int
+        How many requests were received, counting each request in a batch
+    errors: int
+        How many errors were injected
+    ratelimited: int
+        How many 429s were injected
+    """
+
+    def __init__(
+        self,
+        *,
+        host: str = "localhost",
+        port: int = 9090,
+        target: Optional[str] = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        ratelimit_rate: float = 0.0,
+        retry_after: float = 1.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.target = target
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.ratelimit_rate = ratelimit_rate
+        self.retry_after = retry_after
+
+        self.requests: int = 0
+        self.errors: int = 0
+        self.ratelimited: int = 0
+
+        self._random = random.Random(seed)
+        self._session: ClientSession = MISSING
+        self._runner: web.AppRunner = MISSING
+
+        self.app = web.Application()
+        self.app.router.add_route("*", "/request", self._handle_request)
+        self.app.router.add_post("/batch", self._handle_batch)
+
+    def __repr__(self) -> str:
+        return f"<LocalBypass url={self.url!r} target={self.target!r}>"
+
+    @property
+    def url(self) -> str:
+        """The url to pass as a bypass endpoint"""
+
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        """
+        |coro|
+
+        Starts listening for requests.
+        """
+
+        self._session = ClientSession()
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+
+        if self.port == 0:
+            self.port = self._runner.addresses[0][1]
+        LOGGER.info(f"Local bypass listening on {self.url}, forwarding to {self.target or 'kick'}")
+
+    async def close(self) -> None:
+        """
+        |coro|
+
+        Stops listening, and closes the forwarding session.
+        """
+
+        if self._runner is not MISSING:
+            await self._runner.cleanup()
+        if self._session is not MISSING:
+            await self._session.close()
+
+    async def __aenter__(self) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    def _rewrite(self, url: str) -> str:
+        if self.target is None:
+            return url
+
+        target = urlsplit(self.target)
+        parts = urlsplit(url)
+        return urlunsplit((target.scheme, target.netloc, parts.path, parts.query, ""))
+
+    async def _forward(
+        self, method: str, url: str, headers: dict[str, str], body: bytes
+    ) -> tuple[int, dict[str, str], str]:
+        self.requests += 1
+
+        delay = self.latency
+        if self.jitter:
+            delay += self._random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+
+        roll = self._random.random()
+        if roll < self.error_rate:
+            self.errors += 1
+            return 502, {}, "Injected error"
+        if roll < self.error_rate + self.ratelimit_rate:
+            self.ratelimited += 1
+            return (
+                429,
+                {"Retry-After": f"{self.retry_after:g}"},
+                json.dumps({"message": "Too Many Attempts."}),
+            )
+
+        try:
+            async with self._session.request(
+                method, self._rewrite(url), headers=headers, data=body or None
+            ) as res:
+                return res.status, _forwardable(res.headers), await res.text()
+        except ClientConnectionError as e:
+            LOGGER.warning(f"Request Failed: {e}")
+            return 502, {}, str(e)
+
+    async def _handle_request(self, request: web.Request) -> web.Response:
+        url = request.query.get("url", "")
+        status, headers, body = await self._forward(
+            request.method, url, _forwardable(request.headers), await request.read()
+        )
+        return web.Response(status=status, headers=headers, text=body)
+
+    async def _handle_batch(self, request: web.Request) -> web.StreamResponse:
+        try:
+            batch: list[dict[str, Any]] = await request.json()
+        except ValueError:
+            return web.Response(status=400, text="Invalid batch")
+
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+
+        async def run(item: dict[str, Any]) -> None:
+            status, headers, body = await self._forward(
+                item["method"],
+                item["url"],
+                _forwardable(item.get("headers") or {}),
+                (item.get("body") or "").encode("utf-8"),
+            )
+            line = {"id": item["id"], "status": status, "headers": headers, "body": body}
+            await response.write(json.dumps(line).encode("utf-8") + b"\n")
+
+        await asyncio.gather(*(run(item) for item in batch))
+        await response.write_eof()
+        return response
+
+    def run(self) -> None:
+        """
+        Runs the stand-in until interrupted. This blocks.
+        """
+
+        async def runner() -> None:
+            async with self:
+                await asyncio.Event().wait()
+
+        try:
+            asyncio.run(runner())
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+import itertools
+import uuid
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from ..types.all import StatusPayload
+    from ..types.categories import CategoryDocument
+    from ..types.chatroom import BanEntryPayload, PollPayload
+    from ..types.emotes import EmotePayload
+    from ..types.message import MessagePayload
+    from ..types.user import ChatterPayload, ClientUserPayload, UserPayload
+
+__all__ = (
+    "make_channel",
+    "make_message",
+    "make_chatter",
+    "make_ban",
+    "make_poll",
+    "make_emote",
+    "make_category",
+    "make_client_user",
+    "make_status",
+)
+
+CDN = "https://files.kick.com"
+
+_ids = itertools.count(1)
+
+
+def _next_id() -> int:
+    return next(_ids)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def make_status(code: int = 200, message: str = "SUCCESS") -> StatusPayload:
+    """
+    Makes the status object most of kick's responses are wrapped with.
+    """
+
+    return {"error": code >= 400, "code": code, "message": message}
+
+
+def make_channel(
+    slug: str,
+    *,
+    id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    chatroom_id: Optional[int] = None,
+    followers_count: int = 0,
+    bio: str = "",
+) -> UserPayload:
+    """
+    Makes the payload of `/api/v2/channels/{slug}`.
+
+    Parameters
+    -----------
+    slug: str
+        The channel's slug, which is also used as the username
+    id: Optional[int]
+        The channel's id. Generated if not given.
+    user_id: Optional[int]
+        The id of the channel's user. Generated if not given.
+    chatroom_id: Optional[int]
+        The id of the channel's chatroom. Generated if not given.
+    followers_count: int = 0
+        How many followers the channel has
+    bio: str = ""
+        The user's bio
+
+    Returns
+    -----------
+    UserPayload
+        The payload
+    """
+
+    id = id or _next_id()
+    user_id = user_id or _next_id()
+    chatroom_id = chatroom_id or _next_id()
+    created_at = _now()
+
+    return {
+        "id": id,
+        "user_id": user_id,
+        "slug": slug,
+        "is_banned": False,
+        "playback_url": f"https://stream.kick.com/{slug}/playlist.m3u8",
+        "vod_enabled": True,
+        "subscription_enabled": True,
+        "followers_count": followers_count,
+        "subscriber_badges": [],
+        "banner_image": None,
+        "role": None,
+        "muted": False,
+        "follower_badges": [],
+        "offline_banner_image": None,
+        "verified": False,
+        "can_host": True,
+        "user": {
+            "id": user_id,
+            "username": slug,
+            "agreed_to_terms": True,
+            "email_verified_at": created_at,
+            "bio": bio,
+            "country": None,
+            "state": None,
+            "city": None,
+            "instagram": "",
+            "twitter": "",
+            "youtube": "",
+            "discord": "",
+            "tiktok": "",
+            "facebook": "",
+            "profile_pic": f"{CDN}/images/user/{user_id}/profile_image/conversion/default.webp",
+        },
+        "chatroom": {
+            "id": chatroom_id,
+            "chatable_type": "App\\Models\\Channel",
+            "channel_id": id,
+            "created_at": created_at,
+            "updated_at": created_at,
+            "chat_mode_old": "public",
+            "chat_mode": "public",
+            "slow_mode": False,
+            "chatable_id": id,
+            "followers_mode": False,
+            "subscribers_mode": False,
+            "emotes_mode": False,
+            "message_interval": 0,
+            "following_min_duration": 0,
+        },
+        "livestream": None,
+        "recent_categories": [],
+    }  # type: ignore
+
+
+def make_message(
+    chatroom_id: int,
+    content: str,
+    *,
+    author_id: Optional[int] = None,
+    author_name: Optional[str] = None,
+) -> MessagePayload:
+    """
+    Makes a chat message, like the ones sent over the websocket.
+
+    Parameters
+    -----------
+    chatroom_id: int
+        The id of the chatroom the message is sent in
+    content: str
+        The message's content
+    author_id: Optional[int]
+        The id of the author. Generated if not given.
+    author_name: Optional[str]
+        The name of the author. Generated from the id if not given.
+
+    Returns
+    -----------
+    MessagePayload
+        The payload
+    """
+
+    author_id = author_id or _next_id()
+    author_name = author_name or f"chatter_{author_id}"
+
+    return {
+        "id": str(uuid.uuid4()),
+        "chatroom_id": chatroom_id,
+        "content": content,
+        "type": "message",
+        "created_at": _now(),
+        "sender": {
+            "id": author_id,
+            "username": author_name,
+            "slug": author_name.lower().replace("_", "-"),
+            "identity": {"color": "#FFFFFF", "badges": []},
+        },
+    }
+
+
+def make_chatter(username: str, *, id: Optional[int] = None) -> ChatterPayload:
+    """
+    Makes the payload of `/api/v2/channels/{slug}/users/{username}`.
+    """
+
+    return {
+        "id": id or _next_id(),
+        "username": username,
+        "slug": username.lower().replace("_", "-"),
+        "profile_pic": None,
+        "is_staff": False,
+        "is_channel_owner": False,
+        "is_moderator": False,
+        "badges": [],
+        "following_since": None,
+        "subscribed_for": 0,
+        "banned": None,
+    }
+
+
+def make_ban(
+    banned: str,
+    *,
+    banned_by: str = "moderator",
+    reason: str = "",
+    duration: Optional[int] = None,
+) -> BanEntryPayload:
+    """
+    Makes a ban entry, like the ones in `/api/v2/channels/{slug}/bans`.
+
+    If a duration is given, in minutes, the ban is a timeout.
+    """
+
+    now = datetime.now(timezone.utc)
+    if duration is None:
+        expires_at = None
+    else:
+        expires_at = datetime.fromtimestamp(
+            now.timestamp() + duration * 60, timezone.utc
+        ).isoformat()
+
+    return {
+        "banned_user": {"id": _next_id(), "username": banned},
+        "banned_by": {"id": _next_id(), "username": banned_by},
+        "ban": {
+            "reason": reason,
+            "banned_at": now.isoformat(),
+            "permanent": duration is None,
+            "expires_at": expires_at,
+        },
+    }  # type: ignore
+
+
+def make_poll(
+    title: str,
+    options: list[str],
+    *,
+    duration: int = 30,
+    result_display_duration: int = 15,
+) -> PollPayload:
+    """
+    Makes a poll, like the one in `/api/v2/channels/{slug}/polls`.
+    """
+
+    return {
+        "title": title,
+        "options": [
+            {"id": index, "label": label, "votes": 0}
+            for index, label in enumerate(options)
+        ],
+        "duration": duration,
+        "remaining": duration,
+        "result_display_duration": result_display_duration,
+        "has_voted": False,
+    }
+
+
+def make_emote(
+    name: str, *, channel_id: Optional[int] = None, subscribers_only: bool = False
+) -> EmotePayload:
+    """
+    Makes an emote. Emotes without a channel id are global.
+    """
+
+    return {
+        "id": _next_id(),
+        "channel_id": channel_id,  # type: ignore
+        "name": name,
+        "subscribers_only": subscribers_only,
+    }
+
+
+def make_category(name: str, *, parent: str = "Games") -> CategoryDocument:
+    """
+    Makes a category, like the ones in the category search results.
+    """
+
+    id = _next_id()
+    slug = name.lower().replace(" ", "-")
+    src = f"{CDN}/images/subcategories/{id}/banner/{slug}.webp"
+
+    return {
+        "category_id": id,
+        "description": "",
+        "id": str(id),
+        "is_live": False,
+        "is_mature": False,
+        "name": name,
+        "parent": parent,
+        "slug": slug,
+        "src": src,
+        "srcset": src,
+    }
+
+
+def make_client_user(username: str, *, id: Optional[int] = None) -> ClientUserPayload:
+    """
+    Makes the payload of `/api/v1/user`.
+    """
+
+    id = id or _next_id()
+    return {
+        "id": id,
+        "email": f"{username}@example.com",
+        "username": username,
+        "google_id": None,
+        "agreed_to_terms": True,
+        "email_verified_at": _now(),
+        "bio": None,
+        "country": None,
+        "state": None,
+        "city": None,
+        "enable_live_notifications": False,
+        "youtube": None,
+        "instagram": None,
+        "twitter": None,
+        "discord": None,
+        "tiktok": None,
+        "facebook": None,
+        "enable_onscreen_live_notifications": False,
+        "apple_id": None,
+        "phone": None,
+        "email_updated_at": None,
+        "newsletter_subscribed": False,
+        "enable_sms_promo": False,
+        "enable_sms_security": False,
+        "is_2fa_setup": False,
+        "redirect": None,
+        "channel_can_be_updated": True,
+        "is_live": False,
+        "intercom_hash": None,
+        "streamer_channel": {
+            "id": _next_id(),
+            "user_id": id,
+            "slug": username.lower().replace("_", "-"),
+            "is_banned": False,
+            "playback_url": None,
+            "name_updated_at": None,
+            "vod_enabled": True,
+            "subscription_enabled": False,
+            "can_host": True,
+            "verified": None,
+        },
+        "roles": [],
+        "profilepic": None,
+    }
+
@@ -0,0 +1,813 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import random
+from collections import deque
+from typing import TYPE_CHECKING, Any, Optional
+
+from aiohttp import WSMsgType, web
+
+from ..utils import MISSING
+from .fixtures import (
+    make_ban,
+    make_category,
+    make_channel,
+    make_chatter,
+    make_client_user,
+    make_emote,
+    make_message,
+    make_poll,
+    make_status,
+)
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+    from ..types.categories import CategoryDocument
+    from ..types.chatroom import BanEntryPayload, PollPayload
+    from ..types.emotes import EmotePayload
+    from ..types.message import MessagePayload
+    from ..types.user import ClientUserPayload, UserPayload
+
+LOGGER = logging.getLogger(__name__)
+
+__all__ = ("MockChannel", "MockKickServer")
+
+# The pusher app key kick's frontend connects with
+PUSHER_APP_KEY = "eb1d5f283081a78b932c"
+
+WORDS = (
+    "hello", "chat", "gg", "lol", "kekw", "pog", "nice", "play", "stream",
+    "what", "is", "this", "wow", "no", "way", "lets", "go", "again", "bro",
+)  # fmt: skip
+
+
+def _json(data: Any, *, status: int = 200) -> web.Response:
+    return web.json_response(data, status=status)
+
+
+def _not_found(message: str = "Not Found") -> web.Response:
+    return _json({"message": message}, status=404)
+
+
+class MockChannel:
+    """
+    A channel on a `MockKickServer`, and the state of its chatroom.
+
+    The attributes can be changed freely, and are what the server responds with.
+
+    Attributes
+    -----------
+    data: UserPayload
+        What `/api/v2/channels/{slug}` responds with
+    rules: str
+        The chatroom's rules
+    banned_words: list[str]
+        The chatroom's banned words
+    bans: list[BanEntryPayload]
+        The chatroom's bans
+    poll: Optional[PollPayload]
+        The chatroom's current poll
+    emotes: list[EmotePayload]
+        The channel's emotes
+    messages: deque[MessagePayload]
+        The most recent messages sent in the chatroom
+    message_rate: float
+        How many random messages per second the server sends in the chatroom
+    """
+
+    def __init__(
+        self, data: UserPayload, *, history: int = 100, message_rate: float = 0.0
+    ) -> None:
+        self.data: UserPayload = data
+        self.rules: str = "Be nice"
+        self.banned_words: list[str] = []
+        self.bans: list[BanEntryPayload] = []
+        self.poll: Optional[PollPayload] = None
+        self.emotes: list[EmotePayload] = [
+            make_emote("hype", channel_id=data["id"])
+        ]
+        self.messages: deque[MessagePayload] = deque(maxlen=history)
+        self.message_rate: float = message_rate
+
+        self._due: float = 0.0
+
+    def __repr__(self) -> str:
+        return f"<MockChannel slug={self.slug!r} chatroom_id={self.chatroom_id} message_rate={self.message_rate}>"
+
+    @property
+    def slug(self) -> str:
+        return self.data["slug"]
+
+    @property
+    def id(self) -> int:
+        return self.data["id"]
+
+    @property
+    def chatroom_id(self) -> int:
+        return self.data["chatroom"]["id"]
+
+    @property
+    def pusher_channel(self) -> str:
+        """The pusher channel the chatroom's messages are sent on"""
+
+        return f"chatrooms.{self.chatroom_id}.v2"
+
+
+class MockKickServer:
+    """
+    An offline stand-in for kick's api and pusher websocket, for tests and benchmarks.
+
+    It serves the routes `HTTPClient` uses from fixtures, and runs a pusher compatible
+    websocket that sends random chat messages at a configurable rate per chatroom.
+    Since the client sends its requests through the bypass script, put a `LocalBypass`
+    that targets this server in front of it.
+
+    ```py
+    async with MockKickServer() as server, LocalBypass(target=server.url) as bypass:
+        server.add_channel("streamer", message_rate=100)
+        client = kick.Client(bypass_endpoints=[bypass.url], ws_url=server.ws_url)
+    ```
+
+    Parameters
+    -----------
+    host: str = "localhost"
+        The host to listen on
+    port: int = 0
+        The port to listen on. 0 picks a free port.
+    auto_create: bool = True
+        Whether channels that were not added are made up when they are asked for, instead of 404ing
+    history: int = 100
+        How many messages are kept per chatroom, and returned when fetching its messages
+    tick: float = 0.01
+        How often, in seconds, the random messages are sent. Lower is smoother but costs more.
+    seed: Optional[int]
+        Seeds the random messages, to make runs reproducible
+
+    Attributes
+    -----------
+    channels: dict[str, MockChannel]
+        The channels, by slug
+    user: ClientUserPayload
+        The user that logging in gives, and that sends messages
+    categories: list[CategoryDocument]
+        The categories that can be searched for
+    global_emotes: list[EmotePayload]
+        The global emotes
+    requests: int
+        How many http requests were received
+    messages_sent: int
+        How many chat messages were sent over the websocket
+    """
+
+    def __init__(
+        self,
+        *,
+        host: str = "localhost",
+        port: int = 0,
+        auto_create: bool = True,
+        history: int = 100,
+        tick: float = 0.01,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.auto_create = auto_create
+        self.history = history
+        self.tick = tick
+
+        self.channels: dict[str, MockChannel] = {}
+        self.user: ClientUserPayload = make_client_user("kick_py_bot")
+        self.categories: list[CategoryDocument] = [
+            make_category(name)
+            for name in ("Just Chatting", "Slots & Casino", "Grand Theft Auto V")
+        ]
+        self.global_emotes: list[EmotePayload] = [make_emote("KEKW"), make_emote("GIGACHAD")]
+        self.requests: int = 0
+        self.messages_sent: int = 0
+
+        self._chatrooms: dict[int, MockChannel] = {}
+        self._subscribers: dict[str, set[web.WebSocketResponse]] = {}
+        self._sockets: set[web.WebSocketResponse] = set()
+        self._random = random.Random(seed)
+        self._runner: web.AppRunner = MISSING
+        self._emitter: asyncio.Task | None = None
+        self._refuse_until: float = 0.0
+
+        self.app = web.Application(middlewares=[self._count_requests])
+        self.app.add_routes(
+            [
+                web.get("/app/{key}", self._handle_ws),
+                web.get("/kick-token-provider", self._token_provider),
+                web.post("/mobile/login", self._login),
+                web.get("/api/v1/user", self._get_me),
+                web.post("/api/v1/chat-messages", self._send_message),
+                web.get("/api/v2/channels/{slug}", self._get_channel),
+                web.get("/api/v2/channels/{slug}/users/{chatter}", self._get_chatter),
+                web.get("/api/v2/channels/{chatroom}/messages", self._get_messages),
+                web.get("/api/v2/channels/{slug}/chatroom/rules", self._get_rules),
+                web.get("/api/v2/channels/{slug}/chatroom/banned-words", self._get_banned_words),
+                web.put("/api/v2/channels/{slug}/chatroom", self._edit_chatroom),
+                web.get("/api/v2/channels/{slug}/videos", self._get_videos),
+                web.get("/api/v2/channels/{slug}/bans", self._get_bans),
+                web.post("/api/v2/channels/{slug}/bans", self._ban),
+                web.delete("/api/v2/channels/{slug}/bans/{chatter}", self._unban),
+                web.get("/api/v2/channels/{slug}/polls", self._get_poll),
+                web.post("/api/v2/channels/{slug}/polls", self._create_poll),
+                web.delete("/api/v2/channels/{slug}/polls", self._delete_poll),
+                web.post("/api/v2/channels/{slug}/polls/vote", self._vote),
+                web.post("/api/v2/messages/send/{chatroom}", self._reply),
+                web.delete("/api/v2/chatrooms/{chatroom}/messages/{message_id}", self._delete_message),
+                web.get("/emotes/{slug}", self._get_emotes),
+                web.get("/channels/{slug}/leaderboards", self._get_leaderboard),
+                web.get("/stream/publish_token", self._get_publish_token),
+                web.put("/stream/info", self._set_stream_info),
+                web.get("/collections/subcategory_index/documents/search", self._search),
+            ]
+        )  # fmt: skip
+
+    def __repr__(self) -> str:
+        return f"<MockKickServer url={self.url!r} channels={len(self.channels)}>"
+
+    @property
+    def url(self) -> str:
+        """The url to forward kick's api requests to"""
+
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def ws_url(self) -> str:
+        """The url to connect to the websocket with"""
+
+        return f"ws://{self.host}:{self.port}/app/{PUSHER_APP_KEY}?protocol=7&client=js&version=7.6.0&flash=false"
+
+    def add_channel(self, slug: str, *, message_rate: float = 0.0, **fields: Any) -> MockChannel:
+        """
+        Adds a channel.
+
+        Parameters
+        -----------
+        slug: str
+            The channel's slug
+        message_rate: float = 0.0
+            How many random messages per second to send in the channel's chatroom
+        **fields: Any
+            Passed to `make_channel`, for example `chatroom_id`
+
+        Returns
+        -----------
+        MockChannel
+            The channel
+        """
+
+        channel = MockChannel(
+            make_channel(slug, **fields), history=self.history, message_rate=message_rate
+        )
+        self.channels[slug] = channel
+        self._chatrooms[channel.chatroom_id] = channel
+        return channel
+
+    def get_channel(self, slug: str) -> Optional[MockChannel]:
+        """
+        Gets a channel by its slug, making it up if `auto_create` is enabled.
+        """
+
+        channel = self.channels.get(slug)
+        if channel is None and self.auto_create:
+            channel = self.add_channel(slug)
+        return channel
+
+    def get_chatroom(self, chatroom_id: int) -> Optional[MockChannel]:
+        """
+        Gets a channel by its chatroom's id.
+        """
+
+        return self._chatrooms.get(chatroom_id)
+
+    async def broadcast(self, channel: str, event: str, data: Any) -> int:
+        """
+        |coro|
+
+        Sends an event to everyone subscribed to a pusher channel.
+
+        Parameters
+        -----------
+        channel: str
+            The pusher channel, for example `chatrooms.1.v2` or `channel.1`
+        event: str
+            The event, for example `App\\Events\\StreamerIsLive`
+        data: Any
+            The event's data
+
+        Returns
+        -----------
+        int
+            How many websockets it was sent to
+        """
+
+        sockets = self._subscribers.get(channel)
+        if not sockets:
+            return 0
+
+        # Pusher sends the data as a JSON string inside the JSON frame
+        frame = json.dumps({"event": event, "data": json.dumps(data), "channel": channel})
+
+        sent = 0
+        for ws in list(sockets):
+            if ws.closed:
+                sockets.discard(ws)
+                continue
+            try:
+                await ws.send_str(frame)
+            except ConnectionResetError:
+                sockets.discard(ws)
+            else:
+                sent += 1
+        return sent
+
+    async def send_message(
+        self,
+        chatroom_id: int,
+        content: str,
+        *,
+        author_id: Optional[int] = None,
+        author_name: Optional[str] = None,
+    ) -> MessagePayload:
+        """
+        |coro|
+
+        Sends a message in a chatroom, as if someone typed it.
+
+        Parameters
+        -----------
+        chatroom_id: int
+            The chatroom's id
+        content: str
+            The message's content
+        author_id: Optional[int]
+            The id of the author. Generated if not given.
+        author_name: Optional[str]
+            The name of the author. Generated if not given.
+
+        Returns
+        -----------
+        MessagePayload
+            The message that was sent
+        """
+
+        message = make_message(
+            chatroom_id, content, author_id=author_id, author_name=author_name
+        )
+        await self._publish(message)
+        return message
+
+    async def disconnect_all(self, *, refuse_for: float = 0.0) -> None:
+        """
+        |coro|
+
+        Closes every websocket, to see how clients handle connection drops.
+
+        Parameters
+        -----------
+        refuse_for: float = 0.0
+            How many seconds to refuse new websocket connections for afterwards, to simulate an outage
+        """
+
+        if refuse_for:
+            self._refuse_until = asyncio.get_running_loop().time() + refuse_for
+        for ws in list(self._sockets):
+            await ws.close()
+
+    async def _publish(self, message: MessagePayload) -> None:
+        channel = self._chatrooms.get(message["chatroom_id"])
+        if channel is not None:
+            channel.messages.append(message)
+
+        self.messages_sent += await self.broadcast(
+            f"chatrooms.{message['chatroom_id']}.v2",
+            "App\\Events\\ChatMessageEvent",
+            message,
+        )
+
+    def _random_content(self) -> str:
+        return " ".join(self._random.choices(WORDS, k=self._random.randint(1, 8)))
+
+    async def _emit_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        last = loop.time()
+
+        while True:
+            await asyncio.sleep(self.tick)
+            now = loop.time()
+            elapsed, last = now - last, now
+
+            for channel in list(self._chatrooms.values()):
+                if not channel.message_rate:
+                    continue
+
+                channel._due += channel.message_rate * elapsed
+                count = int(channel._due)
+                channel._due -= count
+
+                for _ in range(count):
+                    author_id = self._random.randint(1, 10_000)
+                    await self.send_message(
+                        channel.chatroom_id,
+                        self._random_content(),
+                        author_id=author_id,
+                    )
+
+    async def start(self) -> None:
+        """
+        |coro|
+
+        Starts listening for requests, and sending messages.
+        """
+
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+
+        if self.port == 0:
+            self.port = self._runner.addresses[0][1]
+        self._emitter = asyncio.create_task(self._emit_loop(), name="mock-kick-emitter")
+        LOGGER.info(f"Mock kick server listening on {self.url}")
+
+    async def close(self) -> None:
+        """
+        |coro|
+
+        Stops sending messages, closes every websocket, and stops listening.
+        """
+
+        if self._emitter is not None:
+            self._emitter.cancel()
+            self._emitter = None
+        await self.disconnect_all()
+        if self._runner is not MISSING:
+            await self._runner.cleanup()
+
+    async def __aenter__(self) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    def run(self) -> None:
+        """
+        Runs the server until interrupted. This blocks.
+        """
+
+        async def runner() -> None:
+            async with self:
+                await asyncio.Event().wait()
+
+        try:
+            asyncio.run(runner())
+        except KeyboardInterrupt:
+            pass
+
+    @web.middleware
+    async def _count_requests(self, request: web.Request, handler: Any) -> web.StreamResponse:
+        if not request.path.startswith("/app/"):
+            self.requests += 1
+        return await handler(request)
+
+    # Pusher
+
+    async def _handle_ws(self, request: web.Request) -> web.WebSocketResponse:
+        if request.match_info["key"] != PUSHER_APP_KEY:
+            raise web.HTTPNotFound()
+        if asyncio.get_running_loop().time() < self._refuse_until:
+            raise web.HTTPServiceUnavailable()
+
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self._sockets.add(ws)
+
+        socket_id = f"{self._random.randint(1, 999999)}.{self._random.randint(1, 9999999)}"
+        await ws.send_json(
+            {
+                "event": "pusher:connection_established",
+                "data": json.dumps({"socket_id": socket_id, "activity_timeout": 120}),
+            }
+        )
+
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+
+                try:
+                    payload = json.loads(msg.data)
+                    event = payload["event"]
+                except (ValueError, KeyError, TypeError):
+                    continue
+
+                data = payload.get("data") or {}
+                match event:
+                    case "pusher:ping":
+                        await ws.send_json({"event": "pusher:pong", "data": {}})
+                    case "pusher:subscribe":
+                        channel = data["channel"]
+                        self._subscribers.setdefault(channel, set()).add(ws)
+                        await ws.send_json(
+                            {
+                                "event": "pusher_internal:subscription_succeeded",
+                                "data": "{}",
+                                "channel": channel,
+                            }
+                        )
+                    case "pusher:unsubscribe":
+                        self._subscribers.get(data["channel"], set()).discard(ws)
+        finally:
+            self._sockets.discard(ws)
+            for sockets in self._subscribers.values():
+                sockets.discard(ws)
+
+        return ws
+
+    # Api
+
+    def _channel_or_404(self, request: web.Request) -> MockChannel:
+        channel = self.get_channel(request.match_info["slug"])
+        if channel is None:
+            raise web.HTTPNotFound(
+                text=json.dumps({"message": "Channel not found"}),
+                content_type="application/json",
+            )
+        return channel
+
+    async def _token_provider(self, request: web.Request) -> web.Response:
+        return _json(
+            {
+                "enabled": True,
+                "nameFieldName": "_kick_token_name",
+                "unrandomizedNameFieldName": "_kick_token",
+                "validFromFieldName": "_kick_token_valid_from",
+                "encryptedValidFrom": "mock",
+            }
+        )
+
+    async def _login(self, request: web.Request) -> web.Response:
+        return _json({"2fa_required": False, "token": "mock-token"})
+
+    async def _get_me(self, request: web.Request) -> web.Response:
+        return _json(self.user)
+
+    async def _send_message(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        try:
+            chatroom_id = int(form["chatroom_id"])  # type: ignore
+            content = str(form["message"])
+        except (KeyError, ValueError):
+            return _json({"status": make_status(400, "Invalid message")}, status=400)
+
+        await self.send_message(
+            chatroom_id,
+            content,
+            author_id=self.user["id"],
+            author_name=self.user["username"],
+        )
+        return _json(make_status())
+
+    async def _reply(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        message: dict[str, Any] = make_message(
+            int(request.match_info["chatroom"]),
+            body["content"],
+            author_id=self.user["id"],
+            author_name=self.user["username"],
+        )  # type: ignore
+        message["type"] = body.get("type", "message")
+        if body.get("metadata"):
+            message["metadata"] = body["metadata"]
+
+        await self._publish(message)  # type: ignore
+        return _json({"status": make_status(), "data": message})
+
+    async def _delete_message(self, request: web.Request) -> web.Response:
+        channel = self.get_chatroom(int(request.match_info["chatroom"]))
+        if channel is None:
+            return _not_found()
+
+        message_id = request.match_info["message_id"]
+        for message in channel.messages:
+            if message["id"] == message_id:
+                channel.messages.remove(message)
+                return _json({"status": make_status(), "data": None})
+        return _not_found("Message not found")
+
+    async def _get_channel(self, request: web.Request) -> web.Response:
+        return _json(self._channel_or_404(request).data)
+
+    async def _get_chatter(self, request: web.Request) -> web.Response:
+        self._channel_or_404(request)
+        return _json(make_chatter(request.match_info["chatter"]))
+
+    async def _get_messages(self, request: web.Request) -> web.Response:
+        try:
+            channel = self.get_chatroom(int(request.match_info["chatroom"]))
+        except ValueError:
+            channel = None
+        if channel is None:
+            return _not_found()
+
+        return _json(
+            {
+                "status": make_status(),
+                "data": {"messages": list(reversed(channel.messages)), "cursor": ""},
+            }
+        )
+
+    async def _get_rules(self, request: web.Request) -> web.Response:
+        channel = self._channel_or_404(request)
+        return _json({"status": make_status(), "data": {"rules": channel.rules}})
+
+    async def _get_banned_words(self, request: web.Request) -> web.Response:
+        channel = self._channel_or_404(request)
+        return _json(
+            {"status": make_status(), "data": {"words": channel.banned_words}}
+        )
+
+    async def _edit_chatroom(self, request: web.Request) -> web.Response:
+        channel = self._channel_or_404(request)
+        chatroom: dict[str, Any] = channel.data["chatroom"]  # type: ignore
+        for key, value in (await request.json()).items():
+            key = key.strip()
+            if key in chatroom:
+                chatroom[key] = value
+
+        return _json(
+            {
+                "id": chatroom["id"],
+                "slow_mode": {
+                    "enabled": chatroom["slow_mode"],
+                    "message_interval": chatroom["message_interval"],
+                },
+                "subscribers_mode": {"enabled": chatroom["subscribers_mode"]},
+                "followers_mode": {
+                    "enabled": chatroom["followers_mode"],
+                    "min_duration": chatroom["following_min_duration"],
+                },
+                "emotes_mode": {"enabled": chatroom["emotes_mode"]},
+            }
+        )
+
+    async def _get_videos(self, request: web.Request) -> web.Response:
+        self._channel_or_404(request)
+        return _json([])
+
+    async def _get_bans(self, request: web.Request) -> web.Response:
+        return _json(self._channel_or_404(request).bans)
+
+    async def _ban(self, request: web.Request) -> web.Response:
+        channel = self._channel_or_404(request)
+        body = await request.json()
+
+        entry = make_ban(
+            body["banned_username"],
+            banned_by=self.user["username"],
+            reason=body.get("reason", ""),
+            duration=None if body.get("permanent") else body.get("duration"),
+        )
+        channel.bans.append(entry)
+
+        ban = entry["ban"]
+        return _json(
+            {
+                "status": make_status(),
+                "data": {
+                    "id": str(entry["banned_user"]["id"]),
+                    "chat_id": channel.chatroom_id,
+                    "banned_id": entry["banned_user"]["id"],
+                    "banner_id": self.user["id"],
+                    "reason": ban["reason"],
+                    "type": "permanent" if ban["permanent"] else "timeout",
+                    "permanent": ban["permanent"],
+                    "created_at": ban["banned_at"],
+                    "expires_at": ban["expires_at"],
+                },
+            }
+        )
+
+    async def _unban(self, request: web.Request) -> web.Response:
+        channel = self._channel_or_404(request)
+        chatter = request.match_info["chatter"]
+        channel.bans = [
+            entry
+            for entry in channel.bans
+            if entry["banned_user"]["username"] != chatter
+        ]
+        return _json({"status": True, "message": "User unbanned"})
+
+    async def _get_poll(self, request: web.Request) -> web.Response:
+        channel = self._channel_or_404(request)
+        if channel.poll is None:
+            return _not_found("No poll found")
+        return _json({"status": make_status(), "data": {"poll": channel.poll}})
+
+    async def _create_poll(self, request: web.Request) -> web.Response:
+        channel = self._channel_or_404(request)
+        body = await request.json()
+        channel.poll = make_poll(
+            body["title"],
+            body["options"],
+            duration=body["duration"],
+            result_display_duration=body["result_display_duration"],
+        )
+        return _json({"status": make_status(), "data": {"poll": channel.poll}})
+
+    async def _delete_poll(self, request: web.Request) -> web.Response:
+        channel = self._channel_or_404(request)
+        channel.poll = None
+        return _json({"status": make_status(), "data": None})
+
+    async def _vote(self, request: web.Request) -> web.Response:
+        channel = self._channel_or_404(request)
+        if channel.poll is None:
+            return _not_found("No poll found")
+
+        option_id = (await request.json())["id"]
+        for option in channel.poll["options"]:
+            if option["id"] == option_id:
+                option["votes"] += 1
+                channel.poll["has_voted"] = True
+                return _json({"status": make_status(), "data": {"poll": channel.poll}})
+        return _json({"status": make_status(400, "Invalid option")}, status=400)
+
+    async def _get_emotes(self, request: web.Request) -> web.Response:
+        channel = self._channel_or_404(request)
+        data = channel.data
+        return _json(
+            [
+                {
+                    "id": data["id"],
+                    "user_id": data["user_id"],
+                    "slug": data["slug"],
+                    "is_banned": data["is_banned"],
+                    "playback_url": data["playback_url"],
+                    "name_updated_at": None,
+                    "vod_enabled": data["vod_enabled"],
+                    "subscription_enabled": data["subscription_enabled"],
+                    "emotes": channel.emotes,
+                    "can_host": data["can_host"],
+                    "user": data["user"],
+                },
+                {"name": "Global", "id": "Global", "emotes": self.global_emotes},
+                {"name": "Emojis", "id": "Emoji", "emotes": channel.emotes},
+            ]
+        )
+
+    async def _get_leaderboard(self, request: web.Request) -> web.Response:
+        self._channel_or_404(request)
+        return _json({"gifts": [], "gifts_week": [], "gifts_month": []})
+
+    async def _get_publish_token(self, request: web.Request) -> web.Response:
+        return _json(
+            {
+                "rtmp_publish_path": "rtmps://localhost/app",
+                "rtmp_stream_token": "mock-stream-key",
+            }
+        )
+
+    async def _set_stream_info(self, request: web.Request) -> web.Response:
+        return _json(await request.json())
+
+    async def _search(self, request: web.Request) -> web.Response:
+        query = request.query.get("q", "").lower()
+        hits = [
+            {
+                "document": category,
+                "highlight": {},
+                "highlights": [],
+                "text_match": 0,
+                "text_match_info": {
+                    "best_field_score": "0",
+                    "best_field_weight": 0,
+                    "fields_matched": 1,
+                    "num_tokens_dropped": 0,
+                    "score": "0",
+                    "tokens_matched": 1,
+                    "typo_prefix_score": 0,
+                },
+            }
+            for category in self.categories
+            if query in category["name"].lower()
+        ]
+        return _json(
+            {
+                "facet_counts": [],
+                "found": len(hits),
+                "hits": hits,
+                "out_of": len(self.categories),
+                "page": 1,
+                "request_params": {"q": query},
+                "search_cutoff": False,
+                "search_time_ms": 0,
+            }
+        )
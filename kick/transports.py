@@ -0,0 +1,420 @@
+from __future__ import annotations
+
+import inspect
+import json
+import time
+from abc import ABC, abstractmethod
+from http.cookies import SimpleCookie
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Mapping,
+    Optional,
+    Union,
+)
+
+from aiohttp import ClientConnectionError, ClientConnectorError, ClientSession
+from multidict import CIMultiDict
+
+from .utils import MISSING
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+__all__ = (
+    "Transport",
+    "TransportResponse",
+    "AiohttpTransport",
+    "MemoryTransport",
+    "RecordingTransport",
+    "RecordedExchange",
+)
+
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj)
+
+
+class TransportResponse:
+    """
+    A response returned by a `Transport`.
+
+    It also has the parts of `aiohttp.ClientResponse` that `HTTPClient` uses, such as `read` and `cookies`.
+
+    Parameters
+    -----------
+    status: int
+        The status code
+    headers: Mapping[str, str]
+        The headers
+    body: bytes = b""
+        The body
+
+    Attributes
+    -----------
+    status: int
+        The status code
+    headers: CIMultiDict[str]
+        The headers
+    body: bytes
+        The body
+    """
+
+    def __init__(
+        self, status: int, headers: Mapping[str, str], body: bytes = b""
+    ) -> None:
+        self.status: int = status
+        self.headers: CIMultiDict[str] = CIMultiDict(headers)
+        self.body: bytes = body
+        self._cookies: SimpleCookie | None = None
+
+    def __repr__(self) -> str:
+        return f"<TransportResponse status={self.status} length={len(self.body)}>"
+
+    @property
+    def cookies(self) -> SimpleCookie:
+        """The cookies set by the response"""
+
+        if self._cookies is None:
+            self._cookies = SimpleCookie()
+            for header in self.headers.getall("Set-Cookie", ()):
+                self._cookies.load(header)
+        return self._cookies
+
+    @property
+    def content_length(self) -> int:
+        return len(self.body)
+
+    async def read(self) -> bytes:
+        return self.body
+
+    async def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+    def release(self) -> None:
+        pass
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        pass
+
+
+class Transport(ABC):
+    """
+    The base class for what `HTTPClient` sends its requests with.
+
+    A transport only sends a request and returns the response. Retries, ratelimits,
+    the bypass script, caching and turning statuses into errors are all handled
+    by `HTTPClient`, so they work the same with every transport.
+
+    To make your own, subclass this and implement `Transport.request`.
+    If the server can't be reached, it should raise a `ConnectionError`. If the connection
+    is lost once the request may have been sent, it should raise a `ConnectionResetError`,
+    so requests that aren't safe to send twice aren't sent again.
+    """
+
+    @abstractmethod
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Mapping[str, str],
+        body: Optional[bytes] = None,
+    ) -> TransportResponse:
+        """
+        |coro|
+
+        Sends a request.
+
+        Parameters
+        -----------
+        method: str
+            The http method
+        url: str
+            The full url, including the query string
+        headers: Mapping[str, str]
+            The headers
+        body: Optional[bytes]
+            The body, if there is one
+
+        Raises
+        -----------
+        ConnectionError
+            The server could not be reached
+        ConnectionResetError
+            The connection was lost after the request may have been sent
+
+        Returns
+        -----------
+        TransportResponse
+            The response
+        """
+
+    async def close(self) -> None:
+        """
+        |coro|
+
+        Closes anything the transport opened.
+        """
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}>"
+
+
+class AiohttpTransport(Transport):
+    """
+    A transport that uses an `aiohttp.ClientSession`. This is the default.
+
+    Parameters
+    -----------
+    session: Optional[aiohttp.ClientSession]
+        The session to send requests with. It is not closed by `AiohttpTransport.close`.
+        If not given, one is created when the first request is made.
+    """
+
+    def __init__(self, session: Optional[ClientSession] = None) -> None:
+        self._session: ClientSession = session or MISSING
+        self._owns_session: bool = session is None
+
+    @property
+    def session(self) -> ClientSession:
+        if self._session is MISSING:
+            self._session = ClientSession()
+        return self._session
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Mapping[str, str],
+        body: Optional[bytes] = None,
+    ) -> TransportResponse:
+        try:
+            async with self.session.request(
+                method, url, headers=headers, data=body
+            ) as res:
+                return TransportResponse(res.status, res.headers, await res.read())
+        except ClientConnectorError as e:
+            raise ConnectionError(str(e)) from e
+        except ClientConnectionError as e:
+            # Such as the server disconnecting, which can happen after it got the request
+            raise ConnectionResetError(str(e)) from e
+
+    async def close(self) -> None:
+        if self._owns_session and self._session is not MISSING:
+            await self._session.close()
+
+
+class MemoryTransport(Transport):
+    """
+    A transport that answers from memory, without touching the network.
+
+    It is meant for tests, and for benchmarks that only measure kick.py's own overhead.
+    Responses are looked up by method and url, first with the query string and then without.
+    Since requests are normally sent to the bypass script, pass `whitelisted=True` to the client
+    so that the urls are kick's.
+
+    Parameters
+    -----------
+    handler: Optional[Callable[[str, str, Mapping[str, str], Optional[bytes]], TransportResponse | Awaitable[TransportResponse]]]
+        Called with the method, url, headers and body of requests that have no response added.
+        If not given, those requests get a 404.
+
+    Attributes
+    -----------
+    requests: int
+        How many requests were made
+    """
+
+    def __init__(
+        self,
+        handler: Optional[
+            Callable[
+                [str, str, Mapping[str, str], Optional[bytes]],
+                Union[TransportResponse, Awaitable[TransportResponse]],
+            ]
+        ] = None,
+    ) -> None:
+        self.handler = handler
+        self.requests: int = 0
+        self._responses: dict[tuple[str, str], TransportResponse] = {}
+
+    def add(
+        self,
+        method: str,
+        url: str,
+        *,
+        status: int = 200,
+        json: Any = MISSING,
+        body: Union[bytes, str] = b"",
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        """
+        Adds the response for a method and url.
+
+        Parameters
+        -----------
+        method: str
+            The http method
+        url: str
+            The url. If it has no query string, it matches any query string.
+        status: int = 200
+            The status code
+        json: Any
+            An object to respond with as JSON. Overrides `body`.
+        body: bytes | str = b""
+            The body
+        headers: Optional[Mapping[str, str]]
+            The headers
+        """
+
+        headers = dict(headers or {})
+        if json is not MISSING:
+            body = _dumps(json)
+            headers.setdefault("Content-Type", "application/json")
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+
+        self._responses[(method.upper(), url)] = TransportResponse(
+            status, headers, body
+        )
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Mapping[str, str],
+        body: Optional[bytes] = None,
+    ) -> TransportResponse:
+        self.requests += 1
+
+        method = method.upper()
+        res = self._responses.get((method, url))
+        if res is None:
+            res = self._responses.get((method, url.partition("?")[0]))
+        if res is not None:
+            return res
+
+        if self.handler is not None:
+            res = self.handler(method, url, headers, body)
+            if inspect.isawaitable(res):
+                res = await res
+            return res  # type: ignore
+
+        return TransportResponse(404, {}, b'{"message": "Not Found"}')
+
+
+class RecordedExchange:
+    """
+    A request and response that went through a `RecordingTransport`.
+
+    Attributes
+    -----------
+    method: str
+        The http method
+    url: str
+        The url
+    headers: dict[str, str]
+        The request's headers
+    body: Optional[bytes]
+        The request's body
+    response: Optional[TransportResponse]
+        The response, or None if the request failed
+    elapsed: float
+        How many seconds the request took
+    """
+
+    def __init__(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        body: Optional[bytes],
+        response: Optional[TransportResponse],
+        elapsed: float,
+    ) -> None:
+        self.method: str = method
+        self.url: str = url
+        self.headers: dict[str, str] = headers
+        self.body: Optional[bytes] = body
+        self.response: Optional[TransportResponse] = response
+        self.elapsed: float = elapsed
+
+    def __repr__(self) -> str:
+        status = self.response.status if self.response is not None else None
+        return f"<RecordedExchange method={self.method!r} url={self.url!r} status={status} elapsed={self.elapsed:.4f}>"
+
+
+class RecordingTransport(Transport):
+    """
+    A transport that records every request and response going through another transport.
+
+    Parameters
+    -----------
+    transport: Optional[Transport]
+        The transport to send the requests with. Defaults to a new `AiohttpTransport`.
+
+    Attributes
+    -----------
+    transport: Transport
+        The transport the requests are sent with
+    exchanges: list[RecordedExchange]
+        What was recorded, in the order the requests finished
+    """
+
+    def __init__(self, transport: Optional[Transport] = None) -> None:
+        self.transport: Transport = transport or AiohttpTransport()
+        self.exchanges: list[RecordedExchange] = []
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Mapping[str, str],
+        body: Optional[bytes] = None,
+    ) -> TransportResponse:
+        started = time.perf_counter()
+        res: Optional[TransportResponse] = None
+        try:
+            res = await self.transport.request(method, url, headers=headers, body=body)
+            return res
+        finally:
+            self.exchanges.append(
+                RecordedExchange(
+                    method,
+                    url,
+                    dict(headers),
+                    body,
+                    res,
+                    time.perf_counter() - started,
+                )
+            )
+
+    def to_memory(self) -> MemoryTransport:
+        """
+        Makes a `MemoryTransport` that replays the recorded responses.
+
+        If a url was requested more than once, the last response is used.
+
+        Returns
+        -----------
+        MemoryTransport
+            The transport
+        """
+
+        memory = MemoryTransport()
+        for exchange in self.exchanges:
+            if exchange.response is not None:
+                memory._responses[(exchange.method.upper(), exchange.url)] = exchange.response
+        return memory
+
+    async def close(self) -> None:
+        await self.transport.close()
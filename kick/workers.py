@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import queue
+import threading
+from collections import deque
+from typing import TYPE_CHECKING, Any, Optional
+
+from .livestream import PartialLivestream
+from .message import Message
+
+if TYPE_CHECKING:
+    from multiprocessing.connection import Connection
+    from multiprocessing.process import BaseProcess
+
+    from .client import Client
+    from .http import HTTPClient
+
+LOGGER = logging.getLogger(__name__)
+
+__all__ = ()
+
+# How often dead workers are looked for
+SUPERVISE_INTERVAL: float = 0.5
+# How long workers get to finish their events when closing
+SHUTDOWN_TIMEOUT: float = 10.0
+
+
+class _Worker:
+    def __init__(self, index: int, backlog: int) -> None:
+        self.index = index
+        self.process: BaseProcess = None  # type: ignore
+        self.conn: Connection = None  # type: ignore
+        self.queue: queue.Queue[Any] = queue.Queue(backlog)
+        self.sent: int = 0
+        self.dropped: int = 0
+        self.restarts: int = 0
+
+
+class EventWorkerPool:
+    """
+    Runs event handlers in worker processes.
+
+    The process reading the websocket only decodes payloads and sends them to
+    a worker, picked by chatroom, so a chatroom's events are always handled by
+    the same worker, in order. Payloads are sent by a thread per worker, so slow
+    handlers never block the reader. Once `backlog` payloads are waiting for a
+    worker, new ones for it are dropped instead of growing without bound.
+    """
+
+    def __init__(
+        self,
+        *,
+        http: HTTPClient,
+        processes: int,
+        backlog: int = 10000,
+        start_method: Optional[str] = None,
+    ) -> None:
+        if processes < 1:
+            raise ValueError("event_workers must be at least 1")
+        if backlog < 1:
+            raise ValueError("event_worker_backlog must be at least 1")
+
+        self.http = http
+        self.backlog: int = backlog
+        self.context = multiprocessing.get_context(start_method)
+        self.workers: list[_Worker] = [
+            _Worker(index, backlog) for index in range(processes)
+        ]
+
+        self._threads: list[threading.Thread] = []
+        self._supervisor: Optional[asyncio.Task] = None
+        self._closing: bool = False
+
+    def __repr__(self) -> str:
+        return f"<EventWorkerPool processes={len(self.workers)}>"
+
+    @property
+    def stats(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "id": worker.index,
+                "pid": worker.process.pid,
+                "alive": worker.process.is_alive(),
+                "pending": worker.queue.qsize(),
+                "sent": worker.sent,
+                "dropped": worker.dropped,
+                "restarts": worker.restarts,
+            }
+            for worker in self.workers
+        ]
+
+    def start(self) -> None:
+        for worker in self.workers:
+            self._spawn(worker)
+
+            thread = threading.Thread(
+                target=self._send_loop,
+                args=(worker,),
+                name=f"event-worker-{worker.index}-sender",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+        self._supervisor = asyncio.create_task(
+            self._supervise(), name="event-worker-supervisor"
+        )
+
+    def _spawn(self, worker: _Worker) -> None:
+        reader, writer = self.context.Pipe(duplex=False)
+        token = self.http.token or None
+        worker.process = self.context.Process(
+            target=_run_worker,
+            args=(self.http.client, worker.index, reader, token, self.backlog),
+            name=f"kick-event-worker-{worker.index}",
+            daemon=True,
+        )
+        worker.process.start()
+        reader.close()
+        worker.conn = writer
+        LOGGER.debug(f"Started event worker {worker.index} (pid {worker.process.pid})")
+
+    def _send_loop(self, worker: _Worker) -> None:
+        while True:
+            item = worker.queue.get()
+            if item is None:
+                # Forked workers can hold copies of each other's pipes, so closing
+                # ours isn't enough for the worker to see the end of it
+                try:
+                    worker.conn.send(None)
+                except (BrokenPipeError, OSError):
+                    pass
+                worker.conn.close()
+                return
+
+            try:
+                worker.conn.send(item)
+            except (BrokenPipeError, OSError):
+                # The worker died, it is restarted by the supervisor
+                worker.dropped += 1
+            else:
+                worker.sent += 1
+
+    async def _supervise(self) -> None:
+        while not self._closing:
+            await asyncio.sleep(SUPERVISE_INTERVAL)
+            for worker in self.workers:
+                if self._closing or worker.process.is_alive():
+                    continue
+
+                LOGGER.warning(
+                    f"Event worker {worker.index} exited with code {worker.process.exitcode}, restarting it"
+                )
+                worker.restarts += 1
+                self._spawn(worker)
+
+    def submit(self, key: int, event: str, data: Any) -> None:
+        """
+        Sends an event's payload to the worker that handles `key`, such as a chatroom id.
+        This never blocks. The payload is dropped if the worker's backlog is full.
+        """
+
+        # Fibonacci hashing, since ids tend to share factors with the worker count
+        spread = (key * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        worker = self.workers[spread * len(self.workers) >> 64]
+        try:
+            worker.queue.put_nowait((key, event, data))
+        except queue.Full:
+            worker.dropped += 1
+
+    async def close(self) -> None:
+        self._closing = True
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+
+        loop = asyncio.get_running_loop()
+        for worker in self.workers:
+            # Waits for room in a full backlog in a thread, so the event loop keeps running
+            await loop.run_in_executor(None, worker.queue.put, None)
+
+        for worker in self.workers:
+            if worker.process is None:
+                continue
+
+            await loop.run_in_executor(None, worker.process.join, SHUTDOWN_TIMEOUT)
+            if worker.process.is_alive():
+                LOGGER.warning(f"Event worker {worker.index} did not close in time, terminating it")
+                worker.process.terminate()
+
+
+class _EventWorker:
+    # Runs inside a worker process
+
+    def __init__(
+        self, client: Client, index: int, conn: Connection, backlog: int
+    ) -> None:
+        self.client = client
+        self.index = index
+        self.conn = conn
+        # Payloads are only read once there's room for them, so a worker that
+        # falls behind fills its pipe, and then the pool's bounded backlog
+        self._slots = threading.Semaphore(backlog)
+        self._lanes: dict[int, deque[tuple[str, Any]]] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def _build(self, event: str, data: Any) -> tuple[Any, ...]:
+        http = self.client.http
+        match event:
+            case "message":
+                return (Message(data=data, http=http),)
+            case "livestream_start":
+                return (PartialLivestream(data=data, http=http),)
+        return (data,)
+
+    def _handle(self, item: tuple[int, str, Any]) -> None:
+        key, event, data = item
+        lane = self._lanes.get(key)
+        if lane is not None:
+            lane.append((event, data))
+            return
+
+        self._lanes[key] = deque([(event, data)])
+        task = asyncio.create_task(self._drain(key), name=f"event-lane: {key}")
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _drain(self, key: int) -> None:
+        # Events of one key are handled one at a time, in the order they were sent
+        lane = self._lanes[key]
+        try:
+            while lane:
+                event, data = lane.popleft()
+                try:
+                    if self.client._has_listener(event):
+                        await self.client._call_listeners(
+                            event, *self._build(event, data)
+                        )
+                finally:
+                    self._slots.release()
+        finally:
+            del self._lanes[key]
+
+    def _receive_loop(
+        self, loop: asyncio.AbstractEventLoop, done: asyncio.Event
+    ) -> None:
+        while True:
+            self._slots.acquire()
+            try:
+                item = self.conn.recv()
+            except (EOFError, OSError):
+                item = None
+
+            if item is None:
+                loop.call_soon_threadsafe(done.set)
+                return
+
+            loop.call_soon_threadsafe(self._handle, item)
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        done = asyncio.Event()
+        threading.Thread(
+            target=self._receive_loop,
+            args=(loop, done),
+            name="event-worker-receiver",
+            daemon=True,
+        ).start()
+
+        await done.wait()
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+        await self.client.http.close()
+
+
+def _run_worker(
+    client: Client, index: int, conn: Connection, token: Optional[str], backlog: int
+) -> None:
+    from .http import HTTPClient
+
+    # The reader's HTTPClient belongs to its event loop, so handlers get their own
+    client.http = HTTPClient(client)
+    if token is not None:
+        client.http.token = token
+    if client.user is not None:
+        client.user.http = client.http
+
+    asyncio.run(_EventWorker(client, index, conn, backlog).run())
@@ -1,46 +1,175 @@
 from __future__ import annotations
 
-import json
-from typing import TYPE_CHECKING
+import asyncio
+import itertools
+import logging
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Iterable, Optional
 
+from aiohttp import ClientError, WSMessage, WSMsgType
 from aiohttp import ClientWebSocketResponse as WebSocketResponse
-import logging
+from aiohttp.http import WS_CLOSED_MESSAGE
+
+from .errors import CloudflareBypassException, HTTPException
 from .livestream import PartialLivestream
 from .message import Message
+from .ratelimits import RetryPolicy
 
 if TYPE_CHECKING:
     from .http import HTTPClient
+    from .types.message import MessagePayload
 
 LOG = logging.getLogger(__name__)
 
 __all__ = ()
 
+# The client events each pusher event can be dispatched as
+EVENT_LISTENERS: dict[str, tuple[str, ...]] = {
+    "App\\Events\\ChatMessageEvent": ("message",),
+    "App\\Events\\StreamerIsLive": ("livestream_start",),
+    "App\\Events\\FollowersUpdated": ("follow", "unfollow"),
+}
+
+# Pusher events that update cached state, so they are always decoded
+STATEFUL_EVENTS: frozenset[str] = frozenset({"App\\Events\\FollowersUpdated"})
+
+# Pusher drops connections it hasn't heard from in a while, so we ping it
+# after this many seconds of silence, unless it tells us otherwise.
+DEFAULT_ACTIVITY_TIMEOUT: float = 120.0
+# How long to wait for anything after a ping before giving up on the connection
+PONG_TIMEOUT: float = 30.0
+
+RECONNECT_BACKOFF = RetryPolicy(base_delay=1.0, max_delay=60.0)
+
+
+class _Subscriptions(ABC):
+    # What the rest of the library subscribes with, in terms of pusher channels
+
+    http: HTTPClient
+
+    @abstractmethod
+    async def subscribe(self, channel: str) -> None:
+        ...
+
+    @abstractmethod
+    async def unsubscribe(self, channel: str) -> None:
+        ...
+
+    async def subscribe_to_chatroom(self, chatroom_id: int) -> None:
+        if not self.http.client._owns(chatroom_id):
+            return
+        await self.subscribe(f"chatrooms.{chatroom_id}.v2")
+
+    async def unsubscribe_to_chatroom(self, chatroom_id: int) -> None:
+        await self.unsubscribe(f"chatrooms.{chatroom_id}.v2")
+
+    async def watch_channel(self, channel_id: int) -> None:
+        if not self.http.client._owns(channel_id):
+            return
+        await self.subscribe(f"channel.{channel_id}")
+
+    async def unwatch_channel(self, channel_id: int) -> None:
+        await self.unsubscribe(f"channel.{channel_id}")
+
 
-class PusherWebSocket:
-    def __init__(self, ws: WebSocketResponse, *, http: HTTPClient):
+class PusherWebSocket(_Subscriptions):
+    def __init__(
+        self, ws: WebSocketResponse, *, http: HTTPClient, shard_id: int = 0
+    ) -> None:
         self.ws = ws
         self.http = http
-        self.send_json = ws.send_json
-        self.close = ws.close
+        self.shard_id: int = shard_id
+        self.channels: set[str] = set()
+
+        options = http.client._options
+        self.reconnect: bool = options.get("reconnect", True)
+        self.backfill: bool = options.get("backfill_messages", True)
+
+        self.socket_id: Optional[str] = None
+        self.activity_timeout: float = DEFAULT_ACTIVITY_TIMEOUT
+
+        self._closing: bool = False
+        self._reconnect_attempt: int = 0
+        self._last_messages: dict[int, MessagePayload] = {}
+        self._seen_since_resume: Optional[set[str]] = None
+        self._backfill_tasks: set[asyncio.Task] = set()
+        self._disconnected_at: Optional[datetime] = None
+
+    def _wants_payload(self, event: str) -> bool:
+        client = self.http.client
+        if event in STATEFUL_EVENTS or client._has_listener("payload_receive"):
+            return True
+        return any(
+            client._has_listener(name) for name in EVENT_LISTENERS.get(event, ())
+        )
+
+    async def _receive(self) -> WSMessage:
+        try:
+            return await self.ws.receive(timeout=self.activity_timeout)
+        except asyncio.TimeoutError:
+            await self.send_json({"event": "pusher:ping", "data": {}})
+
+        try:
+            return await self.ws.receive(timeout=PONG_TIMEOUT)
+        except asyncio.TimeoutError:
+            LOG.warning("Pusher stopped responding, closing the websocket")
+            await self.ws.close()
+            return WS_CLOSED_MESSAGE
 
     async def poll_event(self) -> None:
-        raw_msg = await self.ws.receive()
-        LOG.debug(f"WS received: {raw_msg}")
-        raw_data = raw_msg.json()
-        data = json.loads(raw_data["data"])
+        queue = self.http.client._event_queue
+        if queue is not None:
+            await queue.wait_for_space()
+
+        raw_msg = await self._receive()
+        if LOG.isEnabledFor(logging.DEBUG):
+            LOG.debug("WS received: %s", raw_msg)
+
+        if raw_msg.type is not WSMsgType.TEXT:
+            if raw_msg.type is WSMsgType.ERROR:
+                await self.ws.close()
+            return
+
+        # Only the envelope is decoded here. Pusher sends the payload as a
+        # JSON string of its own, which is only decoded if something uses it.
+        raw_data = self.http.codec.loads(raw_msg.data)
+        event: str = raw_data["event"]
+
+        client = self.http.client
+        if client._has_listener("raw_payload_receive"):
+            client.dispatch("raw_payload_receive", raw_data)
+
+        if event.startswith("pusher"):
+            await self._handle_pusher_event(event, raw_data.get("data"))
+
+        if not self._wants_payload(event):
+            return
 
-        self.http.client.dispatch("payload_receive", raw_data["event"], data)
-        self.http.client.dispatch("raw_payload_receive", raw_data)
+        data = raw_data.get("data")
+        if isinstance(data, str):
+            data = self.http.codec.loads(data)
+        if client._has_listener("payload_receive"):
+            client.dispatch("payload_receive", event, data)
 
-        match raw_data["event"]:
+        match event:
             case "App\\Events\\ChatMessageEvent":
-                msg = Message(data=data["livestream"], http=self.http)
-                self.http.client.dispatch("message", msg)
+                self._last_messages[data["chatroom_id"]] = data
+                if self._seen_since_resume is not None:
+                    self._seen_since_resume.add(data["id"])
+
+                self._dispatch_message(data)
             case "App\\Events\\StreamerIsLive":
-                livestream = PartialLivestream(data=data, http=self.http)
-                self.http.client.dispatch("livestream_start", livestream)
+                if self.http.event_workers is not None:
+                    self._submit(
+                        data["channel_id"], "livestream_start", data, PartialLivestream
+                    )
+                else:
+                    livestream = PartialLivestream(data=data, http=self.http)
+                    client.dispatch("livestream_start", livestream)
             case "App\\Events\\FollowersUpdated":
-                user = self.http.client._watched_users[data["channel_id"]]
+                user = client._watched_users[data["channel_id"]]
                 if data["followed"] is True:
                     event = "follow"
                     user._data["followers_count"] += 1
@@ -48,40 +177,361 @@ class PusherWebSocket:
                     event = "unfollow"
                     user._data["followers_count"] -= 1
 
-                self.http.client.dispatch(event, user)
+                client.dispatch(event, user)
+
+    def _submit(self, key: int, event: str, data: Any, cls: type) -> None:
+        assert self.http.event_workers is not None
+        client = self.http.client
+        # `Client.wait_for` waits in this process, so its waiters are resolved
+        # here, before the payload is sent to a worker
+        if client._waiters.get(event):
+            client._resolve_waiters(event, cls(data=data, http=self.http))
+        self.http.event_workers.submit(key, event, data)
+
+    def _dispatch_message(self, data: MessagePayload) -> None:
+        if self.http.event_workers is not None:
+            self._submit(data["chatroom_id"], "message", data, Message)
+        else:
+            self.http.client.dispatch("message", Message(data=data, http=self.http))
+
+    async def _handle_pusher_event(self, event: str, data: Any) -> None:
+        if isinstance(data, str):
+            data = self.http.codec.loads(data)
+
+        match event:
+            case "pusher:connection_established":
+                self.socket_id = data["socket_id"]
+                self.activity_timeout = min(
+                    float(data.get("activity_timeout", DEFAULT_ACTIVITY_TIMEOUT)),
+                    DEFAULT_ACTIVITY_TIMEOUT,
+                )
+            case "pusher:ping":
+                await self.send_json({"event": "pusher:pong", "data": {}})
+            case "pusher:error":
+                code = (data or {}).get("code")
+                LOG.warning(f"Pusher sent an error: {data}")
+
+                # Codes 4000-4099 mean pusher doesn't want us to reconnect
+                if code is not None and 4000 <= code < 4100:
+                    self._closing = True
+                    await self.ws.close()
+
+    async def send_json(self, data: Any) -> None:
+        if self.ws.closed:
+            # Subscriptions are replayed once we reconnect
+            return
+        await self.ws.send_json(data, dumps=self.http.codec.dumps)
 
     async def start(self) -> None:
-        while not self.ws.closed:
-            await self.poll_event()
+        connected_at = time.monotonic()
+        while True:
+            while not self.ws.closed:
+                try:
+                    await self.poll_event()
+                except (ClientError, ConnectionError) as e:
+                    LOG.warning(f"Websocket connection failed: {e}")
+                    await self.ws.close()
 
-    async def subscribe_to_chatroom(self, chatroom_id: int) -> None:
-        await self.send_json(
-            {
-                "event": "pusher:subscribe",
-                "data": {"auth": "", "channel": f"chatrooms.{chatroom_id}.v2"},
-            }
+            if self._closing or not self.reconnect:
+                self._disconnected_at = datetime.now(timezone.utc)
+                return
+            if time.monotonic() - connected_at >= self.activity_timeout:
+                # The connection was healthy for a while, so this is a new outage
+                self._reconnect_attempt = 0
+
+            self._disconnected_at = datetime.now(timezone.utc)
+            LOG.warning(f"Websocket {self.shard_id} disconnected, reconnecting")
+            self.http.client.dispatch("disconnect")
+
+            if not await self._reconnect():
+                return
+            connected_at = time.monotonic()
+            await self._resubscribe()
+            LOG.info("Websocket resumed")
+            self.http.client.dispatch("resumed")
+
+            if self.backfill and self.http.client._has_listener("message"):
+                self._start_backfill(self._disconnected_at)
+
+    async def _reconnect(self) -> bool:
+        while not self._closing:
+            if self._reconnect_attempt:
+                delay = RECONNECT_BACKOFF.backoff(self._reconnect_attempt)
+                LOG.warning(f"Reconnecting to the websocket in {delay:.2f} seconds")
+                await asyncio.sleep(delay)
+                if self._closing:
+                    return False
+
+            self._reconnect_attempt += 1
+            try:
+                ws = await self.http.session.ws_connect(self.http.ws_url)
+            except (ClientError, ConnectionError, asyncio.TimeoutError) as e:
+                LOG.warning(f"Could not reconnect to the websocket: {e}")
+                continue
+
+            if self._closing:
+                await ws.close()
+                return False
+
+            self.ws = ws
+            return True
+
+        return False
+
+    async def _resubscribe(self) -> None:
+        LOG.debug(f"Resubscribing to {len(self.channels)} channels")
+
+        # Sent back to back, without waiting for pusher to confirm each one
+        for channel in self.channels:
+            await self.send_json(
+                {"event": "pusher:subscribe", "data": {"auth": "", "channel": channel}}
+            )
+
+    def _start_backfill(
+        self, since: datetime, chatroom_ids: Optional[Iterable[int]] = None
+    ) -> None:
+        if chatroom_ids is None:
+            chatroom_ids = [
+                int(channel.split(".")[1])
+                for channel in self.channels
+                if channel.startswith("chatrooms.")
+            ]
+
+        if self._seen_since_resume is None:
+            self._seen_since_resume = set()
+        task = asyncio.create_task(
+            self._backfill(since, list(chatroom_ids)), name="ws-backfill"
         )
+        self._backfill_tasks.add(task)
 
-    async def unsubscribe_to_chatroom(self, chatroom_id: int) -> None:
+    async def _backfill(self, since: datetime, chatroom_ids: list[int]) -> None:
+        try:
+            await asyncio.gather(
+                *(self._backfill_chatroom(id, since) for id in chatroom_ids)
+            )
+        finally:
+            self._backfill_tasks.discard(asyncio.current_task())  # type: ignore
+            if not self._backfill_tasks:
+                self._seen_since_resume = None
+
+    async def _backfill_chatroom(self, chatroom_id: int, since: datetime) -> None:
+        last = self._last_messages.get(chatroom_id)
+        last_id: Optional[str] = None
+        if last is not None:
+            # Kick's clock is more reliable here than ours
+            since = datetime.fromisoformat(last["created_at"])
+            last_id = last["id"]
+
+        try:
+            res = await self.http.get_messages(chatroom_id)
+        except (
+            HTTPException,
+            CloudflareBypassException,
+            ClientError,
+            ConnectionError,
+            asyncio.TimeoutError,
+        ) as e:
+            # Each chatroom is backfilled on its own, so one failing doesn't stop the rest
+            LOG.warning(f"Could not fetch missed messages in chatroom {chatroom_id}: {e}")
+            return
+
+        seen = self._seen_since_resume or set()
+        missed: list[tuple[datetime, MessagePayload]] = []
+        for data in res["data"]["messages"]:
+            if data["id"] == last_id or data["id"] in seen:
+                continue
+
+            created_at = datetime.fromisoformat(data["created_at"])
+            if created_at >= since:
+                missed.append((created_at, data))
+
+        if not missed:
+            return
+
+        LOG.info(f"Backfilling {len(missed)} missed messages in chatroom {chatroom_id}")
+        missed.sort(key=lambda entry: entry[0])
+        for _, data in missed:
+            self._dispatch_message(data)
+
+    async def close(self) -> None:
+        self._closing = True
+        for task in self._backfill_tasks:
+            task.cancel()
+        await self.ws.close()
+
+    async def subscribe(self, channel: str) -> None:
+        self.channels.add(channel)
         await self.send_json(
-            {
-                "event": "pusher:unsubscribe",
-                "data": {"auth": "", "channel": f"chatrooms.{chatroom_id}.v2"},
-            }
+            {"event": "pusher:subscribe", "data": {"auth": "", "channel": channel}}
         )
 
-    async def watch_channel(self, channel_id: int) -> None:
+    async def unsubscribe(self, channel: str) -> None:
+        self.channels.discard(channel)
+        if channel.startswith("chatrooms."):
+            self._last_messages.pop(int(channel.split(".")[1]), None)
+
         await self.send_json(
-            {
-                "event": "pusher:subscribe",
-                "data": {"auth": "", "channel": f"channel.{channel_id}"},
-            }
+            {"event": "pusher:unsubscribe", "data": {"auth": "", "channel": channel}}
         )
 
-    async def unwatch_channel(self, channel_id: int) -> None:
-        await self.send_json(
+
+class PusherShardPool(_Subscriptions):
+    """
+    Spreads subscriptions over multiple pusher connections.
+
+    Every subscription stays on the connection it was made on, so the events of
+    a chatroom keep their order. Connections that die for good have their
+    subscriptions moved to the others, opening new ones if needed.
+    """
+
+    def __init__(
+        self,
+        *,
+        http: HTTPClient,
+        shard_count: int = 1,
+        channels_per_shard: Optional[int] = None,
+    ) -> None:
+        if shard_count < 1:
+            raise ValueError("shard_count must be at least 1")
+        if channels_per_shard is not None and channels_per_shard < 1:
+            raise ValueError("channels_per_shard must be at least 1")
+
+        self.http = http
+        self.shard_count: int = shard_count
+        self.channels_per_shard: Optional[int] = channels_per_shard
+        self.shards: list[PusherWebSocket] = []
+
+        self._assignments: dict[str, PusherWebSocket] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._ids = itertools.count()
+        self._lock = asyncio.Lock()
+        self._closing: bool = False
+        self._closed = asyncio.Event()
+
+    def __repr__(self) -> str:
+        return f"<PusherShardPool shards={len(self.shards)} channels={len(self._assignments)}>"
+
+    @property
+    def stats(self) -> list[dict[str, Any]]:
+        return [
             {
-                "event": "pusher:subscribe",
-                "data": {"auth": "", "channel": f"channel.{channel_id}"},
+                "id": shard.shard_id,
+                "channels": len(shard.channels),
+                "connected": not shard.ws.closed,
             }
+            for shard in self.shards
+        ]
+
+    async def connect(self) -> None:
+        for _ in range(self.shard_count):
+            await self._open_shard()
+
+    async def _open_shard(self) -> PusherWebSocket:
+        attempt = 0
+        while True:
+            try:
+                ws = await self.http.session.ws_connect(self.http.ws_url)
+            except (ClientError, ConnectionError, asyncio.TimeoutError) as e:
+                delay = RECONNECT_BACKOFF.backoff(attempt)
+                attempt += 1
+                LOG.warning(
+                    f"Could not open a websocket shard: {e}. Retrying in {delay:.2f} seconds"
+                )
+                await asyncio.sleep(delay)
+            else:
+                break
+
+        shard = PusherWebSocket(ws, http=self.http, shard_id=next(self._ids))
+        self.shards.append(shard)
+        LOG.debug(f"Opened websocket shard {shard.shard_id}")
+
+        task = asyncio.create_task(
+            self._run_shard(shard), name=f"pusher-shard-{shard.shard_id}"
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return shard
+
+    async def _run_shard(self, shard: PusherWebSocket) -> None:
+        try:
+            await shard.start()
+        except Exception:
+            # Such as a payload that can't be decoded. Its channels are still moved,
+            # since nothing else would subscribe to them again.
+            LOG.exception(f"Websocket shard {shard.shard_id} crashed")
+            await shard.close()
+        finally:
+            self.shards.remove(shard)
+
+        if not self._closing:
+            await self._rebalance(shard)
+
+    async def _rebalance(self, dead: PusherWebSocket) -> None:
+        LOG.warning(
+            f"Websocket shard {dead.shard_id} died, moving its {len(dead.channels)} channels to other shards"
         )
+        since = dead._disconnected_at or datetime.now(timezone.utc)
+
+        moved: dict[PusherWebSocket, list[int]] = {}
+        for channel in list(dead.channels):
+            if self._assignments.get(channel) is not dead:
+                continue
+
+            del self._assignments[channel]
+            shard = await self._assign(channel)
+            if channel.startswith("chatrooms."):
+                chatroom_id = int(channel.split(".")[1])
+                moved.setdefault(shard, []).append(chatroom_id)
+                if chatroom_id in dead._last_messages:
+                    shard._last_messages[chatroom_id] = dead._last_messages[chatroom_id]
+
+        if dead.backfill and self.http.client._has_listener("message"):
+            for shard, chatroom_ids in moved.items():
+                shard._start_backfill(since, chatroom_ids)
+
+    def _start_backfill(self, since: datetime, chatroom_ids: Iterable[int]) -> None:
+        by_shard: dict[PusherWebSocket, list[int]] = {}
+        for chatroom_id in chatroom_ids:
+            shard = self._assignments.get(f"chatrooms.{chatroom_id}.v2")
+            if shard is not None:
+                by_shard.setdefault(shard, []).append(chatroom_id)
+
+        for shard, ids in by_shard.items():
+            shard._start_backfill(since, ids)
+
+    async def _get_shard(self) -> PusherWebSocket:
+        async with self._lock:
+            live = [shard for shard in self.shards if not shard._closing]
+            if live:
+                shard = min(live, key=lambda shard: len(shard.channels))
+                if (
+                    self.channels_per_shard is None
+                    or len(shard.channels) < self.channels_per_shard
+                ):
+                    return shard
+
+            return await self._open_shard()
+
+    async def _assign(self, channel: str) -> PusherWebSocket:
+        shard = await self._get_shard()
+        self._assignments[channel] = shard
+        await shard.subscribe(channel)
+        return shard
+
+    async def subscribe(self, channel: str) -> None:
+        if channel not in self._assignments:
+            await self._assign(channel)
+
+    async def unsubscribe(self, channel: str) -> None:
+        shard = self._assignments.pop(channel, None)
+        if shard is not None:
+            await shard.unsubscribe(channel)
+
+    async def start(self) -> None:
+        await self._closed.wait()
+
+    async def close(self) -> None:
+        self._closing = True
+        for shard in list(self.shards):
+            await shard.close()
+        self._closed.set()
@@ -44,7 +44,7 @@ if version.endswith(("a", "b", "rc")):
     except Exception:
         pass
 
-PACKAGES = ["kick", "kick.types"]
+PACKAGES = ["kick", "kick.types", "kick.testing"]
 
 setuptools.setup(
     name="kick.py",
@@ -58,6 +58,7 @@ setuptools.setup(
     version="0.0.1",
     python_requires=">=3.11",
     install_requires=REQUIREMENTS,
+    extras_require={"speed": ["orjson"]},
     packages=PACKAGES,
     description="",
     long_description=LONG_DESCRIPTION,
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from kick import ratelimits
+from kick.ratelimits import RateLimit
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimits.time, "monotonic", clock)
+    return clock
+
+
+def send(bucket: RateLimit, clock: FakeClock, count: int, spacing: float) -> None:
+    async def run() -> None:
+        for _ in range(count):
+            await bucket.acquire()
+            clock.now += spacing
+
+    asyncio.run(run())
+
+
+def test_limit_is_learned_from_the_window_of_the_429(clock: FakeClock) -> None:
+    bucket = RateLimit("GET /channels/{streamer}")
+
+    # Long before the limit is hit, these shouldn't count towards it
+    send(bucket, clock, 1000, 1.0)
+    # 10 requests in the last 5 seconds, the last of which gets a 429
+    send(bucket, clock, 10, 0.5)
+    bucket.update(429, {"Retry-After": "5"})
+
+    assert bucket.limit == 9
+    assert bucket.remaining == 0
+    assert bucket.window == 5.0
+
+
+def test_limit_is_not_inferred_without_a_window(clock: FakeClock) -> None:
+    bucket = RateLimit("GET /channels/{streamer}")
+
+    send(bucket, clock, 50, 0.1)
+    bucket.update(429, {})
+
+    assert bucket.limit is None
+    assert bucket.retry_after == ratelimits.DEFAULT_RETRY_AFTER
+
+
+def test_headers_take_priority_over_learning(clock: FakeClock) -> None:
+    bucket = RateLimit("GET /channels/{streamer}")
+
+    send(bucket, clock, 20, 0.1)
+    bucket.update(
+        429,
+        {"Retry-After": "5", "X-RateLimit-Limit": "60", "X-RateLimit-Remaining": "0"},
+    )
+
+    assert bucket.limit == 60